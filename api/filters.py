@@ -0,0 +1,86 @@
+import math
+
+import django_filters
+from django.db.models import OuterRef, Q, Subquery, Sum
+
+from restaurants.models import Rating, Restaurant, score_tenths, score_tenths_expression
+
+# Notes globales possibles : moyenne de quatre critères de 1 à 5, soit un multiple de 0,25
+OVERALL_SCORES = [total / 4 for total in range(4, 21)]
+
+
+class RatingFilter(django_filters.FilterSet):
+    """
+    Filtres des évaluations ; min_score / max_score portent sur la note
+    globale affichée (arrondie au dixième), traduite en seuil sur la colonne
+    exacte overall_score pour rester servie par son index.
+    """
+    min_score = django_filters.NumberFilter(method='filter_min_score')
+    max_score = django_filters.NumberFilter(method='filter_max_score')
+    # Toutes les évaluations d'un lieu, toutes compétitions confondues
+    place = django_filters.NumberFilter(field_name='restaurant__place')
+
+    class Meta:
+        model = Rating
+        fields = ['restaurant', 'user']
+
+    def filter_min_score(self, queryset, name, value):
+        threshold = math.ceil(value * 10)
+        scores = [score for score in OVERALL_SCORES if score_tenths(score) >= threshold]
+        return queryset.filter(overall_score__gte=scores[0]) if scores else queryset.none()
+
+    def filter_max_score(self, queryset, name, value):
+        threshold = math.floor(value * 10)
+        scores = [score for score in OVERALL_SCORES if score_tenths(score) <= threshold]
+        return queryset.filter(overall_score__lte=scores[-1]) if scores else queryset.none()
+
+
+def _score_margin(bound):
+    """2 × S − bound × n par restaurant, S étant la somme des notes affichées en dixièmes (NULL sans évaluation)."""
+    return Subquery(
+        Rating.objects.filter(restaurant=OuterRef('pk')).values('restaurant').annotate(
+            margin=Sum(2 * score_tenths_expression() - bound)
+        ).values('margin')
+    )
+
+
+def _tied_restaurants(queryset, keep):
+    """Restaurants pile à mi-chemin de la borne dont la moyenne affichée, en dixièmes, vérifie keep."""
+    tied = Restaurant.objects.filter(
+        pk__in=queryset.filter(score_margin=0).values('pk')
+    ).prefetch_related('ratings')
+    return [restaurant.pk for restaurant in tied if keep(round(restaurant.average_rating * 10))]
+
+
+class RestaurantFilter(django_filters.FilterSet):
+    """
+    Filtres des restaurants ; min_score / max_score portent sur la moyenne
+    affichée (average_rating) : la moyenne S / n des notes affichées, en
+    dixièmes, arrondie au dixième. La comparaison à d dixièmes se fait en
+    SQL, en entiers, sur le signe de 2S − (2d ∓ 1)n ; les restaurants
+    exactement à mi-chemin, dont l'arrondi flottant d'average_rating ne se
+    reproduit pas en SQL, sont départagés par average_rating lui-même.
+    """
+    min_score = django_filters.NumberFilter(method='filter_min_score')
+    max_score = django_filters.NumberFilter(method='filter_max_score')
+
+    class Meta:
+        model = Restaurant
+        fields = ['competition', 'suggested_by', 'place']
+
+    def filter_min_score(self, queryset, name, value):
+        tenths = math.ceil(value * 10)
+        if tenths <= 0:
+            return queryset
+        queryset = queryset.alias(score_margin=_score_margin(2 * tenths - 1))
+        tied = _tied_restaurants(queryset, lambda average: average >= tenths)
+        return queryset.filter(Q(score_margin__gt=0) | Q(pk__in=tied))
+
+    def filter_max_score(self, queryset, name, value):
+        tenths = math.floor(value * 10)
+        if tenths < 0:
+            return queryset.none()
+        # Sans évaluation, la moyenne affichée vaut 0
+        queryset = queryset.alias(score_margin=_score_margin(2 * tenths + 1))
+        tied = _tied_restaurants(queryset, lambda average: average <= tenths)
+        return queryset.filter(Q(score_margin__lt=0) | Q(score_margin__isnull=True) | Q(pk__in=tied))
@@ -0,0 +1,106 @@
+import hashlib
+import time
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+from .upserts import insert_ignore
+
+HEADER = 'Idempotency-Key'
+REPLAY_HEADER = 'Idempotent-Replayed'
+# Purge opportuniste des clés expirées : au plus une fois par heure et par processus
+PURGE_INTERVAL = 3600
+
+_last_purge = None
+
+
+def _ttl():
+    return timedelta(hours=getattr(settings, 'IDEMPOTENCY_KEY_TTL_HOURS', 24))
+
+
+def purge_expired_keys():
+    """Supprime les clés plus anciennes que IDEMPOTENCY_KEY_TTL_HOURS ; retourne leur nombre."""
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=timezone.now() - _ttl()).delete()
+    return deleted
+
+
+def _purge_if_due():
+    global _last_purge
+    now = time.monotonic()
+    if _last_purge is None or now - _last_purge > PURGE_INTERVAL:
+        _last_purge = now
+        purge_expired_keys()
+
+
+def _fingerprint(request):
+    # Lire le corps avant l'action le met en cache : request.data reste disponible
+    digest = hashlib.sha256()
+    digest.update(f'{request.method} {request.get_full_path()}\n'.encode())
+    digest.update(request.body)
+    return digest.hexdigest()
+
+
+def _reserve(user, key, fingerprint):
+    """Réserve la clé (une requête) ; une clé expirée est libérée puis réservée à nouveau."""
+    key_id = insert_ignore(IdempotencyKey, user=user, key=key, fingerprint=fingerprint)
+    if key_id is not None:
+        return key_id, None
+    stored = IdempotencyKey.objects.filter(user=user, key=key).first()
+    if stored is not None and stored.created_at < timezone.now() - _ttl():
+        stored.delete()
+        return _reserve(user, key, fingerprint)
+    return None, stored
+
+
+def idempotent(view_method):
+    """
+    Rend une action POST rejouable : avec un header Idempotency-Key, la première
+    réponse (hors erreur serveur) est mémorisée et renvoyée telle quelle aux
+    requêtes suivantes portant la même clé, sans réexécuter l'action.
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key or not request.user.is_authenticated:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > 255:
+            return Response(
+                {"detail": "Idempotency-Key trop longue (255 caractères maximum)."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        _purge_if_due()
+        fingerprint = _fingerprint(request)
+        key_id, stored = _reserve(request.user, key, fingerprint)
+        if stored is not None:
+            if stored.fingerprint != fingerprint:
+                return Response(
+                    {"detail": "Cette Idempotency-Key a déjà servi pour une autre requête."},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
+            if stored.status_code is None:
+                return Response(
+                    {"detail": "Une requête avec cette Idempotency-Key est en cours de traitement."},
+                    status=status.HTTP_409_CONFLICT
+                )
+            return Response(stored.response_body, status=stored.status_code, headers={REPLAY_HEADER: 'true'})
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            IdempotencyKey.objects.filter(pk=key_id).delete()
+            raise
+        if response.status_code >= 500:
+            # Erreur serveur : le client peut réessayer avec la même clé
+            IdempotencyKey.objects.filter(pk=key_id).delete()
+        else:
+            IdempotencyKey.objects.filter(pk=key_id).update(
+                status_code=response.status_code, response_body=response.data
+            )
+        return response
+    return wrapper
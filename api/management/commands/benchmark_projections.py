@@ -0,0 +1,118 @@
+import time
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from api.prefetch import prefetch_plan
+from api.projections import GroupMemberProjection, RatingProjection, RestaurantProjection
+from api.serializers import GroupMemberSerializer, RatingSerializer, RestaurantSerializer
+from competitions.models import Competition
+from groups.models import Group, GroupMember
+from restaurants.models import Place, Rating, Restaurant
+from users.models import User
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare le temps de sérialisation des listes (serializers DRF contre projections "
+        "values()) sur des données temporaires, et vérifie que les sorties sont identiques."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        self.rows = options['rows']
+        self.repeat = options['repeat']
+        try:
+            with transaction.atomic():
+                self.run()
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self):
+        users = User.objects.bulk_create(
+            User(username=f'bench-{i}', email=f'bench-{i}@example.com', avatar='avatars/bench.png')
+            for i in range(self.rows)
+        )
+        owner = users[0]
+        group = Group.objects.create(name='bench', creator=owner)
+        GroupMember.objects.bulk_create(GroupMember(user=user, group=group) for user in users)
+        competition = Competition.objects.create(
+            name='bench', description='', creator=owner, group=group,
+            start_date=date.today(), end_date=date.today(),
+        )
+        place = Place.objects.create(name='bench', address='bench')
+        restaurants = Restaurant.objects.bulk_create(
+            Restaurant(
+                name=f'Restaurant {i}', address=f'{i} rue du Banc', cuisine_type='bench',
+                suggested_by=users[i], competition=competition, place=place,
+                visit_date=date.today(), image='restaurants/bench.jpg' if i % 2 else '',
+            )
+            for i in range(self.rows)
+        )
+        Rating.objects.bulk_create(
+            Rating(
+                restaurant=restaurants[i], user=users[i], food_score=1 + i % 5,
+                service_score=1 + (i + 1) % 5, ambiance_score=1 + (i + 2) % 5,
+                value_score=1 + (i + 3) % 5, comment='bench',
+            )
+            for i in range(self.rows)
+        )
+        return owner
+
+    def _time(self, func):
+        best, result = None, None
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def run(self):
+        owner = self._seed()
+        http_request = RequestFactory().get('/api/', HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        http_request.user = owner
+        request = Request(http_request)
+        request.user = owner
+        renderer = JSONRenderer()
+
+        cases = [
+            ('/api/restaurants/', Restaurant.objects.filter(competition__group__members=owner),
+             RestaurantSerializer, RestaurantProjection),
+            ('/api/ratings/', Rating.objects.filter(restaurant__competition__group__members=owner),
+             RatingSerializer, RatingProjection),
+            ('/api/group-members/', GroupMember.objects.filter(group__members=owner),
+             GroupMemberSerializer, GroupMemberProjection),
+        ]
+        per_thousand = 1000 / self.rows
+        for endpoint, queryset, serializer_class, projection_class in cases:
+            # Même préchargement que la vue : seul le coût de sérialisation est comparé
+            plan = prefetch_plan(serializer_class)
+            serializer_time, expected = self._time(lambda: renderer.render(
+                serializer_class(plan.apply(queryset.all()), many=True, context={'request': request}).data
+            ))
+            projection_time, actual = self._time(lambda: renderer.render(
+                projection_class(request).represent(projection_class(request).queryset(queryset.all()))
+            ))
+            if expected != actual:
+                raise CommandError(f"{endpoint} : la projection ne produit pas la même sortie.")
+
+            self.stdout.write(
+                f"{endpoint:<22} serializer {serializer_time * 1000 * per_thousand:8.1f} ms/1000 lignes"
+                f" | projection {projection_time * 1000 * per_thousand:7.1f} ms/1000 lignes"
+                f" | gain {(1 - projection_time / serializer_time) * 100:5.1f} %"
+                f" | sortie identique ({len(actual)} octets)"
+            )
@@ -0,0 +1,71 @@
+import hashlib
+import os
+import time
+
+from django.conf import settings
+from django.contrib.staticfiles.finders import get_finders
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+
+FINGERPRINT_FILE = '.source-fingerprint'
+
+
+def static_sources_fingerprint():
+    """Empreinte des fichiers statiques sources (chemin, taille, date) et du stockage configuré."""
+    digest = hashlib.sha256(repr(settings.STORAGES.get('staticfiles')).encode())
+    entries = []
+    for finder in get_finders():
+        for path, storage in finder.list(ignore_patterns=['CVS', '.*', '*~']):
+            stat = os.stat(storage.path(path))
+            entries.append(f'{path}|{stat.st_size}|{stat.st_mtime_ns}')
+    for entry in sorted(entries):
+        digest.update(entry.encode())
+    return digest.hexdigest()
+
+
+class Command(BaseCommand):
+    help = (
+        "Prépare le démarrage du conteneur : applique les migrations et lance "
+        "collectstatic uniquement si quelque chose a changé."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--skip-migrate', action='store_true', help="Ne vérifie pas les migrations (build d'image).")
+        parser.add_argument('--skip-static', action='store_true', help="Ne vérifie pas les fichiers statiques.")
+
+    def handle(self, *args, **options):
+        if not options['skip_migrate']:
+            self.migrate_if_needed()
+        if not options['skip_static']:
+            self.collectstatic_if_needed()
+
+    def migrate_if_needed(self):
+        # La table django_migrations fait foi : une seule requête si tout est appliqué
+        start = time.monotonic()
+        executor = MigrationExecutor(connections[DEFAULT_DB_ALIAS])
+        plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+        if not plan:
+            self.stdout.write(f"Migrations : à jour, ignorées ({time.monotonic() - start:.2f}s).")
+            return
+        call_command('migrate', interactive=False, verbosity=1)
+        self.stdout.write(f"Migrations : {len(plan)} appliquée(s) en {time.monotonic() - start:.2f}s.")
+
+    def collectstatic_if_needed(self):
+        start = time.monotonic()
+        fingerprint = static_sources_fingerprint()
+        fingerprint_path = os.path.join(settings.STATIC_ROOT, FINGERPRINT_FILE)
+        try:
+            with open(fingerprint_path) as f:
+                previous = f.read().strip()
+        except FileNotFoundError:
+            previous = None
+
+        if previous == fingerprint:
+            self.stdout.write(f"Fichiers statiques : inchangés, ignorés ({time.monotonic() - start:.2f}s).")
+            return
+        call_command('collectstatic', interactive=False, verbosity=0)
+        with open(fingerprint_path, 'w') as f:
+            f.write(fingerprint)
+        self.stdout.write(f"Fichiers statiques : collectés en {time.monotonic() - start:.2f}s.")
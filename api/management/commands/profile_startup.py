@@ -0,0 +1,215 @@
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Script exécuté dans un interpréteur neuf, deux fois par mesure : avec -X importtime
+# pour les temps, puis avec l'argument « memory » pour tracemalloc, dont le suivi de
+# chaque allocation fausserait les temps d'import
+CHILD_SCRIPT = r'''
+import json, os, sys, time, tracemalloc
+
+trace_memory = sys.argv[1:] == ['memory']
+
+def rss_kb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+phases = {'interpreter': rss_kb()}
+if trace_memory:
+    tracemalloc.start()
+start = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+import django
+django.setup()
+phases['django_setup'] = rss_kb()
+from django.urls import get_resolver
+get_resolver().url_patterns
+from config.wsgi import application
+phases['urls_and_wsgi'] = rss_kb()
+elapsed = time.perf_counter() - start
+if not trace_memory:
+    print(json.dumps({'elapsed': elapsed, 'rss_kb': phases}))
+    sys.exit()
+
+files = {}
+for name, module in list(sys.modules.items()):
+    path = getattr(module, '__file__', None)
+    if path:
+        files[os.path.abspath(path)] = name
+memory = {}
+for stat in tracemalloc.take_snapshot().statistics('filename'):
+    name = files.get(os.path.abspath(stat.traceback[0].filename))
+    if name:
+        memory[name] = memory.get(name, 0) + stat.size
+print(json.dumps({'memory': memory}))
+'''
+
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$')
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure le coût de démarrage (temps d'import et mémoire) par module et par "
+        "application installée, et le compare éventuellement à une référence."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=3, help="Nombre de démarrages mesurés (médiane).")
+        parser.add_argument('--json', action='store_true', help="Sortie JSON pour le suivi des tendances.")
+        parser.add_argument('--top', type=int, default=15, help="Nombre de modules affichés.")
+        parser.add_argument('--baseline', help="Fichier JSON de référence à comparer.")
+        parser.add_argument('--save-baseline', help="Enregistre le résultat comme référence.")
+        parser.add_argument(
+            '--threshold', type=float, default=20.0,
+            help="Régression tolérée par application, en pourcentage.",
+        )
+        parser.add_argument(
+            '--min-delta-ms', type=float, default=5.0,
+            help="Écart minimal (ms) pour signaler une régression de temps.",
+        )
+
+    def _run_child(self, *args):
+        env = {**os.environ, 'PYTHONWARNINGS': 'ignore'}
+        result = subprocess.run(
+            [sys.executable, *args],
+            capture_output=True, text=True, env=env, cwd=settings.BASE_DIR,
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Échec du démarrage mesuré :\n{result.stderr[-2000:]}")
+        return result
+
+    def _run_once(self):
+        # Temps et RSS sans tracemalloc, mémoire par module sans -X importtime
+        result = self._run_child('-X', 'importtime', '-c', CHILD_SCRIPT)
+        modules = {}
+        for line in result.stderr.splitlines():
+            match = IMPORTTIME_RE.match(line)
+            if match:
+                self_us, cumulative_us, _, name = match.groups()
+                modules[name] = {'self_us': int(self_us), 'cumulative_us': int(cumulative_us)}
+        measures = json.loads(result.stdout.strip().splitlines()[-1])
+
+        result = self._run_child('-c', CHILD_SCRIPT, 'memory')
+        measures.update(json.loads(result.stdout.strip().splitlines()[-1]))
+        return modules, measures
+
+    def _owner(self, module, apps):
+        """Application installée (ou paquet racine) à laquelle appartient un module."""
+        for app in apps:
+            if module == app or module.startswith(app + '.'):
+                return app
+        return module.split('.')[0]
+
+    def collect(self, runs):
+        samples = [self._run_once() for _ in range(runs)]
+        apps = sorted(settings.INSTALLED_APPS + ['config'], key=len, reverse=True)
+
+        modules = {}
+        for name in set().union(*(s[0] for s in samples)):
+            modules[name] = {
+                'self_ms': statistics.median(s[0].get(name, {}).get('self_us', 0) for s in samples) / 1000,
+                'cumulative_ms': statistics.median(
+                    s[0].get(name, {}).get('cumulative_us', 0) for s in samples
+                ) / 1000,
+                'memory_kb': statistics.median(s[1]['memory'].get(name, 0) for s in samples) / 1024,
+            }
+
+        # Agrégation par application : somme des temps propres (pas de double comptage)
+        packages = {}
+        for name, module in modules.items():
+            package = packages.setdefault(
+                self._owner(name, apps), {'self_ms': 0.0, 'memory_kb': 0.0, 'modules': 0}
+            )
+            package['self_ms'] += module['self_ms']
+            package['memory_kb'] += module['memory_kb']
+            package['modules'] += 1
+
+        rss = {
+            phase: statistics.median(s[1]['rss_kb'][phase] for s in samples)
+            for phase in samples[0][1]['rss_kb']
+        }
+        return {
+            'python': sys.version.split()[0],
+            'runs': runs,
+            'elapsed_ms': statistics.median(s[1]['elapsed'] for s in samples) * 1000,
+            'rss_kb': rss,
+            'packages': packages,
+            'modules': modules,
+        }
+
+    def compare(self, report, baseline, threshold, min_delta_ms):
+        regressions = []
+        for name, package in report['packages'].items():
+            before = baseline.get('packages', {}).get(name)
+            if before is None:
+                if package['self_ms'] >= min_delta_ms:
+                    regressions.append(f"{name} : nouveau, {package['self_ms']:.1f} ms")
+                continue
+            delta_ms = package['self_ms'] - before['self_ms']
+            if delta_ms >= min_delta_ms and delta_ms > before['self_ms'] * threshold / 100:
+                regressions.append(
+                    f"{name} : {before['self_ms']:.1f} ms -> {package['self_ms']:.1f} ms"
+                )
+            if package['memory_kb'] > before['memory_kb'] * (1 + threshold / 100) + 256:
+                regressions.append(
+                    f"{name} : {before['memory_kb']:.0f} Ko -> {package['memory_kb']:.0f} Ko"
+                )
+        rss_before = baseline.get('rss_kb', {}).get('urls_and_wsgi')
+        rss_after = report['rss_kb'].get('urls_and_wsgi')
+        if rss_before and rss_after > rss_before * (1 + threshold / 100):
+            regressions.append(f"RSS après démarrage : {rss_before:.0f} Ko -> {rss_after:.0f} Ko")
+        return regressions
+
+    def handle(self, *args, **options):
+        report = self.collect(max(options['runs'], 1))
+
+        regressions = []
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+            regressions = self.compare(report, baseline, options['threshold'], options['min_delta_ms'])
+            report['regressions'] = regressions
+
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w') as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2, sort_keys=True))
+        else:
+            self.write_table(report, options['top'])
+
+        if regressions:
+            raise CommandError("Régressions de démarrage :\n" + "\n".join(regressions))
+
+    def write_table(self, report, top):
+        rss = report['rss_kb']
+        self.stdout.write(
+            f"Démarrage : {report['elapsed_ms']:.0f} ms (médiane sur {report['runs']}), RSS "
+            + ", ".join(f"{phase} {value / 1024:.1f} Mo" for phase, value in rss.items())
+        )
+        self.stdout.write("\nPar application / paquet :")
+        for name, package in sorted(report['packages'].items(), key=lambda item: -item[1]['self_ms'])[:top]:
+            self.stdout.write(
+                f"  {name:<32} {package['self_ms']:8.1f} ms {package['memory_kb']:9.0f} Ko"
+                f" ({package['modules']} modules)"
+            )
+        self.stdout.write("\nModules les plus coûteux (temps cumulé) :")
+        for name, module in sorted(report['modules'].items(), key=lambda item: -item[1]['cumulative_ms'])[:top]:
+            self.stdout.write(
+                f"  {name:<48} {module['cumulative_ms']:8.1f} ms (propre {module['self_ms']:.1f} ms)"
+                f" {module['memory_kb']:8.0f} Ko"
+            )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.idempotency import purge_expired_keys
+
+
+class Command(BaseCommand):
+    help = "Supprime les Idempotency-Key plus anciennes que IDEMPOTENCY_KEY_TTL_HOURS."
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_keys()
+        self.stdout.write(self.style.SUCCESS(f"{deleted} clé(s) expirée(s) supprimée(s)."))
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.7 on 2026-10-19 19:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0001_idempotencykey"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="idempotencykey",
+            index=models.Index(
+                fields=["created_at"], name="idempotency_created_at_idx"
+            ),
+        ),
+    ]
@@ -1,3 +1,28 @@
 from django.db import models
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 
-# Create your models here.
+
+class IdempotencyKey(models.Model):
+    """Réponse mémorisée d'une requête POST, rejouée si le client renvoie le même header Idempotency-Key"""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='idempotency_keys'
+    )
+    key = models.CharField(max_length=255)
+    # Empreinte méthode + chemin + corps : une clé ne peut pas servir à deux requêtes différentes
+    fingerprint = models.CharField(max_length=64)
+    # Vide tant que la première requête est en cours de traitement
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('user', 'key')
+        indexes = [
+            models.Index(fields=['created_at'], name='idempotency_created_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.key}"
@@ -0,0 +1,106 @@
+import base64
+from datetime import datetime
+
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Pagination par clé (created_at, id) décroissante.
+
+    Chaque page est une requête `WHERE (created_at, id) < curseur ORDER BY ...
+    LIMIT n` servie par l'index, donc son coût ne dépend que de la taille de la
+    page, quelle que soit la longueur de l'historique.
+
+    Une vue dont les lignes se répartissent en partitions indexées séparément
+    (fil de plusieurs groupes, index (group, -created_at, -id)) définit
+    `get_keyset_partitions()` -> (champ, valeurs) : chaque partition est
+    limitée à n lignes dans un UNION ALL, puis les identifiants fusionnés
+    et triés donnent la page, au lieu de trier toutes les lignes des
+    partitions.
+    """
+    page_size = 20
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = "Curseur invalide."
+
+    def encode_cursor(self, obj):
+        raw = f"{obj.created_at.isoformat()}|{obj.pk}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            created_at, pk = base64.urlsafe_b64decode(encoded.encode()).decode().split('|')
+            return datetime.fromisoformat(created_at), int(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            size = self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        cursor = self.decode_cursor(request)
+        if cursor:
+            created_at, pk = cursor
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+            )
+
+        # Une ligne de plus pour savoir s'il existe une page suivante
+        rows = self.page_rows(queryset, page_size + 1, view)
+        self.next_cursor = self.encode_cursor(rows[page_size - 1]) if len(rows) > page_size else None
+        return rows[:page_size]
+
+    def page_rows(self, queryset, limit, view=None):
+        ordered = queryset.order_by('-created_at', '-pk')
+        get_partitions = getattr(view, 'get_keyset_partitions', None)
+        features = connections[ordered.db].features
+        # SQLite n'accepte pas de LIMIT dans les branches d'un UNION : requête simple
+        if get_partitions is None or not features.supports_slicing_ordering_in_compound:
+            return list(ordered[:limit])
+
+        field, values = get_partitions()
+        values = list(values)
+        if len(values) < 2:
+            return list(ordered[:limit])
+        parts = [
+            ordered.filter(**{field: value}).values_list('created_at', 'pk')[:limit]
+            for value in values
+        ]
+        keys = parts[0].union(*parts[1:], all=True).order_by('-created_at', '-pk')[:limit]
+        return list(ordered.filter(pk__in=[pk for _, pk in keys]))
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
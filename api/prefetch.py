@@ -0,0 +1,97 @@
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+from restaurants.models import Restaurant
+
+# Propriétés de modèle qui parcourent une relation : (modèle, attribut) -> relations lues
+PROPERTY_PREFETCHES = {
+    (Restaurant, 'average_rating'): ['ratings'],
+    (Restaurant, 'score_histogram'): ['score_histograms'],
+}
+
+
+class PrefetchPlan:
+    """Chemins select_related / prefetch_related nécessaires à un serializer."""
+
+    def __init__(self):
+        self.select_related = []
+        self.prefetch_related = []
+
+    def add(self, path, many):
+        target = self.prefetch_related if many else self.select_related
+        lookup = '__'.join(path)
+        if lookup and lookup not in target:
+            target.append(lookup)
+
+    def apply(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        return queryset
+
+
+def _walk(serializer, model, prefix, many, plan):
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        if field.source == '*':
+            if isinstance(nested, serializers.BaseSerializer):
+                _walk(nested, model, prefix, many, plan)
+            continue
+
+        # Parcours du chemin source= tant qu'il suit des relations du modèle
+        path, current, path_many = list(prefix), model, many
+        attrs = field.source_attrs
+        for index, attr in enumerate(attrs):
+            try:
+                model_field = current._meta.get_field(attr)
+            except FieldDoesNotExist:
+                for relation in PROPERTY_PREFETCHES.get((current, attr), []):
+                    plan.add(path + [relation], many=True)
+                break
+            if not model_field.is_relation:
+                break
+            last = index == len(attrs) - 1
+            single = model_field.many_to_one or model_field.one_to_one
+            # Clé étrangère rendue par sa seule valeur : pas de requête
+            if last and single and model_field.concrete and isinstance(field, serializers.RelatedField):
+                break
+            path.append(attr)
+            path_many = path_many or not single
+            current = model_field.related_model
+            plan.add(path, path_many)
+            if last and isinstance(nested, serializers.BaseSerializer):
+                _walk(nested, current, path, path_many, plan)
+
+
+@lru_cache(maxsize=None)
+def prefetch_plan(serializer_class):
+    """Plan de préchargement d'un ModelSerializer, calculé une fois par classe."""
+    plan = PrefetchPlan()
+    model = getattr(getattr(serializer_class, 'Meta', None), 'model', None)
+    if model is not None:
+        _walk(serializer_class(), model, [], False, plan)
+    return plan
+
+
+class PrefetchPlanMixin:
+    """
+    Applique au queryset des actions qui sérialisent des objets le plan de
+    préchargement déduit de l'arbre du serializer (serializers imbriqués,
+    chemins source=, propriétés connues comme average_rating) : un champ
+    imbriqué ajouté au serializer ne coûte pas une requête par ligne.
+    """
+    prefetch_plan_actions = ('list', 'retrieve', 'update', 'partial_update')
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action not in self.prefetch_plan_actions:
+            return queryset
+        # La liste servie par projection values() n'instancie pas de modèle
+        if self.action == 'list' and getattr(self, 'list_projection_class', None) is not None:
+            return queryset
+        return prefetch_plan(self.get_serializer_class()).apply(queryset)
@@ -0,0 +1,222 @@
+from collections import defaultdict
+
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from restaurants.histograms import histograms_for
+from restaurants.models import SCORE_CRITERIA, Rating, Restaurant
+from users.models import User
+
+# Instances non liées des champs DRF : même format de sortie que les serializers
+_datetime = serializers.DateTimeField()
+_date = serializers.DateField()
+
+USER_FIELDS = ['id', 'username', 'email', 'first_name', 'last_name', 'bio', 'avatar']
+
+
+def _overall_score(value):
+    # Même arrondi que RatingSerializer.get_overall_score
+    return round(value, 1)
+
+
+class ListProjection:
+    """
+    Chemin de lecture rapide pour les listes : construit la réponse à partir
+    d'une projection values() (utilisateurs imbriqués pré-joints) au lieu
+    d'instancier un modèle et un serializer par ligne.
+
+    `columns` décrit la sortie dans l'ordre des champs du serializer
+    équivalent : (clé, chemin values()) ou (clé, chemin, conversion).
+    `users` associe une clé de sortie au chemin de la clé étrangère vers User,
+    dont les colonnes de UserSerializer sont sélectionnées dans la même requête.
+    La sortie doit rester identique octet par octet à celle du serializer.
+    """
+    columns = []
+    users = {}
+
+    def __init__(self, request):
+        self.request = request
+
+    def file_url(self, model, field_name):
+        """Conversion équivalente à serializers.FileField/ImageField."""
+        storage = model._meta.get_field(field_name).storage
+
+        def convert(name):
+            if not name:
+                return None
+            url = storage.url(name)
+            if self.request is not None:
+                return self.request.build_absolute_uri(url)
+            return url
+        return convert
+
+    def get_columns(self):
+        return self.columns
+
+    def values_paths(self):
+        paths = []
+        for column in self.get_columns():
+            key, path = column[0], column[1]
+            if key in self.users:
+                paths.extend(f'{path}__{field}' for field in USER_FIELDS)
+            elif path is not None:
+                paths.append(path)
+        return paths
+
+    def queryset(self, queryset):
+        return queryset.values(*self.values_paths())
+
+    def prepare(self, rows):
+        """Point d'extension pour charger en une requête les données calculées d'un lot."""
+
+    def attach_users(self, rows):
+        """
+        Complète des lignes qui ne portent que `<chemin>_id` (archives) avec les
+        colonnes utilisateur attendues par represent(), en une requête.
+        """
+        paths = [column[1] for column in self.get_columns() if column[0] in self.users]
+        user_ids = {row[f'{path}_id'] for row in rows for path in paths} - {None}
+        users = {
+            user['id']: user
+            for user in User.objects.filter(id__in=user_ids).values(*USER_FIELDS)
+        }
+        for row in rows:
+            for path in paths:
+                user = users.get(row[f'{path}_id'], {})
+                for field in USER_FIELDS:
+                    row[f'{path}__{field}'] = user.get(field)
+        return rows
+
+    def represent(self, rows):
+        rows = list(rows)
+        self.prepare(rows)
+        avatar_url = self.file_url(User, 'avatar')
+        columns = self.get_columns()
+        output = []
+        for row in rows:
+            item = {}
+            for column in columns:
+                key, path = column[0], column[1]
+                if key in self.users:
+                    if row[f'{path}__id'] is None:
+                        item[key] = None
+                        continue
+                    user = {field: row[f'{path}__{field}'] for field in USER_FIELDS}
+                    user['avatar'] = avatar_url(user['avatar'])
+                    item[key] = user
+                elif len(column) > 2:
+                    item[key] = column[2](row[path] if path is not None else row)
+                else:
+                    item[key] = row[path]
+            output.append(item)
+        return output
+
+
+class RestaurantProjection(ListProjection):
+    users = {'suggested_by': 'suggested_by'}
+
+    def get_columns(self):
+        return [
+            ('id', 'id'),
+            ('name', 'name'),
+            ('address', 'address'),
+            ('cuisine_type', 'cuisine_type'),
+            ('suggested_by', 'suggested_by'),
+            ('competition', 'competition_id'),
+            ('place', 'place_id'),
+            ('visit_date', 'visit_date', _date.to_representation),
+            ('image', 'image', self.file_url(Restaurant, 'image')),
+            ('average_rating', None, lambda row: self.average_ratings.get(row['id'], 0)),
+            ('score_histogram', None, lambda row: self.histograms[row['id']]),
+            ('created_at', 'created_at', _datetime.to_representation),
+        ]
+
+    def prepare(self, rows):
+        # Une requête pour les notes de tout le lot, au lieu d'une par restaurant
+        self.set_average_ratings(Rating.objects.filter(
+            restaurant_id__in=[row['id'] for row in rows]
+        ).values_list('restaurant_id', 'overall_score'))
+        self.histograms = histograms_for([row['id'] for row in rows])
+
+    def set_average_ratings(self, ratings):
+        scores = defaultdict(list)
+        for restaurant_id, overall_score in ratings:
+            scores[restaurant_id].append(_overall_score(overall_score))
+        # Même arrondi que Restaurant.average_rating
+        self.average_ratings = {
+            restaurant_id: round(sum(values) / len(values), 1)
+            for restaurant_id, values in scores.items()
+        }
+
+
+class ArchivedRestaurantProjection(RestaurantProjection):
+    """Restaurants d'une compétition archivée : notes et histogrammes recalculés depuis l'archive."""
+
+    def __init__(self, request, archive):
+        super().__init__(request)
+        self.archive = archive
+
+    def prepare(self, rows):
+        self.set_average_ratings(
+            (rating['restaurant_id'], rating['overall_score']) for rating in self.archive.ratings
+        )
+        self.histograms = defaultdict(lambda: {criterion: [0] * 5 for criterion in SCORE_CRITERIA})
+        for rating in self.archive.ratings:
+            for criterion in SCORE_CRITERIA:
+                self.histograms[rating['restaurant_id']][criterion][rating[f'{criterion}_score'] - 1] += 1
+
+
+class RatingProjection(ListProjection):
+    users = {'user': 'user'}
+    columns = [
+        ('id', 'id'),
+        ('restaurant', 'restaurant_id'),
+        ('user', 'user'),
+        ('food_score', 'food_score'),
+        ('service_score', 'service_score'),
+        ('ambiance_score', 'ambiance_score'),
+        ('value_score', 'value_score'),
+        ('comment', 'comment'),
+        ('overall_score', 'overall_score', _overall_score),
+        ('created_at', 'created_at', _datetime.to_representation),
+    ]
+
+
+class ParticipantProjection(ListProjection):
+    """Participants d'une compétition archivée, au format de UserSerializer (clé 'user')."""
+    users = {'user': 'user'}
+    columns = [('user', 'user')]
+
+
+class GroupMemberProjection(ListProjection):
+    users = {'user': 'user'}
+
+    def get_columns(self):
+        current_user_id = getattr(self.request, 'user', None) and self.request.user.pk
+        return [
+            ('id', 'id'),
+            ('user', 'user'),
+            ('group', 'group_id'),
+            ('role', 'role'),
+            ('joined_at', 'joined_at', _datetime.to_representation),
+            ('is_current_user', 'user_id', lambda user_id: user_id == current_user_id),
+        ]
+
+
+class ProjectionListMixin:
+    """
+    Sert l'action list via `list_projection_class` quand elle est définie,
+    sinon via le serializer habituel. Les autres actions ne changent pas.
+    """
+    list_projection_class = None
+
+    def list(self, request, *args, **kwargs):
+        if self.list_projection_class is None:
+            return super().list(request, *args, **kwargs)
+
+        projection = self.list_projection_class(request)
+        rows = projection.queryset(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(projection.represent(page))
+        return Response(projection.represent(rows))
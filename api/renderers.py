@@ -0,0 +1,79 @@
+import msgpack
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+USER_KEYS = frozenset(['id', 'username', 'email', 'first_name', 'last_name', 'bio', 'avatar'])
+
+
+def _is_user(value):
+    return isinstance(value, dict) and value.keys() == USER_KEYS
+
+
+def to_columnar(rows):
+    """
+    Convertit une liste d'objets homogènes en colonnes :
+    {"columns": [...], "rows": [[...], ...], "users": {id: {...}}}.
+
+    Les clés ne sont écrites qu'une fois et les utilisateurs imbriqués
+    (UserSerializer) sont remplacés par leur id et dédupliqués dans "users".
+    """
+    columns = list(rows[0].keys()) if rows else []
+    users = {}
+
+    def compact(value):
+        if _is_user(value):
+            users[str(value['id'])] = value
+            return value['id']
+        if isinstance(value, list) and value and all(_is_user(item) for item in value):
+            return [compact(item) for item in value]
+        return value
+
+    return {
+        'columns': columns,
+        'rows': [[compact(row.get(column)) for column in columns] for row in rows],
+        'users': users,
+    }
+
+
+def columnar_data(data):
+    """Applique to_columnar aux listes d'objets, paginées ({"results": [...]}) ou non."""
+    if isinstance(data, list) and all(isinstance(item, dict) for item in data):
+        return to_columnar(data)
+    if isinstance(data, dict) and isinstance(data.get('results'), list):
+        return {**data, 'results': to_columnar(data['results'])}
+    return data
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    """JSON en colonnes, demandé via Accept: application/vnd.foodle.columnar+json"""
+    media_type = 'application/vnd.foodle.columnar+json'
+    format = 'columnar'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(columnar_data(data), accepted_media_type, renderer_context)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Format binaire MessagePack, demandé via Accept: application/msgpack"""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def _default(self, value):
+        # Mêmes conversions que le JSON (dates, Decimal, UUID...)
+        return JSONEncoder().default(value)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=self._default, use_bin_type=True)
+
+
+class ColumnarMessagePackRenderer(MessagePackRenderer):
+    """MessagePack en colonnes, demandé via Accept: application/vnd.foodle.columnar+msgpack"""
+    media_type = 'application/vnd.foodle.columnar+msgpack'
+    format = 'columnar-msgpack'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(columnar_data(data), accepted_media_type, renderer_context)
@@ -3,11 +3,14 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
 from django.conf import settings
+from django.db.models import Count, Exists, OuterRef, Subquery
 from dj_rest_auth.serializers import PasswordResetSerializer as DjPasswordResetSerializer
 from users.models import User
-from groups.models import Group, GroupFavorite, GroupMember
+from groups.models import Activity, Group, GroupFavorite, GroupMember
 from competitions.models import Competition, Participant
-from restaurants.models import Restaurant, Rating
+from restaurants.models import SCORE_CRITERIA, Restaurant, Rating
+from competitions.archive import load_archive
+from .projections import ArchivedRestaurantProjection, ParticipantProjection
 
 
 class CustomPasswordResetSerializer(DjPasswordResetSerializer):
@@ -51,6 +54,11 @@ class UserSerializer(serializers.ModelSerializer):
         
         return value
 
+class UserDetailsSerializer(UserSerializer):
+    """Profil de l'utilisateur connecté, avec ses préférences de notification."""
+    class Meta(UserSerializer.Meta):
+        fields = UserSerializer.Meta.fields + ['digest_frequency']
+
 class GroupSerializer(serializers.ModelSerializer):
     creator = UserSerializer(read_only=True)
     member_count = serializers.SerializerMethodField()
@@ -68,7 +76,9 @@ class GroupSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
     
     def get_member_count(self, obj):
-        """Retourne le nombre de membres du groupe."""
+        """Retourne le nombre de membres du groupe (annoté par GroupViewSet)."""
+        if hasattr(obj, 'member_count'):
+            return obj.member_count
         return obj.members.count()
     
     def get_competition_count(self, obj):
@@ -76,7 +86,9 @@ class GroupSerializer(serializers.ModelSerializer):
         return obj.competitions.count()
     
     def get_is_favorite(self, obj):
-        """Vérifie si le groupe est en favori pour l'utilisateur actuel."""
+        """Vérifie si le groupe est en favori pour l'utilisateur actuel (annoté par GroupViewSet)."""
+        if hasattr(obj, 'is_favorite'):
+            return obj.is_favorite
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return GroupFavorite.objects.filter(
@@ -87,6 +99,8 @@ class GroupSerializer(serializers.ModelSerializer):
 
     def get_current_user_role(self, obj):
         """Retourne le rôle de l'utilisateur connecté dans ce groupe (admin/member/None)."""
+        if hasattr(obj, 'current_user_role'):
+            return obj.current_user_role
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             try:
@@ -104,6 +118,24 @@ class GroupSerializer(serializers.ModelSerializer):
     #     serializer = UserSerializer(members, many=True)
     #     return Response(serializer.data)
 
+def group_queryset(user):
+    """Groupes de l'utilisateur avec les annotations lues par GroupSerializer (pas de requête par groupe)."""
+    # member_count en sous-requête : la jointure de filter(members=user) ne garde que l'utilisateur
+    member_count = GroupMember.objects.filter(
+        group=OuterRef('pk')
+    ).values('group').annotate(count=Count('id')).values('count')
+    return Group.objects.filter(
+        members=user
+    ).annotate(
+        member_count=Subquery(member_count),
+        competition_count=Count('competitions', distinct=True),
+        is_favorite=Exists(GroupFavorite.objects.filter(group=OuterRef('pk'), user=user)),
+        current_user_role=Subquery(
+            GroupMember.objects.filter(group=OuterRef('pk'), user=user).values('role')[:1]
+        ),
+    )
+
+
 class GroupMemberSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     is_current_user = serializers.SerializerMethodField()
@@ -120,12 +152,14 @@ class GroupMemberSerializer(serializers.ModelSerializer):
 class RestaurantSerializer(serializers.ModelSerializer):
     suggested_by = UserSerializer(read_only=True)
     average_rating = serializers.ReadOnlyField()
+    score_histogram = serializers.ReadOnlyField()
     
     class Meta:
         model = Restaurant
         fields = ['id', 'name', 'address', 'cuisine_type', 'suggested_by', 
-                  'competition', 'visit_date', 'image', 'average_rating', 'created_at']
-        read_only_fields = ['id', 'created_at']
+                  'competition', 'place', 'visit_date', 'image', 'average_rating',
+                  'score_histogram', 'created_at']
+        read_only_fields = ['id', 'place', 'created_at']
     
     def create(self, validated_data):
         # Associer l'utilisateur actuel comme suggérant
@@ -150,6 +184,9 @@ class CompetitionSerializer(serializers.ModelSerializer):
             'start_date', 
             'end_date', 
             'status',
+            'ranking_strategy',
+            'criterion_weights',
+            'bayesian_prior_weight',
             'participant_count', 
             'created_at',
             'participants',
@@ -163,10 +200,38 @@ class CompetitionSerializer(serializers.ModelSerializer):
     
     def get_participant_count(self, obj):
         return obj.participant_count
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        archive = load_archive(instance)
+        if archive is not None:
+            # Compétition archivée : restaurants et participants lus dans l'archive
+            request = self.context.get('request')
+            participants = ParticipantProjection(request)
+            data['participants'] = [
+                item['user'] for item in participants.represent(participants.attach_users(archive.participants))
+            ]
+            data['participant_count'] = len(archive.participants)
+            restaurants = ArchivedRestaurantProjection(request, archive)
+            data['restaurants'] = restaurants.represent(restaurants.attach_users(archive.restaurants))
+        return data
+
+    def validate_criterion_weights(self, value):
+        if not isinstance(value, dict):
+            raise serializers.ValidationError("Les poids doivent être un objet {critère: poids}.")
+        unknown = set(value) - set(SCORE_CRITERIA)
+        if unknown:
+            raise serializers.ValidationError(f"Critères inconnus : {', '.join(sorted(unknown))}.")
+        if any(not isinstance(weight, (int, float)) or isinstance(weight, bool) or weight < 0
+               for weight in value.values()):
+            raise serializers.ValidationError("Les poids doivent être des nombres positifs.")
+        if value and sum(value.values()) + (len(SCORE_CRITERIA) - len(value)) <= 0:
+            raise serializers.ValidationError("Au moins un critère doit avoir un poids non nul.")
+        return value
     
 class RatingSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
-    overall_score = serializers.ReadOnlyField()
+    overall_score = serializers.SerializerMethodField()
     
     class Meta:
         model = Rating
@@ -177,4 +242,27 @@ class RatingSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         # Associer l'utilisateur actuel comme évaluateur
         validated_data['user'] = self.context['request'].user
-        return super().create(validated_data)
\ No newline at end of file
+        return super().create(validated_data)
+
+    def get_overall_score(self, obj):
+        # Colonne exacte calculée en base, exposée arrondie à une décimale
+        return round(obj.overall_score, 1)
+
+class RestaurantImportSerializer(serializers.Serializer):
+    """Paramètres de l'import CSV : le fichier et une compétition d'un groupe de l'utilisateur"""
+    file = serializers.FileField(error_messages={'required': "Aucun fichier CSV fourni."})
+    competition = serializers.PrimaryKeyRelatedField(queryset=Competition.objects.none())
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is not None:
+            self.fields['competition'].queryset = Competition.objects.filter(group__members=request.user)
+
+class ActivitySerializer(serializers.ModelSerializer):
+    actor = UserSerializer(read_only=True)
+
+    class Meta:
+        model = Activity
+        fields = ['id', 'group', 'verb', 'actor', 'competition', 'restaurant', 'data', 'created_at']
+        read_only_fields = fields
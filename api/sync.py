@@ -0,0 +1,177 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from competitions.archive import load_archive
+from competitions.models import Competition
+from groups.models import ChangeLogEntry, GroupMember
+from restaurants.models import Rating, Restaurant
+
+from .prefetch import prefetch_plan
+from .projections import (
+    ArchivedRestaurantProjection, GroupMemberProjection, RatingProjection, RestaurantProjection,
+)
+from .serializers import CompetitionSerializer, GroupSerializer, group_queryset
+
+TOKEN_SALT = 'api.sync'
+
+# Ressource du journal -> clé de la réponse
+RESOURCES = {
+    'group': 'groups',
+    'member': 'members',
+    'competition': 'competitions',
+    'restaurant': 'restaurants',
+    'rating': 'ratings',
+}
+
+
+def make_token(position):
+    return signing.dumps(position, salt=TOKEN_SALT)
+
+
+def read_token(token):
+    """Position dans le journal encodée par le jeton, None s'il est invalide."""
+    try:
+        position = signing.loads(token, salt=TOKEN_SALT)
+    except signing.BadSignature:
+        return None
+    return position if isinstance(position, int) and position >= 0 else None
+
+
+def sync_horizon():
+    """
+    Dernière entrée du journal lisible sans risque. Les identifiants sont
+    attribués à l'insertion et non au commit : une transaction encore ouverte
+    peut publier plus tard une entrée d'identifiant inférieur. Seules les
+    entrées de plus de SYNC_SETTLE_SECONDS secondes sont donc lues.
+
+    Limite : une entrée écrite par une transaction restée ouverte plus de
+    SYNC_SETTLE_SECONDS peut apparaître sous une position déjà renvoyée au
+    client ; elle est alors sautée pour de bon par ses synchronisations
+    incrémentales (seule une synchronisation complète la rattrape).
+    """
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'SYNC_SETTLE_SECONDS', 5))
+    return ChangeLogEntry.objects.filter(
+        created_at__lte=cutoff
+    ).order_by('-id').values_list('id', flat=True).first() or 0
+
+
+class SyncChanges:
+    """
+    Changements visibles par un utilisateur entre la position `since` et
+    l'horizon du journal, limités à `limit` entrées (has_more sinon).
+    Sans position, tous les groupes de l'utilisateur sont envoyés en entier.
+    """
+
+    def __init__(self, user, since=None, limit=None):
+        horizon = sync_horizon()
+        self.group_ids = set(GroupMember.objects.filter(user=user).values_list('group_id', flat=True))
+        self.changed = defaultdict(set)
+        self.deleted = defaultdict(set)
+        self.has_more = False
+
+        if since is None:
+            self.full_groups = set(self.group_ids)
+            self.position = horizon
+            return
+
+        # Entrées des groupes actuels et adhésions de l'utilisateur (groupes quittés compris)
+        entries = list(
+            ChangeLogEntry.objects.filter(id__gt=since, id__lte=horizon).filter(
+                Q(group_id__in=self.group_ids) | Q(resource='member', user_id=user.id)
+            ).order_by('id').values_list('id', 'resource', 'object_id', 'op', 'group_id', 'user_id')[:limit + 1]
+        )
+        self.has_more = len(entries) > limit
+        entries = entries[:limit]
+        self.position = entries[-1][0] if self.has_more else max(since, horizon)
+
+        self.full_groups = set()
+        latest = {}
+        for _, resource, object_id, op, group_id, user_id in entries:
+            if resource == 'member' and user_id == user.id:
+                if group_id in self.group_ids:
+                    # Groupe rejoint : le client n'en a encore rien
+                    if op == 'create':
+                        self.full_groups.add(group_id)
+                else:
+                    self.deleted['group'].add(group_id)
+            latest[(resource, object_id)] = op
+        for (resource, object_id), op in latest.items():
+            (self.deleted if op == 'delete' else self.changed)[resource].add(object_id)
+
+    def scope(self, resource, group_path):
+        """Filtre des objets à envoyer : modifiés, ou appartenant à un groupe envoyé en entier."""
+        return Q(id__in=self.changed[resource]) | Q(**{f'{group_path}__in': self.full_groups})
+
+
+class SyncCompetitionSerializer(CompetitionSerializer):
+    """Compétition sans ses restaurants, synchronisés séparément."""
+
+    class Meta(CompetitionSerializer.Meta):
+        fields = [field for field in CompetitionSerializer.Meta.fields if field != 'restaurants']
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data.pop('restaurants', None)
+        return data
+
+
+def _project(projection, queryset):
+    return projection.represent(projection.queryset(queryset))
+
+
+def sync_payload(request, changes):
+    """
+    Objets créés ou modifiés (état actuel) et identifiants supprimés de chaque
+    ressource. Les objets modifiés puis devenus introuvables sont laissés à
+    l'entrée de suppression qui les suit dans le journal ; les enfants d'un
+    objet supprimé (restaurants d'une compétition...) n'ont pas forcément la
+    leur : le client les retire avec leur parent.
+    """
+    group_ids = changes.group_ids
+
+    groups = group_queryset(request.user).filter(changes.scope('group', 'id')).order_by('id')
+    members = GroupMember.objects.filter(group_id__in=group_ids).filter(
+        changes.scope('member', 'group_id')
+    ).order_by('id')
+    competitions = prefetch_plan(SyncCompetitionSerializer).apply(
+        Competition.objects.filter(group_id__in=group_ids).filter(
+            changes.scope('competition', 'group_id')
+        ).annotate(participant_count=Count('members')).prefetch_related('archive').order_by('id')
+    )
+    restaurants = Restaurant.objects.filter(competition__group_id__in=group_ids).filter(
+        changes.scope('restaurant', 'competition__group_id')
+    ).order_by('id')
+    ratings = Rating.objects.filter(restaurant__competition__group_id__in=group_ids).filter(
+        changes.scope('rating', 'restaurant__competition__group_id')
+    ).order_by('id')
+
+    context = {'request': request}
+    competitions = list(competitions)
+    updated = {
+        'groups': GroupSerializer(groups, many=True, context=context).data,
+        'members': _project(GroupMemberProjection(request), members),
+        'competitions': SyncCompetitionSerializer(competitions, many=True, context=context).data,
+        'restaurants': _project(RestaurantProjection(request), restaurants),
+        'ratings': _project(RatingProjection(request), ratings),
+    }
+
+    # Compétitions archivées (à l'archivage, ou groupe envoyé en entier) : restaurants
+    # et évaluations lus dans l'archive, puisqu'ils ne sont plus dans les tables actives
+    for competition in competitions:
+        archive = load_archive(competition)
+        if archive is None:
+            continue
+        projection = ArchivedRestaurantProjection(request, archive)
+        updated['restaurants'].extend(projection.represent(projection.attach_users(archive.restaurants)))
+        projection = RatingProjection(request)
+        updated['ratings'].extend(projection.represent(projection.attach_users(archive.ratings)))
+
+    return {
+        key: {'updated': updated[key], 'deleted': sorted(changes.deleted[resource])}
+        for resource, key in RESOURCES.items()
+    }
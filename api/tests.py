@@ -1,3 +1,332 @@
-from django.test import TestCase
+from datetime import date
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from competitions.archive import archive_competition
+from competitions.models import Competition, Participant
+from groups.models import Group, GroupMember
+from restaurants.models import Rating, Restaurant
+from users.models import User
+
+
+class GroupListTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com', password='x')
+            for i in range(6)
+        ]
+        cls.group = Group.objects.create(name='Six', creator=cls.users[0])
+        for user in cls.users:
+            GroupMember.objects.create(group=cls.group, user=user, role='admin' if user == cls.users[0] else 'member')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.users[1])
+
+    def test_member_count_counts_every_member(self):
+        response = self.client.get('/api/groups/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([group['member_count'] for group in response.data], [6])
+
+        response = self.client.get(f'/api/groups/{self.group.id}/')
+        self.assertEqual(response.data['member_count'], 6)
+        self.assertEqual(response.data['current_user_role'], 'member')
+
+
+@override_settings(NPLUSONE_MODE='raise', NPLUSONE_THRESHOLD=5)
+class NPlusOneTests(TestCase):
+    """Listes et détails principaux sans requête par objet (NPlusOneMiddleware lève sinon)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com', password='x')
+            for i in range(6)
+        ]
+        cls.groups = []
+        for g in range(6):
+            group = Group.objects.create(name=f'Groupe {g}', creator=cls.users[0])
+            for user in cls.users:
+                GroupMember.objects.create(group=group, user=user)
+            cls.groups.append(group)
+            competition = Competition.objects.create(
+                name=f'Compétition {g}', description='', creator=cls.users[0], group=group,
+                start_date=date(2024, 1, 1), end_date=date(2024, 12, 31), status='active',
+            )
+            for r, user in enumerate(cls.users):
+                Participant.objects.create(user=user, competition=competition)
+                restaurant = Restaurant.objects.create(
+                    name=f'Restaurant {g}-{r}', address=f'{r} rue {g}', cuisine_type=f'cuisine {r}',
+                    competition=competition, suggested_by=user, visit_date=date(2024, 2, 1),
+                )
+                for rater in cls.users:
+                    Rating.objects.create(
+                        restaurant=restaurant, user=rater,
+                        food_score=1 + (r + g) % 5, service_score=1 + r % 5,
+                        ambiance_score=1 + g % 5, value_score=3,
+                    )
+        cls.competition = cls.groups[0].competitions.first()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.users[0])
+
+    def test_list_endpoints(self):
+        for url in [
+            '/api/groups/', '/api/group-members/', '/api/competitions/',
+            '/api/restaurants/', '/api/ratings/', '/api/feed/',
+        ]:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_detail_endpoints(self):
+        group, competition = self.groups[0], self.competition
+        for url in [
+            f'/api/groups/{group.id}/', f'/api/groups/{group.id}/members/',
+            f'/api/competitions/{competition.id}/', f'/api/competitions/{competition.id}/results/',
+        ]:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+
+class RestaurantImportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='importer', email='importer@example.com', password='x')
+        cls.group = Group.objects.create(name='Import', creator=cls.user)
+        GroupMember.objects.create(group=cls.group, user=cls.user, role='admin')
+        cls.competition = Competition.objects.create(
+            name='Import', description='', creator=cls.user, group=cls.group,
+            start_date=date(2024, 1, 1), end_date=date(2024, 12, 31), status='active',
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def upload(self, content):
+        upload = SimpleUploadedFile('restaurants.csv', content, content_type='text/csv')
+        return self.client.post(
+            '/api/restaurants/import/', {'file': upload, 'competition': self.competition.id}, format='multipart',
+        )
+
+    def csv_rows(self, count):
+        # Même lieu pour toutes les lignes : un seul Place créé, le reste est rattaché
+        return [f'Chez Test,1 rue du Test,Bistrot {i},2024-02-01\n'.encode() for i in range(count)]
+
+    def test_binary_file(self):
+        response = self.upload(b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR' + bytes(range(256)))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('UTF-8', response.data['detail'])
+        self.assertFalse(Restaurant.objects.exists())
+
+    def test_bad_byte_mid_file(self):
+        rows = self.csv_rows(600)
+        rows[550] = rows[550].replace(b'Bistrot', b'Bistr\xe9t')
+        response = self.upload(b'name,address,cuisine_type,visit_date\n' + b''.join(rows))
+
+        self.assertEqual(response.status_code, 400)
+        created = Restaurant.objects.count()
+        # Les lignes décodées avant l'erreur sont importées, et le rapport le dit
+        self.assertGreater(created, 0)
+        self.assertLess(created, 550)
+        self.assertEqual(response.data['created'], created)
+        self.assertIn(f'{created} restaurant(s) déjà importé(s)', response.data['detail'])
+        self.assertEqual(response.data['errors'][-1]['line'], created + 2)
+
+
+class RestaurantScoreFilterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com', password='x')
+            for i in range(2)
+        ]
+        group = Group.objects.create(name='Notes', creator=cls.users[0])
+        for user in cls.users:
+            GroupMember.objects.create(group=group, user=user)
+        competition = Competition.objects.create(
+            name='Notes', description='', creator=cls.users[0], group=group,
+            start_date=date(2024, 1, 1), end_date=date(2024, 12, 31), status='active',
+        )
+        cls.restaurant = Restaurant.objects.create(
+            name='À mi-chemin', address='1 rue des Notes', cuisine_type='test',
+            competition=competition, suggested_by=cls.users[0], visit_date=date(2024, 2, 1),
+        )
+        # 3,0 et 3,5 : moyenne 3,25, affichée 3,2
+        Rating.objects.create(
+            restaurant=cls.restaurant, user=cls.users[0],
+            food_score=3, service_score=3, ambiance_score=3, value_score=3,
+        )
+        Rating.objects.create(
+            restaurant=cls.restaurant, user=cls.users[1],
+            food_score=4, service_score=4, ambiance_score=3, value_score=3,
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.users[0])
+
+    def test_filters_match_displayed_average(self):
+        response = self.client.get(f'/api/restaurants/{self.restaurant.id}/')
+        self.assertEqual(response.data['average_rating'], 3.2)
+        for query, expected in [
+            ('min_score=3.2', 1), ('min_score=3.3', 0), ('max_score=3.2', 1), ('max_score=3.1', 0),
+        ]:
+            with self.subTest(query=query):
+                response = self.client.get(f'/api/restaurants/?{query}')
+                self.assertEqual(len(response.data), expected)
+                for restaurant in response.data:
+                    self.assertEqual(restaurant['average_rating'], 3.2)
+
+
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class SyncTests(TestCase):
+    """Synchronisation incrémentale (/api/sync/) à partir du journal des changements."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com', password='x')
+            for i in range(2)
+        ]
+        cls.group = Group.objects.create(name='Partagé', creator=cls.users[0])
+        cls.other_group = Group.objects.create(name='Autre', creator=cls.users[1])
+        for user in cls.users:
+            GroupMember.objects.create(group=cls.group, user=user)
+        GroupMember.objects.create(group=cls.other_group, user=cls.users[1])
+        cls.competition, cls.other_competition = [
+            Competition.objects.create(
+                name=group.name, description='', creator=group.creator, group=group,
+                start_date=date(2024, 1, 1), end_date=date(2024, 12, 31), status='active',
+            )
+            for group in (cls.group, cls.other_group)
+        ]
+        cls.restaurants = [
+            Restaurant.objects.create(
+                name=f'Restaurant {r}', address=f'{r} rue de la Synchro', cuisine_type='test',
+                competition=cls.competition, suggested_by=cls.users[0], visit_date=date(2024, 2, 1),
+            )
+            for r in range(5)
+        ]
+        cls.other_restaurant = Restaurant.objects.create(
+            name='Ailleurs', address='1 rue Ailleurs', cuisine_type='test',
+            competition=cls.other_competition, suggested_by=cls.users[1], visit_date=date(2024, 2, 1),
+        )
+        cls.ratings = [
+            Rating.objects.create(
+                restaurant=cls.restaurants[0], user=user,
+                food_score=4, service_score=3, ambiance_score=5, value_score=2,
+            )
+            for user in cls.users
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.users[0])
+
+    def sync(self, token=None):
+        response = self.client.get('/api/sync/', {'since': token} if token else {})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def ids(self, data, key, part='updated'):
+        if part == 'deleted':
+            return set(data[key]['deleted'])
+        return {item['id'] for item in data[key]['updated']}
+
+    def test_delta_after_update_and_delete(self):
+        token = self.sync()['token']
+        restaurant = self.restaurants[1]
+        restaurant.name = 'Renommé'
+        restaurant.save()
+        rating_id = self.ratings[1].id
+        self.ratings[1].delete()
+
+        data = self.sync(token)
+        self.assertFalse(data['full'])
+        self.assertFalse(data['has_more'])
+        # La suppression d'une évaluation modifie aussi la moyenne de son restaurant
+        self.assertEqual(self.ids(data, 'restaurants'), {restaurant.id, self.restaurants[0].id})
+        renamed = [item for item in data['restaurants']['updated'] if item['id'] == restaurant.id]
+        self.assertEqual(renamed[0]['name'], 'Renommé')
+        self.assertEqual(self.ids(data, 'ratings', 'deleted'), {rating_id})
+
+        # Le jeton renvoyé se place après ces changements
+        data = self.sync(data['token'])
+        self.assertEqual(self.ids(data, 'restaurants'), set())
+        self.assertEqual(self.ids(data, 'ratings', 'deleted'), set())
+
+    def test_leave_sends_group_tombstone(self):
+        token = self.sync()['token']
+        GroupMember.objects.get(group=self.group, user=self.users[0]).delete()
+
+        data = self.sync(token)
+        self.assertEqual(self.ids(data, 'groups', 'deleted'), {self.group.id})
+        self.assertEqual(self.ids(data, 'restaurants'), set())
+
+    def test_join_sends_whole_group(self):
+        token = self.sync()['token']
+        GroupMember.objects.create(group=self.other_group, user=self.users[0])
+
+        data = self.sync(token)
+        self.assertIn(self.other_group.id, self.ids(data, 'groups'))
+        self.assertEqual(self.ids(data, 'competitions'), {self.other_competition.id})
+        self.assertEqual(self.ids(data, 'restaurants'), {self.other_restaurant.id})
+
+    @override_settings(SYNC_PAGE_SIZE=2)
+    def test_paging(self):
+        token = self.sync()['token']
+        for restaurant in self.restaurants:
+            restaurant.cuisine_type = 'modifiée'
+            restaurant.save()
+
+        pages = []
+        while True:
+            data = self.sync(token)
+            pages.append(data)
+            token = data['token']
+            if not data['has_more']:
+                break
+        self.assertEqual(len(pages), 3)
+        self.assertTrue(all(page['has_more'] for page in pages[:-1]))
+        self.assertEqual(
+            set().union(*(self.ids(page, 'restaurants') for page in pages)),
+            {restaurant.id for restaurant in self.restaurants},
+        )
+        self.assertEqual(self.ids(self.sync(token), 'restaurants'), set())
+
+    def test_invalid_token_falls_back_to_full_sync(self):
+        data = self.sync('jeton-invalide')
+        self.assertTrue(data['full'])
+        self.assertEqual(self.ids(data, 'groups'), {self.group.id})
+        self.assertEqual(self.ids(data, 'restaurants'), {restaurant.id for restaurant in self.restaurants})
+        self.assertEqual(self.ids(data, 'ratings'), {rating.id for rating in self.ratings})
+
+    def test_archived_competition(self):
+        token = self.sync()['token']
+        Competition.objects.filter(pk=self.competition.pk).update(status='completed')
+        self.competition.refresh_from_db()
+        archive_competition(self.competition)
+
+        # Restaurants et évaluations restent visibles, lus dans l'archive
+        data = self.sync(token)
+        self.assertEqual(self.ids(data, 'competitions'), {self.competition.id})
+        self.assertEqual(self.ids(data, 'restaurants'), {restaurant.id for restaurant in self.restaurants})
+        self.assertEqual(self.ids(data, 'ratings'), {rating.id for rating in self.ratings})
+        self.assertEqual(self.ids(data, 'restaurants', 'deleted'), set())
+
+    def test_place_ratings_include_archive(self):
+        place_id = self.restaurants[0].place_id
+        Competition.objects.filter(pk=self.competition.pk).update(status='completed')
+        self.competition.refresh_from_db()
+        archive_competition(self.competition)
+
+        response = self.client.get('/api/ratings/', {'place': place_id})
+        self.assertEqual({rating['id'] for rating in response.data}, {rating.id for rating in self.ratings})
@@ -0,0 +1,35 @@
+from django.db import connections, router
+
+
+def insert_ignore(model, **values):
+    """
+    Insère une ligne en une seule requête atomique
+    (INSERT ... ON CONFLICT DO NOTHING RETURNING pk) et renvoie sa clé
+    primaire, ou None si une contrainte d'unicité existait déjà : pas de
+    vérification préalable ni d'IntegrityError sous concurrence.
+    Les valeurs par défaut et auto_now_add sont appliquées comme par save(),
+    mais aucun signal n'est envoyé.
+    """
+    alias = router.db_for_write(model)
+    connection = connections[alias]
+    quote = connection.ops.quote_name
+    meta = model._meta
+    instance = model(**values)
+
+    fields = [
+        field for field in meta.local_concrete_fields
+        if not field.generated and not (field.primary_key and getattr(instance, field.attname) is None)
+    ]
+    params = [
+        field.get_db_prep_save(field.pre_save(instance, add=True), connection)
+        for field in fields
+    ]
+    sql = (
+        f"INSERT INTO {quote(meta.db_table)} ({', '.join(quote(field.column) for field in fields)}) "
+        f"VALUES ({', '.join(['%s'] * len(fields))}) "
+        f"ON CONFLICT DO NOTHING RETURNING {quote(meta.pk.column)}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    return row[0] if row else None
@@ -2,8 +2,8 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     UserViewSet, GroupViewSet, GroupMemberViewSet,
-    CompetitionViewSet, RestaurantViewSet, RatingViewSet,
-    CustomLoginView, get_csrf_token,
+    CompetitionViewSet, RestaurantViewSet, RatingViewSet, FeedViewSet,
+    CustomLoginView, get_csrf_token, database_stats, sync,
 )
 
 router = DefaultRouter()
@@ -13,6 +13,7 @@ router.register(r'group-members', GroupMemberViewSet, basename='groupmember')
 router.register(r'competitions', CompetitionViewSet, basename='competition')
 router.register(r'restaurants', RestaurantViewSet, basename='restaurant')
 router.register(r'ratings', RatingViewSet, basename='rating')
+router.register(r'feed', FeedViewSet, basename='feed')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -22,4 +23,8 @@ urlpatterns = [
     path('auth/registration/', include('dj_rest_auth.registration.urls')),
     # Endpoint pour initialiser le cookie CSRF côté frontend
     path('auth/csrf/', get_csrf_token, name='csrf_token'),
+    # Supervision des connexions à la base (administrateurs uniquement)
+    path('health/database/', database_stats, name='database_stats'),
+    # Synchronisation incrémentale des clients hors ligne (?since=<jeton>)
+    path('sync/', sync, name='sync'),
 ]
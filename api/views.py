@@ -1,16 +1,21 @@
+from collections import defaultdict
 from datetime import datetime, timedelta
-from rest_framework import viewsets, permissions, filters
-from django.db.models import Count
+from rest_framework import viewsets, mixins, permissions, filters
+from django.db.models import Avg, Count, OuterRef, Subquery
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import PermissionDenied
 from django.utils import timezone
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from rest_framework.generics import get_object_or_404
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.views.decorators.http import require_http_methods
 from dj_rest_auth.views import LoginView as DjLoginView
 from django.conf import settings as django_settings
+from django.db import connections, transaction
+import os
 
 
 @ensure_csrf_cookie
@@ -24,6 +29,56 @@ def get_csrf_token(request):
     return JsonResponse({'detail': 'ok'})
 
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def database_stats(request):
+    """
+    Statistiques des connexions du worker qui répond (pool psycopg ou connexion
+    persistante), pour la supervision. Chaque worker a son propre pool.
+    """
+    databases = {}
+    for alias in connections:
+        connection = connections[alias]
+        pool = getattr(connection, 'pool', None)
+        stats = {
+            'vendor': connection.vendor,
+            'pooled': pool is not None,
+            'conn_max_age': connection.settings_dict.get('CONN_MAX_AGE'),
+            'health_checks': connection.settings_dict.get('CONN_HEALTH_CHECKS'),
+            'connected': connection.connection is not None,
+        }
+        if pool is not None:
+            stats.update(
+                min_size=pool.min_size,
+                max_size=pool.max_size,
+                max_lifetime=pool.max_lifetime,
+                **pool.get_stats(),
+            )
+        databases[alias] = stats
+    return Response({'pid': os.getpid(), 'databases': databases})
+
+
+@api_view(['GET'])
+def sync(request):
+    """
+    Synchronisation incrémentale : objets créés, modifiés ou supprimés dans les
+    groupes de l'utilisateur depuis le jeton `since`, d'après le journal des
+    changements. Sans jeton (ou jeton invalide), envoie tout. La réponse porte
+    le jeton de l'appel suivant ; has_more indique qu'il faut rappeler tout de suite.
+    """
+    token = request.query_params.get('since')
+    since = read_token(token) if token else None
+    changes = SyncChanges(
+        request.user, since, limit=getattr(django_settings, 'SYNC_PAGE_SIZE', 1000)
+    )
+    return Response({
+        'token': make_token(changes.position),
+        'full': since is None,
+        'has_more': changes.has_more,
+        **sync_payload(request, changes),
+    })
+
+
 class CustomLoginView(DjLoginView):
     """
     Étend la vue de login pour supporter le paramètre remember_me.
@@ -49,15 +104,72 @@ class CustomLoginView(DjLoginView):
 
 from .serializers import (
     UserSerializer, GroupSerializer, GroupMemberSerializer,
-    CompetitionSerializer, RestaurantSerializer, RatingSerializer
+    CompetitionSerializer, RestaurantSerializer, RatingSerializer, ActivitySerializer,
+    RestaurantImportSerializer, group_queryset,
+)
+from .filters import RatingFilter, RestaurantFilter
+from .idempotency import idempotent
+from .pagination import KeysetPagination
+from .prefetch import PrefetchPlanMixin
+from .sync import SyncChanges, make_token, read_token, sync_payload
+from .upserts import insert_ignore
+from .projections import (
+    ProjectionListMixin, RestaurantProjection, RatingProjection, GroupMemberProjection,
+    ArchivedRestaurantProjection, ParticipantProjection,
 )
 
 from users.models import User
-from groups.models import Group, GroupInvitation, GroupMember, GroupFavorite
-from competitions.models import Competition, Participant
-from restaurants.models import Restaurant, Rating
+from groups.models import Activity, GroupInvitation, GroupMember, GroupFavorite, GroupRecommendation
+from groups.activity import record_activity
+from groups.changelog import change, log_changes
+from groups.contacts import refresh_contacts
+from groups.taste import compatibilities_for
+from competitions.archive import load_archive
+from competitions.models import ArchivedRestaurant, Competition, CompetitionResult, Participant
+from competitions.results import get_results
+from competitions.export import iter_archived_rating_rows, iter_rating_rows, stream_csv, stream_ndjson
+from restaurants.models import Restaurant, Rating, score_tenths_expression
+from restaurants.autocomplete import index as autocomplete_index
+from restaurants.importer import ImportFormatError, import_restaurants, open_csv
+
+def archived_restaurant(user, restaurant_id):
+    """Restaurant archivé visible par l'utilisateur : (archive, ligne) ou None."""
+    archived = ArchivedRestaurant.objects.filter(
+        pk=restaurant_id, competition__group__members=user
+    ).select_related('competition__archive').first()
+    if archived is None:
+        return None
+    archive = load_archive(archived.competition)
+    row = next(row for row in archive.restaurants if row['id'] == archived.pk)
+    return archive, row
 
-class UserViewSet(viewsets.ReadOnlyModelViewSet):
+
+def archived_place_ratings(user, place_id):
+    """Évaluations archivées des restaurants d'un lieu, dans les groupes de l'utilisateur."""
+    restaurant_ids = defaultdict(set)
+    competitions = {}
+    for archived in ArchivedRestaurant.objects.filter(
+        place_id=place_id, competition__group__members=user
+    ).select_related('competition__archive'):
+        restaurant_ids[archived.competition_id].add(archived.pk)
+        competitions[archived.competition_id] = archived.competition
+    return [
+        rating
+        for competition_id, competition in competitions.items()
+        for rating in load_archive(competition).ratings
+        if rating['restaurant_id'] in restaurant_ids[competition_id]
+    ]
+
+
+def ensure_competition_open(competition):
+    """Les restaurants et évaluations d'une compétition terminée sont figés."""
+    if competition.status == 'completed':
+        raise PermissionDenied(
+            "Cette compétition est terminée : ses restaurants et évaluations ne peuvent plus être modifiés."
+        )
+
+
+class UserViewSet(PrefetchPlanMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [filters.SearchFilter]
@@ -65,11 +177,10 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
 
     def get_queryset(self):
         # Limite la visibilité aux utilisateurs partageant au moins un groupe avec l'utilisateur connecté
-        user = self.request.user
-        group_ids = GroupMember.objects.filter(user=user).values_list('group_id', flat=True)
-        return User.objects.filter(custom_groups__in=group_ids).distinct()
+        # (table de contacts précalculée : une ligne par paire, donc pas de DISTINCT)
+        return User.objects.filter(visible_to__user=self.request.user)
 
-class GroupViewSet(viewsets.ModelViewSet):
+class GroupViewSet(PrefetchPlanMixin, viewsets.ModelViewSet):
     serializer_class = GroupSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [filters.SearchFilter, DjangoFilterBackend]
@@ -96,26 +207,8 @@ class GroupViewSet(viewsets.ModelViewSet):
         return self.update(request, *args, **kwargs)
 
     def get_queryset(self):
-        queryset = Group.objects.filter(
-            members=self.request.user
-        )
-        
-        # Pour le débogage - imprimez le nombre réel de membres pour chaque groupe
-        for group in queryset:
-            actual_members = GroupMember.objects.filter(group=group).count()
-            print(f"Group '{group.name}' (ID: {group.id}) has {actual_members} actual members")
-        
-        # Maintenant continuez avec les annotations
-        queryset = queryset.annotate(
-            member_count=Count('membership', distinct=True),
-            competition_count=Count('competitions', distinct=True)
-        ).prefetch_related('members', 'competitions')
-        
-        # Vérifiez le résultat après annotation
-        for group in queryset:
-            print(f"After annotation, Group '{group.name}' has member_count: {group.member_count}")
-        
-        return queryset
+        # Compteurs, favori et rôle calculés dans la requête principale (pas de requête par groupe)
+        return group_queryset(self.request.user)
     
     @action(detail=True, methods=['get'])
     def members(self, request, pk=None):
@@ -126,20 +219,29 @@ class GroupViewSet(viewsets.ModelViewSet):
             many=True,
             context={'request': request} 
         )
-        return Response(serializer.data)
+        # Compatibilité de goûts avec l'utilisateur connecté : une requête pour toutes les paires
+        compatibilities = compatibilities_for(group.id, request.user.id)
+        data = serializer.data
+        for item in data:
+            item['taste_compatibility'] = None if item['is_current_user'] else compatibilities.get(
+                item['user']['id'], {'score': None, 'shared_count': 0}
+            )
+        return Response(data)
     
     @action(detail=False, methods=['post'])
+    @idempotent
     def create_group(self, request):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        # Crée le groupe et ajoute le créateur comme membre admin
-        group = serializer.save(creator=request.user)
-        GroupMember.objects.create(
-            group=group,
-            user=request.user,
-            role='admin'
-        )
+        # Crée le groupe et ajoute le créateur comme membre admin (tout ou rien)
+        with transaction.atomic():
+            group = serializer.save(creator=request.user)
+            GroupMember.objects.create(
+                group=group,
+                user=request.user,
+                role='admin'
+            )
         
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
@@ -210,10 +312,11 @@ class GroupViewSet(viewsets.ModelViewSet):
             )
     
     @action(detail=False, methods=['post'], url_path='join/(?P<invitation_id>[^/.]+)')
+    @idempotent
     def join_with_invitation(self, request, invitation_id=None):
         """Permet à l'utilisateur de rejoindre un groupe via un lien d'invitation"""
         try:
-            invitation = GroupInvitation.objects.get(id=invitation_id, is_active=True)
+            invitation = GroupInvitation.objects.select_related('group').get(id=invitation_id, is_active=True)
             
             # Vérifier si l'invitation a expiré 
             if invitation.expires_at and invitation.expires_at < timezone.now():
@@ -227,8 +330,9 @@ class GroupViewSet(viewsets.ModelViewSet):
             group = invitation.group
             user = request.user
             
-            # Vérifier si l'utilisateur est déjà membre
-            if GroupMember.objects.filter(group=group, user=user).exists():
+            # Ajout en une seule requête : rien n'est inséré si l'utilisateur est déjà membre
+            member_id = insert_ignore(GroupMember, user=user, group=group, role='member')
+            if member_id is None:
                 return Response({
                     "detail": "Vous êtes déjà membre de ce groupe.",
                     "group": {
@@ -237,17 +341,13 @@ class GroupViewSet(viewsets.ModelViewSet):
                     }
                 })
             
-            # Ajouter l'utilisateur comme membre
-            GroupMember.objects.create(
-                user=user,
-                group=group,
-                role='member'
+            # insert_ignore n'émet pas post_save : contacts et journal de synchronisation mis à jour ici
+            refresh_contacts(user.id)
+            log_changes(
+                change('member', member_id, 'create', group.id, user.id),
+                change('group', group.id, 'update', group.id),
             )
-
-            updated_group = Group.objects.filter(id=group.id).annotate(
-                member_count=Count('membership', distinct=True),
-                competition_count=Count('competitions', distinct=True)
-            ).first()
+            record_activity(group.id, 'member_joined', actor=user)
             
             return Response({
                 "detail": "Vous avez rejoint le groupe avec succès.",
@@ -263,29 +363,44 @@ class GroupViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         
+    @action(detail=True, methods=['get'])
+    def recommendations(self, request, pk=None):
+        """Lieux recommandés au groupe, précalculés par la commande compute_recommendations"""
+        # Une seule requête : recommandations + appartenance au groupe
+        try:
+            recommendation = GroupRecommendation.objects.filter(
+                group_id=pk, group__members=request.user
+            ).values('group_id', 'data', 'computed_at').first()
+        except (TypeError, ValueError):
+            raise Http404
+        if recommendation is None:
+            # Pas encore calculées (liste vide) ou groupe inaccessible (404)
+            group = self.get_object()
+            return Response({'group': group.id, 'computed_at': None, 'recommendations': []})
+        return Response({
+            'group': recommendation['group_id'],
+            'computed_at': recommendation['computed_at'],
+            'recommendations': recommendation['data'],
+        })
+
     @action(detail=True, methods=['post'])
+    @idempotent
     def toggle_favorite(self, request, pk=None):
         """Ajoute ou retire un groupe des favoris de l'utilisateur."""
         group = self.get_object()
         user = request.user
         
-        # Vérifie si le groupe est déjà en favori
-        favorite_exists = GroupFavorite.objects.filter(
-            user=user, 
-            group=group
-        ).exists()
-        
-        if favorite_exists:
-            # Si oui, on le supprime
-            GroupFavorite.objects.filter(user=user, group=group).delete()
+        # Retire le favori s'il existe, sinon l'ajoute (insertion ignorée en cas de course)
+        removed, _ = GroupFavorite.objects.filter(user=user, group=group).delete()
+        if removed:
             return Response({"status": "removed", "message": "Groupe retiré des favoris"})
-        else:
-            # Sinon, on l'ajoute
-            GroupFavorite.objects.create(user=user, group=group)
-            return Response({"status": "added", "message": "Groupe ajouté aux favoris"})
+        if insert_ignore(GroupFavorite, user=user, group=group) is not None:
+            log_changes(change('group', group.id, 'update', group.id))
+        return Response({"status": "added", "message": "Groupe ajouté aux favoris"})
     
-class GroupMemberViewSet(viewsets.ModelViewSet):
+class GroupMemberViewSet(PrefetchPlanMixin, ProjectionListMixin, viewsets.ModelViewSet):
     serializer_class = GroupMemberSerializer
+    list_projection_class = GroupMemberProjection
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['group', 'user', 'role']
@@ -325,22 +440,32 @@ class GroupMemberViewSet(viewsets.ModelViewSet):
             )
         return super().destroy(request, *args, **kwargs)
     
-class CompetitionViewSet(viewsets.ModelViewSet):
+class CompetitionViewSet(PrefetchPlanMixin, viewsets.ModelViewSet):
     serializer_class = CompetitionSerializer
     filter_backends = [filters.SearchFilter, DjangoFilterBackend]
     search_fields = ['name', 'description']
     filterset_fields = ['group', 'creator', 'status']
     
     def get_queryset(self):
+        # select_related / prefetch_related : déduits de CompetitionSerializer (PrefetchPlanMixin) ;
+        # l'archive n'est chargée que pour les compétitions archivées
         return Competition.objects.filter(
             group__members=self.request.user
-        ).select_related(
-            'creator', 'group'
-        ).prefetch_related(
-            'members','restaurants'  # Important pour compter les participants
         ).annotate(
             participant_count=Count('members')
-        ).distinct()
+        ).prefetch_related('archive').distinct()
+
+    def perform_update(self, serializer):
+        if serializer.instance.is_archived:
+            raise PermissionDenied("Cette compétition est archivée : elle n'est plus modifiable.")
+        previous_status = serializer.instance.status
+        competition = serializer.save()
+        if competition.status != previous_status:
+            record_activity(
+                competition.group_id, 'competition_status_changed',
+                actor=self.request.user, competition=competition,
+                previous_status=previous_status, status=competition.status,
+            )
     
     @action(detail=False, methods=['post'])
     def create_competition(self, request):
@@ -355,50 +480,205 @@ class CompetitionViewSet(viewsets.ModelViewSet):
     def participants(self, request, pk=None):
         """Retourne la liste des participants d'une compétition spécifique"""
         competition = self.get_object()
+        archive = load_archive(competition)
+        if archive is not None:
+            projection = ParticipantProjection(request)
+            rows = projection.attach_users(archive.participants)
+            return Response([item['user'] for item in projection.represent(rows)])
         participants = competition.members.all()  # Utilisez le nom de la relation dans votre modèle
         serializer = UserSerializer(participants, many=True)
         return Response(serializer.data)
     
+    @action(detail=True, methods=['get'])
+    def export(self, request, pk=None):
+        """Exporte en flux toutes les évaluations de la compétition (?output=csv ou ndjson)"""
+        competition = get_object_or_404(
+            Competition.objects.filter(group__members=request.user), pk=pk
+        )
+        output = request.query_params.get('output', 'csv')
+        if output not in ('csv', 'ndjson'):
+            return Response(
+                {"detail": "Format d'export inconnu (csv ou ndjson)."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        archive = load_archive(competition)
+        rows = iter_archived_rating_rows(archive) if archive else iter_rating_rows(competition.id)
+        if output == 'csv':
+            response = StreamingHttpResponse(stream_csv(rows), content_type='text/csv; charset=utf-8')
+        else:
+            response = StreamingHttpResponse(stream_ndjson(rows), content_type='application/x-ndjson')
+        response['Content-Disposition'] = (
+            f'attachment; filename="competition-{competition.id}-ratings.{output}"'
+        )
+        return response
+
+    @action(detail=True, methods=['get'])
+    def results(self, request, pk=None):
+        """Classement, moyennes par critère et bilan des participants"""
+        # Compétition terminée : une seule requête (instantané + appartenance au groupe)
+        try:
+            snapshot = CompetitionResult.objects.filter(
+                competition_id=pk, competition__group__members=request.user
+            ).values_list('data', flat=True).first()
+        except (TypeError, ValueError):
+            raise Http404
+        if snapshot is not None:
+            return Response(snapshot)
+
+        competition = get_object_or_404(
+            Competition.objects.filter(group__members=request.user), pk=pk
+        )
+        return Response(get_results(competition))
+
     @action(detail=True, methods=['post'])
+    @idempotent
     def join(self, request, pk=None):
         """Permet à l'utilisateur authentifié de rejoindre une compétition"""
         competition = self.get_object()
         user = request.user
         
-        # Vérifier si l'utilisateur est déjà un participant
-        if competition.members.filter(id=user.id).exists():
+        # Ajout en une seule requête : rien n'est inséré si l'utilisateur participe déjà
+        if insert_ignore(Participant, user=user, competition=competition) is None:
             return Response(
                 {"detail": "Vous êtes déjà un participant de cette compétition."},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        # Ajouter l'utilisateur comme participant
-        Participant.objects.create(
-            user=user,
-            competition=competition
-        )
+        log_changes(change('competition', competition.id, 'update', competition.group_id))
         
         return Response(
             {"detail": "Vous avez rejoint la compétition avec succès."},
             status=status.HTTP_201_CREATED
         )
     
-class RestaurantViewSet(viewsets.ModelViewSet):
+class RestaurantViewSet(PrefetchPlanMixin, ProjectionListMixin, viewsets.ModelViewSet):
     serializer_class = RestaurantSerializer
-    filter_backends = [filters.SearchFilter, DjangoFilterBackend]
+    list_projection_class = RestaurantProjection
+    filter_backends = [filters.SearchFilter, DjangoFilterBackend, filters.OrderingFilter]
     search_fields = ['name', 'address', 'cuisine_type']
-    filterset_fields = ['competition', 'suggested_by']
+    filterset_class = RestaurantFilter
+    ordering_fields = ['name', 'visit_date', 'created_at', 'average_score']
     
     def get_queryset(self):
         # Récupérer les restaurants des compétitions des groupes dont l'utilisateur est membre
         user = self.request.user
-        return Restaurant.objects.filter(competition__group__members=user)
+        # Moyenne des notes globales affichées (arrondies au dixième) calculée en SQL,
+        # pour le tri (les filtres min/max_score comparent en entiers, voir RestaurantFilter)
+        average_score = Rating.objects.filter(
+            restaurant=OuterRef('pk')
+        ).values('restaurant').annotate(
+            average=Avg(score_tenths_expression()) / 10.0
+        ).values('average')
+        return Restaurant.objects.filter(
+            competition__group__members=user
+        ).annotate(average_score=Subquery(average_score))
+
+    def list(self, request, *args, **kwargs):
+        # ?competition= d'une compétition archivée : restaurants lus dans l'archive
+        competition_id = request.query_params.get('competition', '')
+        if competition_id.isdigit():
+            competition = Competition.objects.filter(
+                pk=competition_id, is_archived=True, group__members=request.user
+            ).select_related('archive').first()
+            if competition is not None:
+                archive = load_archive(competition)
+                projection = ArchivedRestaurantProjection(request, archive)
+                return Response(projection.represent(projection.attach_users(archive.restaurants)))
+        return super().list(request, *args, **kwargs)
 
-class RatingViewSet(viewsets.ModelViewSet):
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            pk = str(kwargs['pk'])
+            archived = archived_restaurant(request.user, pk) if pk.isdigit() else None
+            if archived is None:
+                raise
+        archive, row = archived
+        projection = ArchivedRestaurantProjection(request, archive)
+        return Response(projection.represent(projection.attach_users([row]))[0])
+
+    def perform_create(self, serializer):
+        ensure_competition_open(serializer.validated_data['competition'])
+        restaurant = serializer.save()
+        competition = restaurant.competition
+        record_activity(
+            competition.group_id, 'restaurant_suggested',
+            actor=self.request.user, competition=competition, restaurant=restaurant,
+        )
+
+    def perform_update(self, serializer):
+        ensure_competition_open(serializer.instance.competition)
+        if 'competition' in serializer.validated_data:
+            ensure_competition_open(serializer.validated_data['competition'])
+        serializer.save()
+
+    def perform_destroy(self, instance):
+        ensure_competition_open(instance.competition)
+        instance.delete()
+
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """Suggestions de noms de restaurants et de types de cuisine pour la saisie en cours"""
+        query = request.query_params.get('q', '')
+        try:
+            limit = min(int(request.query_params.get('limit', 10)), 50)
+        except ValueError:
+            limit = 10
+
+        # Limite les suggestions aux groupes de l'utilisateur
+        group_ids = GroupMember.objects.filter(
+            user=request.user
+        ).values_list('group_id', flat=True)
+
+        autocomplete_index.ensure_fresh()
+        return Response(autocomplete_index.search(query, group_ids, limit=limit))
+
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_csv(self, request):
+        """Importe un fichier CSV de restaurants dans une compétition (multipart : file, competition)"""
+        # Une seule vérification d'appartenance pour tout le fichier
+        params = RestaurantImportSerializer(data=request.data, context={'request': request})
+        params.is_valid(raise_exception=True)
+        competition = params.validated_data['competition']
+        ensure_competition_open(competition)
+
+        try:
+            reader = open_csv(params.validated_data['file'])
+        except ImportFormatError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        report = import_restaurants(reader, competition, request.user)
+        # Fichier illisible en cours de route : 400, le rapport indique ce qui a déjà été importé
+        success = report['created'] and 'detail' not in report
+        return Response(report, status=status.HTTP_201_CREATED if success else status.HTTP_400_BAD_REQUEST)
+
+class RatingViewSet(PrefetchPlanMixin, ProjectionListMixin, viewsets.ModelViewSet):
     serializer_class = RatingSerializer
-    filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['restaurant', 'user']
+    list_projection_class = RatingProjection
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_class = RatingFilter
+    ordering_fields = ['overall_score', 'created_at']
     
+    def list(self, request, *args, **kwargs):
+        # ?restaurant= d'un restaurant archivé : évaluations lues dans l'archive
+        restaurant_id = request.query_params.get('restaurant', '')
+        archived = archived_restaurant(request.user, restaurant_id) if restaurant_id.isdigit() else None
+        if archived is not None:
+            archive, row = archived
+            projection = RatingProjection(request)
+            ratings = [rating for rating in archive.ratings if rating['restaurant_id'] == row['id']]
+            return Response(projection.represent(projection.attach_users(ratings)))
+        response = super().list(request, *args, **kwargs)
+        # ?place= : les évaluations des compétitions archivées suivent celles des
+        # tables actives (les autres filtres et le tri ne portent que sur ces dernières)
+        place_id = request.query_params.get('place', '')
+        if place_id.isdigit():
+            ratings = archived_place_ratings(request.user, place_id)
+            if ratings:
+                projection = RatingProjection(request)
+                response.data.extend(projection.represent(projection.attach_users(ratings)))
+        return response
+
     def get_queryset(self):
         user = self.request.user
         # Filtre toujours par appartenance au groupe, même quand restaurant_id est fourni
@@ -408,5 +688,45 @@ class RatingViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(restaurant_id=restaurant_id)
         return queryset
 
+    def perform_create(self, serializer):
+        ensure_competition_open(serializer.validated_data['restaurant'].competition)
+        rating = serializer.save()
+        restaurant = rating.restaurant
+        competition = restaurant.competition
+        record_activity(
+            competition.group_id, 'rating_added',
+            actor=self.request.user, competition=competition, restaurant=restaurant,
+            overall_score=round(rating.overall_score, 1),
+        )
+
+    def perform_update(self, serializer):
+        ensure_competition_open(serializer.instance.restaurant.competition)
+        if 'restaurant' in serializer.validated_data:
+            ensure_competition_open(serializer.validated_data['restaurant'].competition)
+        serializer.save()
+
+    def perform_destroy(self, instance):
+        ensure_competition_open(instance.restaurant.competition)
+        instance.delete()
+
+class FeedViewSet(PrefetchPlanMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+    """Fil d'activité fusionné des groupes de l'utilisateur, paginé par clé (created_at, id)"""
+    serializer_class = ActivitySerializer
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['group', 'verb']
+
+    def get_queryset(self):
+        group_ids = GroupMember.objects.filter(
+            user=self.request.user
+        ).values('group_id')
+        return Activity.objects.filter(group_id__in=group_ids)
+
+    def get_keyset_partitions(self):
+        # Une page par groupe (index activity_group_feed_idx), fusionnées par KeysetPagination
+        return 'group_id', GroupMember.objects.filter(
+            user=self.request.user
+        ).values_list('group_id', flat=True)
+
 
 
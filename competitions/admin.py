@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Competition, Participant
+from .models import ArchivedCompetition, Competition, CompetitionResult, Participant
 
 admin.site.register(Competition)
 admin.site.register(Participant)
+admin.site.register(CompetitionResult)
+admin.site.register(ArchivedCompetition)
@@ -0,0 +1,143 @@
+import datetime
+import json
+import zlib
+from functools import cached_property
+
+from django.db import transaction
+from django.utils.dateparse import parse_date, parse_datetime
+
+from groups.changelog import change, changes_suppressed, log_changes
+from restaurants.aggregates import aggregates_suppressed
+from restaurants.models import Rating, Restaurant
+
+from .models import ArchivedCompetition, ArchivedRestaurant, Competition, CompetitionResult, Participant
+from .results import compute_results
+
+# Colonnes conservées : mêmes chemins values() que les projections de l'API
+RESTAURANT_FIELDS = [
+    'id', 'name', 'address', 'cuisine_type', 'suggested_by_id', 'competition_id',
+    'place_id', 'visit_date', 'image', 'created_at',
+]
+RATING_FIELDS = [
+    'id', 'restaurant_id', 'user_id', 'food_score', 'service_score', 'ambiance_score',
+    'value_score', 'comment', 'overall_score', 'created_at',
+]
+PARTICIPANT_FIELDS = ['user_id', 'joined_at']
+DATE_FIELDS = {'visit_date': parse_date, 'created_at': parse_datetime, 'joined_at': parse_datetime}
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def _encode(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    raise TypeError(f"Valeur non sérialisable : {value!r}")
+
+
+def _decode(rows):
+    for row in rows:
+        for field, parse in DATE_FIELDS.items():
+            if row.get(field) is not None:
+                row[field] = parse(row[field])
+    return rows
+
+
+class CompetitionArchive:
+    """Lecture d'une archive : lignes identiques à celles des requêtes values() d'origine."""
+
+    def __init__(self, archived):
+        self.archived = archived
+
+    @cached_property
+    def data(self):
+        return json.loads(zlib.decompress(bytes(self.archived.payload)))
+
+    @cached_property
+    def restaurants(self):
+        return _decode(self.data['restaurants'])
+
+    @cached_property
+    def ratings(self):
+        return _decode(self.data['ratings'])
+
+    @cached_property
+    def participants(self):
+        return _decode(self.data['participants'])
+
+    @property
+    def results(self):
+        return self.data['results']
+
+
+def load_archive(competition):
+    """Archive d'une compétition archivée (chargée une fois par instance)."""
+    if not competition.is_archived:
+        return None
+    cached = getattr(competition, '_archive_reader', None)
+    if cached is None:
+        cached = competition._archive_reader = CompetitionArchive(competition.archive)
+    return cached
+
+
+def archives_of(competitions):
+    """(compétition, archive) des compétitions archivées d'un queryset, chargées en une requête."""
+    for competition in competitions.filter(is_archived=True).select_related('archive').order_by('id'):
+        yield competition, load_archive(competition)
+
+
+def archive_competition(competition):
+    """
+    Déplace les restaurants, évaluations et participants d'une compétition
+    terminée dans un blob JSON compressé, avec l'instantané de ses résultats,
+    puis les supprime des tables actives. Les évaluations archivées restent
+    lues par les compatibilités de goûts, les recommandations et
+    /api/ratings/?place= : l'archivage ne retire rien de l'historique.
+    """
+    if competition.status != 'completed':
+        raise ArchiveError(f"La compétition {competition.id} n'est pas terminée.")
+    if competition.is_archived:
+        raise ArchiveError(f"La compétition {competition.id} est déjà archivée.")
+
+    with transaction.atomic():
+        restaurants = Restaurant.objects.filter(competition_id=competition.id)
+        ratings = Rating.objects.filter(restaurant__competition_id=competition.id)
+        participants = Participant.objects.filter(competition_id=competition.id)
+        snapshot = CompetitionResult.objects.filter(
+            competition_id=competition.id
+        ).values_list('data', flat=True).first() or compute_results(competition)
+
+        data = {
+            'restaurants': list(restaurants.order_by('id').values(*RESTAURANT_FIELDS)),
+            'ratings': list(ratings.order_by('id').values(*RATING_FIELDS)),
+            'participants': list(participants.order_by('id').values(*PARTICIPANT_FIELDS)),
+            'results': {**snapshot, 'finalized': True},
+        }
+        ArchivedCompetition.objects.create(
+            competition=competition,
+            payload=zlib.compress(json.dumps(data, default=_encode).encode(), 9),
+            restaurant_count=len(data['restaurants']),
+            rating_count=len(data['ratings']),
+        )
+        ArchivedRestaurant.objects.bulk_create(
+            ArchivedRestaurant(id=row['id'], competition_id=competition.id, place_id=row['place_id'])
+            for row in data['restaurants']
+        )
+
+        # update() : pas de signal post_save, qui refigerait des résultats désormais vides
+        Competition.objects.filter(pk=competition.pk).update(is_archived=True)
+        competition.is_archived = True
+        # Les restaurants restent visibles (lus dans l'archive) : pas de suppression
+        # dans le journal de synchronisation, seulement la compétition modifiée.
+        # Agrégats non mis à jour évaluation par évaluation : les histogrammes
+        # disparaissent avec les restaurants, les compatibilités (qui comptent
+        # aussi les évaluations archivées) ne changent pas
+        with changes_suppressed(), aggregates_suppressed():
+            participants.delete()
+            restaurants.delete()
+        log_changes(change('competition', competition.id, 'update', competition.group_id))
+        CompetitionResult.objects.update_or_create(
+            competition_id=competition.id, defaults={'data': data['results']}
+        )
+    return data
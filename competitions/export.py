@@ -0,0 +1,89 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from restaurants.models import Rating
+from users.models import User
+
+# Colonnes exportées : (nom dans le fichier, chemin ORM)
+EXPORT_COLUMNS = [
+    ('rating_id', 'id'),
+    ('restaurant_id', 'restaurant_id'),
+    ('restaurant_name', 'restaurant__name'),
+    ('cuisine_type', 'restaurant__cuisine_type'),
+    ('visit_date', 'restaurant__visit_date'),
+    ('user_id', 'user_id'),
+    ('username', 'user__username'),
+    ('food_score', 'food_score'),
+    ('service_score', 'service_score'),
+    ('ambiance_score', 'ambiance_score'),
+    ('value_score', 'value_score'),
+    ('comment', 'comment'),
+    ('created_at', 'created_at'),
+    ('overall_score', 'overall_score'),
+]
+HEADER = [name for name, _ in EXPORT_COLUMNS]
+OVERALL_INDEX = HEADER.index('overall_score')
+EXPORT_CHUNK_SIZE = 2000
+# Premiers caractères qu'un tableur interprète comme une formule
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def iter_rating_rows(competition_id, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Lignes plates des évaluations d'une compétition.
+
+    values_list() évite l'instanciation des modèles et iterator() utilise un
+    curseur côté serveur : la mémoire reste bornée à un lot de `chunk_size`.
+    """
+    rows = Rating.objects.filter(
+        restaurant__competition_id=competition_id
+    ).order_by('restaurant_id', 'id').values_list(
+        *[path for _, path in EXPORT_COLUMNS]
+    ).iterator(chunk_size=chunk_size)
+    for row in rows:
+        # Note globale calculée en base, arrondie comme dans l'API
+        yield row[:OVERALL_INDEX] + (round(row[OVERALL_INDEX], 1),) + row[OVERALL_INDEX + 1:]
+
+
+def iter_archived_rating_rows(archive):
+    """Mêmes lignes que iter_rating_rows, lues dans l'archive d'une compétition."""
+    restaurants = {restaurant['id']: restaurant for restaurant in archive.restaurants}
+    usernames = dict(User.objects.filter(
+        id__in={rating['user_id'] for rating in archive.ratings}
+    ).values_list('id', 'username'))
+    for rating in sorted(archive.ratings, key=lambda rating: (rating['restaurant_id'], rating['id'])):
+        restaurant = restaurants[rating['restaurant_id']]
+        values = {
+            **{f'restaurant__{field}': value for field, value in restaurant.items()},
+            **rating,
+            'user__username': usernames.get(rating['user_id']),
+        }
+        row = tuple(values[path] for _, path in EXPORT_COLUMNS)
+        yield row[:OVERALL_INDEX] + (round(row[OVERALL_INDEX], 1),) + row[OVERALL_INDEX + 1:]
+
+
+class _Echo:
+    """Pseudo-fichier dont write() renvoie la ligne au lieu de la stocker."""
+    def write(self, value):
+        return value
+
+
+def _csv_cell(value):
+    """Neutralise les textes saisis (noms, commentaires) qu'un tableur exécuterait comme formule."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(HEADER)
+    for row in rows:
+        yield writer.writerow([_csv_cell(value) for value in row])
+
+
+def stream_ndjson(rows):
+    for row in rows:
+        yield json.dumps(dict(zip(HEADER, row)), cls=DjangoJSONEncoder) + '\n'
@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from competitions.archive import archive_competition
+from competitions.models import Competition
+
+
+class Command(BaseCommand):
+    help = (
+        "Archive les compétitions terminées depuis plus de --older-than jours : "
+        "leurs restaurants, évaluations et participants quittent les tables actives."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, default=365, help="Ancienneté minimale (jours) de end_date.")
+        parser.add_argument('--limit', type=int, default=None, help="Nombre maximal de compétitions archivées.")
+        parser.add_argument('--dry-run', action='store_true', help="Liste les compétitions sans les archiver.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now().date() - timedelta(days=options['older_than'])
+        competitions = Competition.objects.filter(
+            status='completed', is_archived=False, end_date__lt=cutoff
+        ).order_by('end_date', 'id')
+        if options['limit']:
+            competitions = competitions[:options['limit']]
+
+        archived = 0
+        for competition in competitions:
+            if options['dry_run']:
+                self.stdout.write(f"{competition.id} {competition.name} (fin {competition.end_date})")
+                continue
+            # Une transaction par compétition : une erreur n'annule pas les précédentes
+            data = archive_competition(competition)
+            archived += 1
+            self.stdout.write(
+                f"{competition.id} {competition.name} : {len(data['restaurants'])} restaurant(s), "
+                f"{len(data['ratings'])} évaluation(s) archivés"
+            )
+
+        if not options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f"{archived} compétition(s) archivée(s)."))
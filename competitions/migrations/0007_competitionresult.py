@@ -0,0 +1,31 @@
+# Generated by Django 5.1.7 on 2026-10-19 19:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("competitions", "0006_alter_competition_members_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CompetitionResult",
+            fields=[
+                (
+                    "competition",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="result",
+                        serialize=False,
+                        to="competitions.competition",
+                    ),
+                ),
+                ("data", models.JSONField()),
+                ("computed_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.7 on 2026-10-19 19:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("competitions", "0007_competitionresult"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="competition",
+            name="bayesian_prior_weight",
+            field=models.PositiveSmallIntegerField(default=3),
+        ),
+        migrations.AddField(
+            model_name="competition",
+            name="criterion_weights",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name="competition",
+            name="ranking_strategy",
+            field=models.CharField(
+                choices=[
+                    ("average", "Moyenne"),
+                    ("bayesian", "Moyenne bayésienne"),
+                    ("normalized", "Normalisée par évaluateur"),
+                ],
+                default="average",
+                max_length=10,
+            ),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.1.7 on 2026-10-19 19:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("competitions", "0008_competition_ranking"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedCompetition",
+            fields=[
+                (
+                    "competition",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="archive",
+                        serialize=False,
+                        to="competitions.competition",
+                    ),
+                ),
+                ("payload", models.BinaryField()),
+                ("restaurant_count", models.PositiveIntegerField(default=0)),
+                ("rating_count", models.PositiveIntegerField(default=0)),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="competition",
+            name="is_archived",
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.CreateModel(
+            name="ArchivedRestaurant",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                (
+                    "competition",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_restaurants",
+                        to="competitions.competition",
+                    ),
+                ),
+            ],
+        ),
+    ]
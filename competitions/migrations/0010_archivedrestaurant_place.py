@@ -0,0 +1,47 @@
+# Generated by Django 5.1.7 on 2026-10-19 20:14
+
+import json
+import zlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def index_archived_places(apps, schema_editor):
+    ArchivedCompetition = apps.get_model("competitions", "ArchivedCompetition")
+    ArchivedRestaurant = apps.get_model("competitions", "ArchivedRestaurant")
+    Place = apps.get_model("restaurants", "Place")
+
+    for archived in ArchivedCompetition.objects.iterator():
+        data = json.loads(zlib.decompress(bytes(archived.payload)))
+        places = {row["id"]: row["place_id"] for row in data["restaurants"]}
+        # Lieux fusionnés depuis l'archivage : le restaurant reste sans lieu
+        existing = set(Place.objects.filter(pk__in=set(places.values()) - {None}).values_list("pk", flat=True))
+        restaurants = list(ArchivedRestaurant.objects.filter(competition_id=archived.competition_id))
+        for restaurant in restaurants:
+            place_id = places.get(restaurant.id)
+            restaurant.place_id = place_id if place_id in existing else None
+        ArchivedRestaurant.objects.bulk_update(restaurants, ["place"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("competitions", "0009_archive"),
+        ("restaurants", "0008_place_normalized_key_unique"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archivedrestaurant",
+            name="place",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="archived_restaurants",
+                to="restaurants.place",
+            ),
+        ),
+        migrations.RunPython(index_archived_places, migrations.RunPython.noop),
+    ]
@@ -36,6 +36,24 @@ class Competition(models.Model):
         default='planning'
     )
 
+    RANKING_STRATEGY_CHOICES = [
+        ('average', 'Moyenne'),
+        ('bayesian', 'Moyenne bayésienne'),
+        ('normalized', 'Normalisée par évaluateur'),
+    ]
+    ranking_strategy = models.CharField(
+        max_length=10,
+        choices=RANKING_STRATEGY_CHOICES,
+        default='average'
+    )
+    # Poids par critère ({"food": 2, ...}) ; critère absent = poids 1
+    criterion_weights = models.JSONField(default=dict, blank=True)
+    # Nombre d'évaluations fictives à la moyenne générale ajoutées en bayésien
+    bayesian_prior_weight = models.PositiveSmallIntegerField(default=3)
+
+    # Restaurants, évaluations et participants déplacés dans ArchivedCompetition
+    is_archived = models.BooleanField(default=False, db_index=True)
+
     created_at = models.DateField(auto_now_add=True)
     updated_at = models.DateField(auto_now=True)
 
@@ -56,4 +74,58 @@ class Participant(models.Model):
         unique_together = ('user', 'competition')
         
     def __str__(self):
-        return f"{self.user.username} - {self.competition.name}"
\ No newline at end of file
+        return f"{self.user.username} - {self.competition.name}"
+
+class CompetitionResult(models.Model):
+    """Résultats figés d'une compétition terminée (classement, moyennes, participants)"""
+    competition = models.OneToOneField(
+        Competition,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='result'
+    )
+    data = models.JSONField()
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Résultats de {self.competition_id}"
+
+
+class ArchivedCompetition(models.Model):
+    """
+    Données d'une compétition archivée (restaurants, évaluations, participants,
+    résultats), sérialisées en JSON compressé hors des tables actives.
+    """
+    competition = models.OneToOneField(
+        Competition,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='archive'
+    )
+    payload = models.BinaryField()
+    restaurant_count = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archive de {self.competition_id}"
+
+
+class ArchivedRestaurant(models.Model):
+    """Index des restaurants archivés : identifiant d'origine -> compétition archivée et lieu"""
+    id = models.BigIntegerField(primary_key=True)
+    competition = models.ForeignKey(
+        Competition,
+        on_delete=models.CASCADE,
+        related_name='archived_restaurants'
+    )
+    place = models.ForeignKey(
+        'restaurants.Place',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='archived_restaurants'
+    )
+
+    def __str__(self):
+        return f"Restaurant archivé {self.id}"
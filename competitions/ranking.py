@@ -0,0 +1,63 @@
+import numpy as np
+
+from restaurants.models import SCORE_CRITERIA
+
+
+def criterion_weights(competition):
+    """Vecteur des poids normalisés (somme 1) dans l'ordre de SCORE_CRITERIA."""
+    weights = np.array(
+        [float(competition.criterion_weights.get(criterion, 1)) for criterion in SCORE_CRITERIA]
+    )
+    if weights.sum() <= 0:
+        weights = np.ones(len(SCORE_CRITERIA))
+    return weights / weights.sum()
+
+
+def ranking_scores(competition, restaurant_ids, ratings):
+    """
+    Score de classement de chaque restaurant selon la stratégie de la compétition.
+
+    `ratings` contient des tuples (restaurant, utilisateur, note par critère...)
+    dans l'ordre de SCORE_CRITERIA. Le calcul se fait en une passe vectorisée
+    sur la matrice des notes :
+    - average : moyenne des notes pondérées par critère ;
+    - bayesian : moyenne tirée vers la moyenne générale par
+      `bayesian_prior_weight` évaluations fictives, pour ne pas classer
+      premier un restaurant noté une seule fois ;
+    - normalized : notes centrées-réduites par évaluateur (annule les
+      évaluateurs sévères ou généreux), ramenées sur l'échelle 1-5.
+    Retourne {restaurant: score}, None pour un restaurant sans évaluation.
+    """
+    scores = {restaurant_id: None for restaurant_id in restaurant_ids}
+    if not ratings:
+        return scores
+
+    matrix = np.array(ratings, dtype=float)
+    restaurants, restaurant_index = np.unique(matrix[:, 0].astype(np.int64), return_inverse=True)
+    _, user_index = np.unique(matrix[:, 1].astype(np.int64), return_inverse=True)
+    overall = matrix[:, 2:] @ criterion_weights(competition)
+
+    counts = np.bincount(restaurant_index)
+    strategy = competition.ranking_strategy
+    if strategy == 'normalized':
+        user_counts = np.bincount(user_index)
+        user_means = np.bincount(user_index, weights=overall) / user_counts
+        user_stds = np.sqrt(
+            np.bincount(user_index, weights=(overall - user_means[user_index]) ** 2) / user_counts
+        )
+        # Évaluateur à une seule note ou toujours identique : écart nul, z = 0
+        safe_stds = np.where(user_stds > 0, user_stds, 1)
+        z_scores = np.where(
+            user_stds[user_index] > 0, (overall - user_means[user_index]) / safe_stds[user_index], 0
+        )
+        values = overall.mean() + overall.std() * np.bincount(restaurant_index, weights=z_scores) / counts
+    elif strategy == 'bayesian':
+        prior_weight = competition.bayesian_prior_weight
+        totals = np.bincount(restaurant_index, weights=overall)
+        values = (totals + prior_weight * overall.mean()) / (counts + prior_weight)
+    else:
+        values = np.bincount(restaurant_index, weights=overall) / counts
+
+    for restaurant_id, value in zip(restaurants.tolist(), values.tolist()):
+        scores[restaurant_id] = round(value, 2)
+    return scores
@@ -0,0 +1,143 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from restaurants.histograms import histograms_for
+from restaurants.models import SCORE_CRITERIA, Rating, Restaurant
+from users.models import User
+
+from .models import CompetitionResult, Participant
+from .ranking import ranking_scores
+
+
+def _mean(values, digits):
+    return round(sum(values) / len(values), digits) if values else 0
+
+
+def compute_results(competition):
+    """
+    Calcule les résultats d'une compétition à partir des restaurants et des
+    évaluations (requêtes values(), sans instancier de modèle).
+    Les moyennes suivent les mêmes arrondis que Rating.overall_score et
+    Restaurant.average_rating ; le classement suit la stratégie de la
+    compétition (voir ranking.py).
+    """
+    restaurants = list(Restaurant.objects.filter(
+        competition_id=competition.id
+    ).values('id', 'name', 'cuisine_type', 'place_id', 'suggested_by_id'))
+    ratings = list(Rating.objects.filter(
+        restaurant__competition_id=competition.id
+    ).values_list('restaurant_id', 'user_id', *[f'{criterion}_score' for criterion in SCORE_CRITERIA]))
+
+    by_restaurant = defaultdict(list)
+    by_user = defaultdict(list)
+    criteria_totals = defaultdict(list)
+    for restaurant_id, user_id, *scores in ratings:
+        overall = round(sum(scores) / 4, 1)
+        by_restaurant[restaurant_id].append((overall, scores))
+        by_user[user_id].append(overall)
+        for criterion, score in zip(SCORE_CRITERIA, scores):
+            criteria_totals[criterion].append(score)
+
+    restaurant_ids = [restaurant['id'] for restaurant in restaurants]
+    histograms = histograms_for(restaurant_ids)
+    ranking_score = ranking_scores(competition, restaurant_ids, ratings)
+    ranking = []
+    for restaurant in restaurants:
+        restaurant_ratings = by_restaurant.get(restaurant['id'], [])
+        ranking.append({
+            'restaurant': restaurant['id'],
+            'name': restaurant['name'],
+            'cuisine_type': restaurant['cuisine_type'],
+            'place': restaurant['place_id'],
+            'score': ranking_score[restaurant['id']],
+            'average_rating': _mean([overall for overall, _ in restaurant_ratings], 1),
+            'rating_count': len(restaurant_ratings),
+            'criteria': {
+                criterion: _mean([scores[i] for _, scores in restaurant_ratings], 2)
+                for i, criterion in enumerate(SCORE_CRITERIA)
+            },
+            'score_histogram': histograms[restaurant['id']],
+        })
+    # Restaurants sans évaluation en fin de classement
+    ranking.sort(key=lambda entry: (
+        entry['score'] is None, -(entry['score'] or 0), -entry['rating_count'], entry['name']
+    ))
+    # Rang partagé en cas d'égalité (1, 2, 2, 4...)
+    rank, previous_key = 0, None
+    for position, entry in enumerate(ranking, start=1):
+        key = (entry['score'], entry['rating_count'])
+        if key != previous_key:
+            rank, previous_key = position, key
+        ranking[position - 1] = {'rank': rank, **entry}
+
+    suggested = defaultdict(int)
+    for restaurant in restaurants:
+        suggested[restaurant['suggested_by_id']] += 1
+    participant_ids = set(Participant.objects.filter(
+        competition_id=competition.id
+    ).values_list('user_id', flat=True))
+    users = User.objects.filter(
+        Q(id__in=participant_ids) | Q(id__in=set(by_user) | set(suggested))
+    ).order_by('username').values('id', 'username')
+    participants = [
+        {
+            'user': user['id'],
+            'username': user['username'],
+            'rating_count': len(by_user.get(user['id'], [])),
+            'average_given': _mean(by_user.get(user['id'], []), 2),
+            'restaurants_suggested': suggested.get(user['id'], 0),
+        }
+        for user in users
+    ]
+
+    return {
+        'competition': competition.id,
+        'name': competition.name,
+        'status': competition.status,
+        'ranking_strategy': competition.ranking_strategy,
+        'restaurant_count': len(restaurants),
+        'rating_count': sum(len(values) for values in by_restaurant.values()),
+        'criteria': {criterion: _mean(criteria_totals[criterion], 2) for criterion in SCORE_CRITERIA},
+        'ranking': ranking,
+        'participants': participants,
+    }
+
+
+def finalize_competition(competition):
+    """Fige (ou refige) les résultats d'une compétition terminée."""
+    with transaction.atomic():
+        data = compute_results(competition)
+        data['finalized'] = True
+        data['computed_at'] = timezone.now().isoformat()
+        result, _ = CompetitionResult.objects.update_or_create(
+            competition_id=competition.id, defaults={'data': data}
+        )
+    return result
+
+
+def invalidate_results(competition_id):
+    """Supprime l'instantané : il sera recalculé à la prochaine lecture."""
+    CompetitionResult.objects.filter(competition_id=competition_id).delete()
+
+
+def get_results(competition):
+    """
+    Résultats d'une compétition : l'instantané pour une compétition terminée
+    (recalculé s'il a été invalidé), un calcul à la volée sinon.
+    """
+    if competition.status != 'completed':
+        data = compute_results(competition)
+        data['finalized'] = False
+        return data
+    snapshot = CompetitionResult.objects.filter(
+        competition_id=competition.id
+    ).values_list('data', flat=True).first()
+    if snapshot is None and competition.is_archived:
+        from .archive import load_archive
+        snapshot = load_archive(competition).results
+    elif snapshot is None:
+        snapshot = finalize_competition(competition).data
+    return snapshot
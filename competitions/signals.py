@@ -0,0 +1,67 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from groups.changelog import change, group_of, log_changes
+from restaurants.aggregates import aggregates_suppressed_now
+from restaurants.models import Rating, Restaurant
+
+from .models import Competition, CompetitionResult, Participant
+from .results import finalize_competition, invalidate_results
+
+
+@receiver(post_save, sender=Competition)
+def snapshot_completed_competition(sender, instance, **kwargs):
+    # Archivée : les tables actives sont vides, l'instantané reste celui de l'archive
+    if instance.is_archived:
+        return
+    # Fige les résultats à la clôture, refige après une modification (admin)
+    if instance.status == 'completed':
+        finalize_competition(instance)
+    else:
+        invalidate_results(instance.id)
+
+
+@receiver(post_save, sender=Restaurant)
+@receiver(post_delete, sender=Restaurant)
+def invalidate_results_on_restaurant_change(sender, instance, **kwargs):
+    if aggregates_suppressed_now():
+        return
+    invalidate_results(instance.competition_id)
+
+
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+def invalidate_results_on_rating_change(sender, instance, **kwargs):
+    if aggregates_suppressed_now():
+        return
+    # Seules les compétitions terminées ont un instantané : requête sans effet sinon
+    CompetitionResult.objects.filter(
+        competition__restaurants=instance.restaurant_id
+    ).delete()
+
+
+@receiver(post_save, sender=Competition)
+def log_competition_save(sender, instance, created, **kwargs):
+    entries = [change('competition', instance.id, 'create' if created else 'update', instance.group_id)]
+    if created:
+        # Nombre de compétitions du groupe
+        entries.append(change('group', instance.group_id, 'update', instance.group_id))
+    log_changes(*entries)
+
+
+@receiver(post_delete, sender=Competition)
+def log_competition_delete(sender, instance, **kwargs):
+    log_changes(
+        change('competition', instance.id, 'delete', instance.group_id),
+        change('group', instance.group_id, 'update', instance.group_id),
+    )
+
+
+@receiver(post_save, sender=Participant)
+@receiver(post_delete, sender=Participant)
+def log_participant_change(sender, instance, **kwargs):
+    # Les participants font partie de la représentation de la compétition
+    log_changes(change(
+        'competition', instance.competition_id, 'update',
+        group_of(Competition.objects.filter(pk=instance.competition_id).values('group_id')),
+    ))
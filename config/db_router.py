@@ -0,0 +1,108 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+
+# Vrai pendant une requête en lecture seule autorisée à lire sur un réplica
+_use_replica = ContextVar('use_replica', default=False)
+
+PIN_COOKIE = 'foodle-primary-pin'
+PIN_HEADER = 'HTTP_X_PRIMARY_PIN'
+PIN_RESPONSE_HEADER = 'X-Primary-Pin'
+PIN_SALT = 'config.db_router.primary-pin'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def replica_aliases():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+class ReplicaRouter:
+    """
+    Envoie les lectures des requêtes GET/HEAD/OPTIONS vers un réplica.
+
+    Tout le reste (écritures, commandes, tâches, lectures dans une
+    transaction) reste sur la base principale. Dès qu'une écriture a lieu
+    pendant une requête, les lectures suivantes de cette requête repassent
+    aussi sur la principale.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = replica_aliases()
+        if not replicas or not _use_replica.get():
+            return 'default'
+        if connections['default'].in_atomic_block:
+            return 'default'
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        _use_replica.set(False)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Les réplicas contiennent les mêmes données que la principale
+        aliases = {'default', *replica_aliases()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+def _is_pinned(request):
+    """
+    Vrai si le client a écrit récemment (cookie ou header renvoyé par le client).
+
+    Le marqueur est signé et horodaté par le serveur : un client ne peut pas
+    prolonger son maintien sur la principale au-delà du délai.
+    """
+    sticky_seconds = getattr(settings, 'DATABASE_REPLICA_STICKY_SECONDS', 5)
+    for marker in (request.COOKIES.get(PIN_COOKIE), request.META.get(PIN_HEADER)):
+        if not marker:
+            continue
+        try:
+            signing.loads(marker, salt=PIN_SALT, max_age=sticky_seconds)
+        except signing.BadSignature:
+            continue
+        return True
+    return False
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Active la lecture sur réplica pour les méthodes sûres et garantit la
+    lecture de ses propres écritures : après une requête d'écriture, le
+    client reçoit un marqueur (cookie + header X-Primary-Pin) qui le
+    maintient sur la principale pendant DATABASE_REPLICA_STICKY_SECONDS,
+    le temps que les réplicas rattrapent leur retard.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not replica_aliases():
+            return self.get_response(request)
+
+        use_replica = request.method in SAFE_METHODS and not _is_pinned(request)
+        token = _use_replica.set(use_replica)
+        try:
+            response = self.get_response(request)
+        finally:
+            _use_replica.reset(token)
+
+        if request.method not in SAFE_METHODS:
+            marker = signing.dumps(True, salt=PIN_SALT)
+            sticky_seconds = getattr(settings, 'DATABASE_REPLICA_STICKY_SECONDS', 5)
+            response.set_cookie(
+                PIN_COOKIE, marker,
+                max_age=sticky_seconds,
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite='Lax',
+            )
+            response[PIN_RESPONSE_HEADER] = marker
+        return response
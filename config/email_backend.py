@@ -7,14 +7,43 @@ class ResendEmailBackend(BaseEmailBackend):
     """
     Backend email Django qui utilise l'API HTTP de Resend.
     Contourne les restrictions SMTP des hébergeurs cloud (ports 25/465/587 bloqués).
+    Plusieurs messages envoyés ensemble partent par lots via l'API batch
+    (un appel HTTP pour 100 emails au maximum).
     """
 
+    # Limite imposée par l'API batch de Resend
+    batch_size = 100
+
     def open(self):
         resend.api_key = settings.RESEND_API_KEY
 
     def close(self):
         pass
 
+    def _build_params(self, message):
+        # Construit le corps du mail (HTML ou texte brut)
+        alternatives = getattr(message, 'alternatives', None)
+        if alternatives:
+            html_body = next(
+                (content for content, mimetype in alternatives
+                 if mimetype == 'text/html'),
+                None
+            )
+        else:
+            html_body = None
+
+        params = {
+            "from": message.from_email or settings.DEFAULT_FROM_EMAIL,
+            "to": message.to,
+            "subject": message.subject,
+            "text": message.body,
+        }
+
+        if html_body:
+            params["html"] = html_body
+
+        return params
+
     def send_messages(self, email_messages):
         if not email_messages:
             return 0
@@ -22,32 +51,22 @@ class ResendEmailBackend(BaseEmailBackend):
         self.open()
         sent = 0
 
-        for message in email_messages:
+        if len(email_messages) == 1:
             try:
-                # Construit le corps du mail (HTML ou texte brut)
-                if message.alternatives:
-                    html_body = next(
-                        (content for content, mimetype in message.alternatives
-                         if mimetype == 'text/html'),
-                        None
-                    )
-                else:
-                    html_body = None
-
-                params = {
-                    "from": message.from_email or settings.DEFAULT_FROM_EMAIL,
-                    "to": message.to,
-                    "subject": message.subject,
-                    "text": message.body,
-                }
-
-                if html_body:
-                    params["html"] = html_body
-
-                resend.Emails.send(params)
+                resend.Emails.send(self._build_params(email_messages[0]))
                 sent += 1
             except Exception as e:
                 if not self.fail_silently:
                     raise e
+            return sent
+
+        for start in range(0, len(email_messages), self.batch_size):
+            batch = email_messages[start:start + self.batch_size]
+            try:
+                resend.Batch.send([self._build_params(message) for message in batch])
+                sent += len(batch)
+            except Exception as e:
+                if not self.fail_silently:
+                    raise e
 
         return sent
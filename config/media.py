@@ -0,0 +1,135 @@
+import os
+import re
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags, quote_etag
+from django.views.decorators.http import require_http_methods
+
+from .storage import hashed_name
+
+# Un nom par empreinte ne change jamais de contenu : cache d'un an, sans revalidation
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Anciens fichiers (noms d'origine) : revalidés via l'ETag
+MUTABLE_CACHE_CONTROL = 'public, max-age=3600'
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class FileRange:
+    """
+    Portion [start, start + length) d'un fichier ouvert. fileno() reste exposé :
+    le file_wrapper de Gunicorn l'envoie par sendfile() depuis la position
+    courante, dans la limite du Content-Length ; ailleurs read() est borné.
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.name = file.name
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    (début, fin incluse) d'un en-tête Range à une seule plage, None s'il est
+    absent ou non pris en charge (réponse complète), ValueError s'il ne peut
+    pas être satisfait.
+    """
+    match = _RANGE_RE.match(header.replace(' ', '')) if header else None
+    if match is None or match.group(1) == match.group(2) == '':
+        return None
+    start, end = match.groups()
+    if start == '':
+        # bytes=-N : les N derniers octets
+        length = int(end)
+        if length == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = size - 1 if end == '' else min(int(end), size - 1)
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def _set_headers(response, headers):
+    for header, value in headers.items():
+        response[header] = value
+
+
+@require_http_methods(['GET', 'HEAD'])
+def serve_media(request, path):
+    """
+    Sert un fichier de MEDIA_ROOT : ETag, réponses 304, plages d'octets (206)
+    et cache immuable pour les noms par empreinte de ContentAddressedStorage.
+    """
+    try:
+        full_path = default_storage.path(path)
+    except SuspiciousFileOperation:
+        raise Http404
+    try:
+        stat = os.stat(full_path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    digest = hashed_name(path)
+    etag = quote_etag(digest or f'{int(stat.st_mtime):x}-{stat.st_size:x}')
+    headers = {
+        'ETag': etag,
+        'Cache-Control': IMMUTABLE_CACHE_CONTROL if digest else MUTABLE_CACHE_CONTROL,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Accept-Ranges': 'bytes',
+    }
+
+    conditional = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if conditional is not None:
+        for header, value in headers.items():
+            conditional.setdefault(header, value)
+        return conditional
+
+    size = stat.st_size
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    if if_range is None or etag in parse_etags(if_range):
+        try:
+            byte_range = parse_range(request.headers.get('Range'), size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            _set_headers(response, headers)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    if request.method == 'HEAD':
+        response = HttpResponse()
+        _set_headers(response, headers)
+        response['Content-Length'] = size
+        return response
+
+    file = open(full_path, 'rb')
+    if byte_range is None:
+        response = FileResponse(file)
+    else:
+        start, end = byte_range
+        response = FileResponse(FileRange(file, start, end - start + 1), status=206)
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    _set_headers(response, headers)
+    return response
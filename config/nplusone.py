@@ -0,0 +1,105 @@
+import json
+import logging
+import re
+import traceback
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_HEADER = 'X-NPlusOne'
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_RE = re.compile(r'%s|\?')
+_IN_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+
+
+class NPlusOneError(Exception):
+    """Requêtes répétées détectées pendant une requête HTTP (mode raise)."""
+
+
+def normalize_sql(sql):
+    """Forme d'une requête : littéraux et paramètres remplacés, listes IN réduites."""
+    shape = _STRING_RE.sub('?', sql)
+    shape = _NUMBER_RE.sub('?', shape)
+    shape = _PLACEHOLDER_RE.sub('?', shape)
+    return _IN_LIST_RE.sub('(...)', shape)
+
+
+def _caller():
+    """Première frame du code de l'application (hors Django, DRF et ce module)."""
+    base_dir = str(settings.BASE_DIR)
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        if (frame.filename.startswith(base_dir) and 'site-packages' not in frame.filename
+                and frame.filename != __file__):
+            return f'{frame.filename[len(base_dir) + 1:]}:{frame.lineno} in {frame.name}'
+    return None
+
+
+class QueryShapeRecorder:
+    """Compte les requêtes SQL exécutées par forme, en mémorisant l'appelant de chaque forme."""
+
+    def __init__(self):
+        self.counts = Counter()
+        self.callers = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        shape = normalize_sql(sql)
+        self.counts[shape] += 1
+        # L'appelant de la deuxième exécution est celui de la boucle
+        if self.counts[shape] == 2:
+            self.callers[shape] = _caller()
+        return execute(sql, params, many, context)
+
+    def repeated(self, threshold):
+        return [
+            {'count': count, 'sql': shape, 'caller': self.callers.get(shape)}
+            for shape, count in self.counts.most_common()
+            if count >= threshold
+        ]
+
+
+class NPlusOneMiddleware:
+    """
+    Détecte les requêtes N+1 : regroupe le SQL exécuté pendant une requête par
+    forme normalisée et signale les formes répétées au moins NPLUSONE_THRESHOLD
+    fois, avec la ligne de l'application qui les déclenche.
+
+    NPLUSONE_MODE : off (défaut en production), log, header (en-tête
+    X-NPlusOne en plus du log) ou raise (exception, pour faire échouer les tests).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = getattr(settings, 'NPLUSONE_MODE', 'off')
+        if mode == 'off':
+            return self.get_response(request)
+
+        recorder = QueryShapeRecorder()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            response = self.get_response(request)
+
+        repeated = recorder.repeated(getattr(settings, 'NPLUSONE_THRESHOLD', 5))
+        if not repeated:
+            return response
+
+        summary = '; '.join(
+            f"{item['count']}x {item['sql'][:200]} ({item['caller'] or 'appelant inconnu'})"
+            for item in repeated
+        )
+        if mode == 'raise':
+            raise NPlusOneError(f"{request.method} {request.path} : {summary}")
+        logger.warning("Requêtes N+1 sur %s %s : %s", request.method, request.path, summary)
+        if mode == 'header':
+            response[RESPONSE_HEADER] = json.dumps(
+                [{'count': item['count'], 'caller': item['caller']} for item in repeated]
+            )
+        return response
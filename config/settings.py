@@ -5,8 +5,10 @@ Django settings for config project.
 from pathlib import Path
 from datetime import timedelta
 import os
+import sys
 import dj_database_url
 from dotenv import load_dotenv
+from corsheaders.defaults import default_headers
 
 # Chargement des variables d'environnement
 load_dotenv()
@@ -58,6 +60,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'config.db_router.ReplicaRoutingMiddleware',  # Lectures sur réplica (sans effet si aucun réplica)
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",  # Ajouté pour gérer les fichiers statiques
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -67,6 +70,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "allauth.account.middleware.AccountMiddleware",
+    'config.nplusone.NPlusOneMiddleware',  # Détection des requêtes N+1 (voir NPLUSONE_MODE)
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -101,6 +105,58 @@ DATABASES = {
     )
 }
 
+# Réplicas en lecture : DATABASE_REPLICA_URLS="postgres://...,postgres://..."
+# Pour tester en local avec deux SQLite :
+#   DATABASE_URL=sqlite:///db.sqlite3 DATABASE_REPLICA_URLS=sqlite:///replica.sqlite3
+#   python manage.py migrate && python manage.py migrate --database=replica0
+DATABASE_REPLICAS = []
+for index, replica_url in enumerate(filter(None, os.getenv('DATABASE_REPLICA_URLS', '').split(','))):
+    alias = f'replica{index}'
+    DATABASES[alias] = dj_database_url.parse(replica_url, conn_max_age=600)
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS.append(alias)
+
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ['config.db_router.ReplicaRouter']
+
+# Durée (secondes) pendant laquelle un client qui vient d'écrire lit sur la principale,
+# à régler au-dessus du retard de réplication observé
+DATABASE_REPLICA_STICKY_SECONDS = float(os.getenv('DATABASE_REPLICA_STICKY_SECONDS', '5'))
+
+# Processus et threads Gunicorn (lus aussi par gunicorn.conf.py)
+WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', '3'))
+GUNICORN_THREADS = int(os.getenv('GUNICORN_THREADS', '1'))
+
+# Pool de connexions PostgreSQL par worker (psycopg 3), activé avec DB_POOL=True.
+# Un thread n'utilise qu'une connexion à la fois : le pool est plafonné au nombre de
+# threads, et à DB_MAX_CONNECTIONS / WEB_CONCURRENCY si la base limite les connexions.
+# Au-delà, les requêtes attendent une connexion libre (DB_POOL_TIMEOUT) au lieu d'échouer.
+DB_POOL = os.getenv('DB_POOL', 'False') == 'True'
+DB_MAX_CONNECTIONS = int(os.getenv('DB_MAX_CONNECTIONS', '0'))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', str(
+    min(GUNICORN_THREADS, DB_MAX_CONNECTIONS // WEB_CONCURRENCY) if DB_MAX_CONNECTIONS else GUNICORN_THREADS
+)))
+DB_POOL_MIN_SIZE = min(int(os.getenv('DB_POOL_MIN_SIZE', '1')), DB_POOL_MAX_SIZE)
+DB_POOL_MAX_LIFETIME = float(os.getenv('DB_POOL_MAX_LIFETIME', '1800'))
+DB_POOL_MAX_IDLE = float(os.getenv('DB_POOL_MAX_IDLE', '300'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '10'))
+
+for database in DATABASES.values():
+    # Vérifie une connexion persistante avant de la réutiliser (bascule, redémarrage de la base)
+    database['CONN_HEALTH_CHECKS'] = True
+    if DB_POOL and database.get('ENGINE') == 'django.db.backends.postgresql':
+        # Le pool remplace les connexions persistantes de Django
+        database['CONN_MAX_AGE'] = 0
+        database.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': DB_POOL_MIN_SIZE,
+            'max_size': max(DB_POOL_MAX_SIZE, 1),
+            'max_lifetime': DB_POOL_MAX_LIFETIME,
+            'max_idle': DB_POOL_MAX_IDLE,
+            'timeout': DB_POOL_TIMEOUT,
+            # Avec CONN_HEALTH_CHECKS, Django passe check=ConnectionPool.check_connection :
+            # chaque connexion est testée à l'emprunt et remplacée si la base a basculé
+        }
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -126,7 +182,12 @@ USE_TZ = True
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = "static/"
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+
+# Médias stockés par empreinte du contenu (voir config/storage.py), statiques par WhiteNoise
+STORAGES = {
+    'default': {'BACKEND': 'config.storage.ContentAddressedStorage'},
+    'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+}
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
@@ -137,6 +198,10 @@ CORS_ALLOW_ALL_ORIGINS = False
 CSRF_TRUSTED_ORIGINS = os.getenv('CSRF_TRUSTED_ORIGINS', 'http://localhost').split(',')
 CSRF_COOKIE_SECURE = not DEBUG
 SESSION_COOKIE_SECURE = not DEBUG
+# Marqueur de lecture de ses propres écritures (voir config/db_router.py)
+# et clés d'idempotence des actions POST (voir api/idempotency.py)
+CORS_ALLOW_HEADERS = (*default_headers, 'x-primary-pin', 'idempotency-key')
+CORS_EXPOSE_HEADERS = ['X-Primary-Pin', 'Idempotent-Replayed']
 CORS_ALLOWED_ORIGINS = os.getenv('CORS_ALLOWED_ORIGINS', 'http://localhost:5173,http://127.0.0.1:5173').split(',')
 
 SITE_ID = 1
@@ -149,6 +214,14 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+    # JSON par défaut ; formats compacts sur demande via le header Accept
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'api.renderers.ColumnarJSONRenderer',
+        'api.renderers.MessagePackRenderer',
+        'api.renderers.ColumnarMessagePackRenderer',
+    ],
     'DEFAULT_THROTTLE_CLASSES': [
         'rest_framework.throttling.AnonRateThrottle',
         'rest_framework.throttling.UserRateThrottle',
@@ -167,7 +240,7 @@ REST_AUTH = {
     'JWT_AUTH_COOKIE_SAMESITE': 'Lax',
     'JWT_AUTH_COOKIE_USE_CSRF': False,
     'JWT_AUTH_COOKIE_SECURE': not DEBUG,
-    'USER_DETAILS_SERIALIZER': 'api.serializers.UserSerializer',
+    'USER_DETAILS_SERIALIZER': 'api.serializers.UserDetailsSerializer',
     'PASSWORD_RESET_SERIALIZER': 'api.serializers.CustomPasswordResetSerializer',
 }
 
@@ -195,6 +268,37 @@ EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'config.email_backend.ResendEmailBack
 RESEND_API_KEY = os.getenv('RESEND_API_KEY', '')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'noreply@playfoodle.fr')
 
+# Résumés d'activité par email (commande send_digests) : utilisateurs traités par lot
+DIGEST_BATCH_SIZE = int(os.getenv('DIGEST_BATCH_SIZE', '100'))
+
+# Détection des requêtes N+1 : off, log, header (X-NPlusOne) ou raise.
+# Par défaut : raise pendant les tests, log en DEBUG, off en production
+NPLUSONE_MODE = os.getenv(
+    'NPLUSONE_MODE',
+    'raise' if sys.argv[1:2] == ['test'] else ('log' if DEBUG else 'off')
+)
+# Nombre d'exécutions d'une même forme de requête à partir duquel elle est signalée
+NPLUSONE_THRESHOLD = int(os.getenv('NPLUSONE_THRESHOLD', '5'))
+
+# Durée maximale (secondes) avant reconstruction de l'index d'autocomplétion d'un worker
+AUTOCOMPLETE_MAX_AGE = int(os.getenv('AUTOCOMPLETE_MAX_AGE', '300'))
+
+# Durée de conservation (heures) des réponses rejouées via le header Idempotency-Key
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.getenv('IDEMPOTENCY_KEY_TTL_HOURS', '24'))
+
+# Synchronisation incrémentale (/api/sync/) : entrées du journal lues par appel, et âge
+# minimal d'une entrée avant lecture. Il doit dépasser la durée de toute transaction qui
+# écrit dans le journal (imports, archivage compris) : une entrée validée plus tard est
+# sautée par les synchronisations incrémentales (voir api.sync.sync_horizon)
+SYNC_PAGE_SIZE = int(os.getenv('SYNC_PAGE_SIZE', '1000'))
+SYNC_SETTLE_SECONDS = int(os.getenv('SYNC_SETTLE_SECONDS', '5'))
+
+# Nombre de lieux recommandés par groupe (commande compute_recommendations)
+GROUP_RECOMMENDATIONS_LIMIT = int(os.getenv('GROUP_RECOMMENDATIONS_LIMIT', '20'))
+
+# Nombre minimal de restaurants notés en commun pour calculer la compatibilité de goûts
+TASTE_MIN_SHARED_RATINGS = int(os.getenv('TASTE_MIN_SHARED_RATINGS', '3'))
+
 # Media files
 MEDIA_URL = '/media/'
-MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
\ No newline at end of file
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
@@ -0,0 +1,63 @@
+import hashlib
+import os
+import posixpath
+import re
+import uuid
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+# Nom produit par le stockage : <upload_to>/<2 premiers caractères>/<sha256>.<ext>
+HASHED_NAME_RE = re.compile(r'(?:^|/)([0-9a-f]{64})(?:\.[0-9a-z]+)?$')
+
+
+def content_hash(content):
+    """SHA-256 du contenu d'un fichier, lu par morceaux."""
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    if content.seekable():
+        content.seek(0)
+    return digest.hexdigest()
+
+
+def hashed_name(name):
+    """Empreinte contenue dans un nom produit par ContentAddressedStorage, sinon None."""
+    match = HASHED_NAME_RE.search(name)
+    return match.group(1) if match else None
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stockage des médias par empreinte du contenu : le fichier est enregistré
+    sous <upload_to>/ab/<sha256>.<ext>. Deux envois identiques partagent le même
+    fichier, et un nom ne désigne jamais qu'un seul contenu, ce qui permet de le
+    servir avec un cache immuable (voir config/media.py).
+
+    Un fichier pouvant être partagé par plusieurs objets, il ne doit pas être
+    supprimé avec l'un d'eux.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        digest = content_hash(content)
+        directory = posixpath.dirname(name.replace('\\', '/'))
+        extension = os.path.splitext(name)[1].lower()
+        name = posixpath.join(directory, digest[:2], f'{digest}{extension}')
+        return super().save(name, content, max_length=max_length)
+
+    def get_available_name(self, name, max_length=None):
+        # Même nom, même contenu : le fichier existant est réutilisé tel quel
+        return name
+
+    def _save(self, name, content):
+        if self.exists(name):
+            return name
+        # Écriture dans un fichier temporaire puis renommage atomique :
+        # deux envois simultanés du même contenu écrivent le même fichier final
+        temporary = super()._save(f'{name}.{uuid.uuid4().hex}.tmp', content)
+        os.replace(self.path(temporary), self.path(name))
+        return name
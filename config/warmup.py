@@ -0,0 +1,49 @@
+import logging
+
+from django.db import DatabaseError, connections
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up_application():
+    """
+    Prépare dans le processus maître (preload Gunicorn) ce qui sinon serait
+    fait à la première requête de chaque worker : résolution des URLs,
+    imports des vues et construction des champs des serializers.
+    """
+    resolver = get_resolver()
+    resolver.url_patterns  # importe api.urls, les vues et les serializers
+    resolver._populate()
+
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+    from api import urls as api_urls
+
+    # Une instance de chaque serializer remplit les caches des modèles (_meta, relations)
+    request = Request(APIRequestFactory().get('/'))
+    for _, viewset, _ in api_urls.router.registry:
+        serializer_class = getattr(viewset, 'serializer_class', None)
+        if serializer_class is not None:
+            serializer_class(context={'request': request}).fields
+
+    # Aucune connexion ne doit être partagée entre le maître et les workers
+    connections.close_all()
+
+
+def warm_up_worker():
+    """
+    Ouvre la connexion à la base de chaque worker avant sa première requête.
+    Avec le pool, la connexion empruntée par ce thread (qui ne sert pas de
+    requêtes en gthread) est aussitôt rendue : le pool reste ouvert et garde
+    ses DB_POOL_MIN_SIZE connexions pour les threads des requêtes.
+    """
+    for alias in connections:
+        connection = connections[alias]
+        try:
+            connection.ensure_connection()
+        except DatabaseError:
+            logger.warning("Connexion à la base '%s' impossible au démarrage du worker.", alias, exc_info=True)
+            continue
+        if connection.settings_dict.get('OPTIONS', {}).get('pool'):
+            connection.close()
@@ -1,21 +1,19 @@
 #!/bin/sh
 set -e
 
+# Début du démarrage, pour mesurer le temps jusqu'à la première requête (gunicorn.conf.py)
+export BOOT_STARTED_AT="$(date +%s.%N)"
+
 # Applique les migrations au démarrage du conteneur
 # (pas au build : à ce stade la DB n'existe pas encore)
-echo "Applying migrations..."
-python manage.py migrate --noinput
-
-# Collecte les fichiers statiques (admin Django, etc.)
-echo "Collecting static files..."
-python manage.py collectstatic --noinput
+# et collecte les fichiers statiques (admin Django, etc.), chacun seulement
+# s'il y a du nouveau, dans un seul processus Python
+echo "Preparing migrations and static files..."
+python manage.py prepare_boot
 
 # Lance Gunicorn : le serveur WSGI de production
-# --workers 3 = 3 processus parallèles (règle : 2 * CPU + 1)
+# Processus/threads via WEB_CONCURRENCY (règle : 2 * CPU + 1) et GUNICORN_THREADS,
+# voir gunicorn.conf.py
 # exec remplace le processus shell par gunicorn (bonne pratique Docker)
 echo "Starting Gunicorn..."
-exec gunicorn config.wsgi:application \
-    --bind 0.0.0.0:8000 \
-    --workers 3 \
-    --access-logfile - \
-    --error-logfile -
+exec gunicorn config.wsgi:application -c gunicorn.conf.py
@@ -0,0 +1,24 @@
+from .models import Activity
+
+
+def build_activity(group_id, verb, actor=None, competition=None, restaurant=None, **data):
+    """Construit (sans l'enregistrer) un événement du fil d'activité."""
+    if competition is not None:
+        data.setdefault('competition_name', competition.name)
+    if restaurant is not None:
+        data.setdefault('restaurant_name', restaurant.name)
+    return Activity(
+        group_id=group_id,
+        verb=verb,
+        actor=actor,
+        competition=competition,
+        restaurant=restaurant,
+        data=data,
+    )
+
+
+def record_activity(group_id, verb, actor=None, competition=None, restaurant=None, **data):
+    """Enregistre un événement dans le fil d'activité du groupe."""
+    activity = build_activity(group_id, verb, actor, competition, restaurant, **data)
+    activity.save()
+    return activity
@@ -1,6 +1,12 @@
 from django.contrib import admin
-from .models import Group, GroupMember
+from .models import (
+    Activity, ChangeLogEntry, Contact, Group, GroupMember, GroupRecommendation, TasteCompatibility,
+)
 
 admin.site.register(Group)
 admin.site.register(GroupMember)
-
+admin.site.register(Contact)
+admin.site.register(Activity)
+admin.site.register(ChangeLogEntry)
+admin.site.register(GroupRecommendation)
+admin.site.register(TasteCompatibility)
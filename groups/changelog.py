@@ -0,0 +1,43 @@
+import threading
+from contextlib import contextmanager
+
+from django.db.models import Subquery
+
+from .models import ChangeLogEntry
+
+_state = threading.local()
+
+
+def change(resource, object_id, op, group_id, user_id=None):
+    """
+    Construit (sans l'enregistrer) une entrée du journal des changements.
+    `group_id` peut être une expression (Subquery) évaluée dans l'INSERT.
+    """
+    return ChangeLogEntry(
+        resource=resource, object_id=object_id, op=op, group_id=group_id, user_id=user_id,
+    )
+
+
+def group_of(queryset):
+    """Groupe d'un objet lu dans la requête d'insertion : queryset réduit à une colonne group_id."""
+    return Subquery(queryset[:1])
+
+
+def log_changes(*entries):
+    """Enregistre des entrées du journal en une seule requête."""
+    if entries and not getattr(_state, 'suppressed', False):
+        ChangeLogEntry.objects.bulk_create(entries)
+
+
+@contextmanager
+def changes_suppressed():
+    """
+    Suspend la journalisation (thread courant), pour les opérations de masse
+    qui enregistrent elles-mêmes un changement résumé (ex. archivage).
+    """
+    previous = getattr(_state, 'suppressed', False)
+    _state.suppressed = True
+    try:
+        yield
+    finally:
+        _state.suppressed = previous
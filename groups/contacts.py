@@ -0,0 +1,41 @@
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .models import Contact, GroupMember
+
+
+def refresh_contacts(user_id):
+    """
+    Recalcule les contacts d'un utilisateur à partir de ses adhésions.
+
+    Le nombre de groupes partagés est symétrique : la ligne (user, autre) et
+    la ligne (autre, user) portent la même valeur, donc une seule agrégation
+    suffit pour remettre à jour toutes les paires impliquant l'utilisateur.
+    """
+    shared = dict(
+        GroupMember.objects.filter(group__membership__user_id=user_id)
+        .values_list('user_id')
+        .annotate(count=Count('group_id'))
+    )
+
+    with transaction.atomic():
+        Contact.objects.filter(
+            Q(user_id=user_id) & ~Q(visible_user_id__in=shared)
+            | Q(visible_user_id=user_id) & ~Q(user_id__in=shared)
+        ).delete()
+
+        rows = {}
+        for other_id, count in shared.items():
+            rows[(user_id, other_id)] = Contact(
+                user_id=user_id, visible_user_id=other_id, shared_group_count=count
+            )
+            rows[(other_id, user_id)] = Contact(
+                user_id=other_id, visible_user_id=user_id, shared_group_count=count
+            )
+        if rows:
+            Contact.objects.bulk_create(
+                rows.values(),
+                update_conflicts=True,
+                unique_fields=['user', 'visible_user'],
+                update_fields=['shared_group_count'],
+            )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from groups.models import Group
+from groups.recommendations import store_recommendations
+
+
+class Command(BaseCommand):
+    help = (
+        "Précalcule les lieux recommandés à chaque groupe (filtrage collaboratif "
+        "sur les évaluations de ses membres), servis par /api/groups/{id}/recommendations/."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--group', type=int, action='append', help="Groupe à recalculer (répétable).")
+        parser.add_argument('--limit', type=int, default=None, help="Nombre de lieux recommandés par groupe.")
+
+    def handle(self, *args, **options):
+        groups = Group.objects.order_by('id').values_list('id', flat=True)
+        if options['group']:
+            groups = groups.filter(id__in=options['group'])
+
+        computed = 0
+        for group_id in groups:
+            data = store_recommendations(group_id, options['limit'])
+            computed += 1
+            self.stdout.write(f"Groupe {group_id} : {len(data)} lieu(x) recommandé(s)")
+
+        self.stdout.write(self.style.SUCCESS(f"Recommandations calculées pour {computed} groupe(s)."))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from groups.models import Group
+from groups.taste import rebuild_taste
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule les sommes de compatibilité de goûts entre membres (tenues à jour "
+        "à chaque évaluation), par exemple après un import massif d'évaluations."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--group', type=int, action='append', help="Groupe à recalculer (répétable).")
+
+    def handle(self, *args, **options):
+        groups = Group.objects.order_by('id').values_list('id', flat=True)
+        if options['group']:
+            groups = groups.filter(id__in=options['group'])
+
+        rebuilt = 0
+        for group_id in groups:
+            pairs = rebuild_taste(group_id)
+            rebuilt += 1
+            self.stdout.write(f"Groupe {group_id} : {pairs} paire(s)")
+
+        self.stdout.write(self.style.SUCCESS(f"Compatibilités recalculées pour {rebuilt} groupe(s)."))
@@ -0,0 +1,35 @@
+from django.db import migrations
+from django.db.models import Count, F
+
+
+def backfill_contacts(apps, schema_editor):
+    GroupMember = apps.get_model("groups", "GroupMember")
+    Contact = apps.get_model("groups", "Contact")
+
+    # Auto-jointure sur les adhésions : une ligne par paire d'utilisateurs
+    pairs = (
+        GroupMember.objects.annotate(visible_user_id=F("group__membership__user_id"))
+        .values("user_id", "visible_user_id")
+        .annotate(count=Count("group_id"))
+    )
+    Contact.objects.bulk_create(
+        (
+            Contact(
+                user_id=pair["user_id"],
+                visible_user_id=pair["visible_user_id"],
+                shared_group_count=pair["count"],
+            )
+            for pair in pairs.iterator(chunk_size=2000)
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("groups", "0006_contact"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_contacts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.1.7 on 2026-10-19 19:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("groups", "0008_activity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChangeLogEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("group_id", models.BigIntegerField(null=True)),
+                ("user_id", models.BigIntegerField(blank=True, null=True)),
+                (
+                    "resource",
+                    models.CharField(
+                        choices=[
+                            ("group", "Groupe"),
+                            ("member", "Membre"),
+                            ("competition", "Compétition"),
+                            ("restaurant", "Restaurant"),
+                            ("rating", "Évaluation"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("object_id", models.BigIntegerField()),
+                (
+                    "op",
+                    models.CharField(
+                        choices=[
+                            ("create", "Création"),
+                            ("update", "Modification"),
+                            ("delete", "Suppression"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["group_id", "id"], name="changelog_group_idx"),
+                    models.Index(fields=["user_id", "id"], name="changelog_user_idx"),
+                ],
+            },
+        ),
+    ]
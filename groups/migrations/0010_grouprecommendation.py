@@ -0,0 +1,31 @@
+# Generated by Django 5.1.7 on 2026-10-19 19:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("groups", "0009_changelogentry"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GroupRecommendation",
+            fields=[
+                (
+                    "group",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="recommendation",
+                        serialize=False,
+                        to="groups.group",
+                    ),
+                ),
+                ("data", models.JSONField(default=list)),
+                ("computed_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
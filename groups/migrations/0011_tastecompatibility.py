@@ -0,0 +1,63 @@
+# Generated by Django 5.1.7 on 2026-10-19 19:39
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("groups", "0010_grouprecommendation"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TasteCompatibility",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("shared_count", models.IntegerField(default=0)),
+                ("sum_x", models.FloatField(default=0)),
+                ("sum_y", models.FloatField(default=0)),
+                ("sum_xx", models.FloatField(default=0)),
+                ("sum_yy", models.FloatField(default=0)),
+                ("sum_xy", models.FloatField(default=0)),
+                (
+                    "group",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="taste_pairs",
+                        to="groups.group",
+                    ),
+                ),
+                (
+                    "other_user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("group", "user", "other_user")},
+            },
+        ),
+    ]
@@ -0,0 +1,66 @@
+from collections import defaultdict
+
+import numpy as np
+from django.db import migrations
+
+STAT_FIELDS = ["sum_x", "sum_y", "sum_xx", "sum_yy", "sum_xy"]
+
+
+def backfill_taste_compatibility(apps, schema_editor):
+    Rating = apps.get_model("restaurants", "Rating")
+    TasteCompatibility = apps.get_model("groups", "TasteCompatibility")
+
+    ratings_by_group = defaultdict(list)
+    rows = Rating.objects.values_list(
+        "restaurant__competition__group_id", "user_id", "restaurant_id", "overall_score"
+    )
+    for group_id, user_id, restaurant_id, score in rows.iterator(chunk_size=2000):
+        ratings_by_group[group_id].append((user_id, restaurant_id, score))
+
+    pairs = []
+    for group_id, ratings in ratings_by_group.items():
+        # Matrice utilisateur × restaurant (une note par paire, unique_together)
+        data = np.array(ratings, dtype=float)
+        users, user_index = np.unique(data[:, 0].astype(np.int64), return_inverse=True)
+        _, restaurant_index = np.unique(
+            data[:, 1].astype(np.int64), return_inverse=True
+        )
+        scores = np.zeros((len(users), restaurant_index.max() + 1))
+        scores[user_index, restaurant_index] = data[:, 2]
+        mask = (scores > 0).astype(float)
+
+        shared = mask @ mask.T
+        sum_x = scores @ mask.T
+        sum_xx = (scores**2) @ mask.T
+        stats = {
+            "sum_x": sum_x,
+            "sum_y": sum_x.T,
+            "sum_xx": sum_xx,
+            "sum_yy": sum_xx.T,
+            "sum_xy": scores @ scores.T,
+        }
+        first, second = np.triu_indices(len(users), k=1)
+        for i, j in zip(first, second):
+            if shared[i, j]:
+                pairs.append(
+                    TasteCompatibility(
+                        group_id=group_id,
+                        user_id=int(users[i]),
+                        other_user_id=int(users[j]),
+                        shared_count=int(shared[i, j]),
+                        **{field: float(stats[field][i, j]) for field in STAT_FIELDS},
+                    )
+                )
+
+    TasteCompatibility.objects.bulk_create(pairs, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("groups", "0011_tastecompatibility"),
+        ("restaurants", "0006_rating_overall_score"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_taste_compatibility, migrations.RunPython.noop),
+    ]
@@ -90,3 +90,160 @@ class GroupFavorite(models.Model):
         
     def __str__(self):
         return f"{self.user.username} - {self.group.name} (favori)"
+
+
+class Contact(models.Model):
+    """Paire d'utilisateurs partageant au moins un groupe, maintenue à chaque changement d'adhésion"""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='contacts'
+    )
+    visible_user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='visible_to'
+    )
+    shared_group_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('user', 'visible_user')
+
+    def __str__(self):
+        return f"{self.user_id} -> {self.visible_user_id} ({self.shared_group_count})"
+
+
+class Activity(models.Model):
+    """Événement du fil d'activité d'un groupe, écrit au moment de l'action (table en ajout seul)"""
+    VERB_CHOICES = [
+        ('rating_added', 'Évaluation ajoutée'),
+        ('restaurant_suggested', 'Restaurant proposé'),
+        ('member_joined', 'Membre arrivé'),
+        ('competition_status_changed', 'Statut de compétition modifié'),
+    ]
+
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        related_name='activities'
+    )
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='activities'
+    )
+    verb = models.CharField(max_length=30, choices=VERB_CHOICES)
+    competition = models.ForeignKey(
+        'competitions.Competition',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    restaurant = models.ForeignKey(
+        'restaurants.Restaurant',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    # Données dénormalisées pour afficher l'événement sans jointure (noms, scores, statuts)
+    data = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['group', '-created_at', '-id'], name='activity_group_feed_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.group_id} - {self.verb} ({self.created_at})"
+
+
+class ChangeLogEntry(models.Model):
+    """
+    Journal des changements des objets visibles dans un groupe (table en ajout seul).
+    L'identifiant croissant sert de curseur de synchronisation (voir /api/sync/).
+    """
+    RESOURCE_CHOICES = [
+        ('group', 'Groupe'),
+        ('member', 'Membre'),
+        ('competition', 'Compétition'),
+        ('restaurant', 'Restaurant'),
+        ('rating', 'Évaluation'),
+    ]
+    OP_CHOICES = [
+        ('create', 'Création'),
+        ('update', 'Modification'),
+        ('delete', 'Suppression'),
+    ]
+
+    # Entiers plutôt que clés étrangères : une suppression doit laisser sa trace
+    group_id = models.BigIntegerField(null=True)
+    # Utilisateur concerné par un changement d'adhésion (resource 'member')
+    user_id = models.BigIntegerField(null=True, blank=True)
+    resource = models.CharField(max_length=20, choices=RESOURCE_CHOICES)
+    object_id = models.BigIntegerField()
+    op = models.CharField(max_length=10, choices=OP_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['group_id', 'id'], name='changelog_group_idx'),
+            models.Index(fields=['user_id', 'id'], name='changelog_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.id} - {self.op} {self.resource} {self.object_id}"
+
+
+class GroupRecommendation(models.Model):
+    """Lieux recommandés à un groupe, précalculés par compute_recommendations"""
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='recommendation'
+    )
+    # Liste ordonnée : lieu, nom, adresse, cuisine, score prédit, membres concernés
+    data = models.JSONField(default=list)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Recommandations de {self.group_id}"
+
+
+class TasteCompatibility(models.Model):
+    """
+    Sommes de corrélation entre les notes globales de deux membres d'un groupe
+    sur les restaurants qu'ils ont tous deux évalués (user_id < other_user_id),
+    tenues à jour à chaque évaluation ; x = notes de user, y = notes de other_user.
+    """
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        related_name='taste_pairs'
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    other_user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    shared_count = models.IntegerField(default=0)
+    sum_x = models.FloatField(default=0)
+    sum_y = models.FloatField(default=0)
+    sum_xx = models.FloatField(default=0)
+    sum_yy = models.FloatField(default=0)
+    sum_xy = models.FloatField(default=0)
+
+    class Meta:
+        unique_together = ('group', 'user', 'other_user')
+
+    def __str__(self):
+        return f"{self.group_id} : {self.user_id} / {self.other_user_id} ({self.shared_count})"
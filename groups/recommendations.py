@@ -0,0 +1,180 @@
+from collections import Counter, defaultdict
+
+import numpy as np
+from django.conf import settings
+
+from competitions.archive import archives_of
+from competitions.models import Competition
+from restaurants.models import Rating, Restaurant
+
+from .models import GroupMember, GroupRecommendation
+
+
+def rating_matrix(ratings):
+    """
+    Matrice utilisateur × restaurant ou lieu à partir de tuples (utilisateur,
+    objet, note). Une note répétée (même lieu dans plusieurs compétitions) est
+    moyennée. Retourne (utilisateurs, objets, notes, masque des cases notées).
+    """
+    data = np.asarray(ratings, dtype=float).reshape(-1, 3)
+    users, user_index = np.unique(data[:, 0].astype(np.int64), return_inverse=True)
+    items, item_index = np.unique(data[:, 1].astype(np.int64), return_inverse=True)
+    shape = (len(users), len(items))
+    cells = user_index * len(items) + item_index
+    counts = np.bincount(cells, minlength=shape[0] * shape[1]).reshape(shape)
+    sums = np.bincount(cells, weights=data[:, 2], minlength=shape[0] * shape[1]).reshape(shape)
+    rated = counts > 0
+    scores = np.divide(sums, counts, out=np.zeros(shape), where=rated)
+    return users, items, scores, rated
+
+
+def predict_scores(scores, rated, item_categories):
+    """
+    Filtrage collaboratif par utilisateur : la note prédite d'un utilisateur pour
+    un lieu est sa moyenne, plus les écarts à leur moyenne des autres membres
+    qui l'ont noté, pondérés par la similarité cosinus des goûts (notes
+    centrées). Sans voisin ayant noté le lieu, l'écart moyen de l'utilisateur
+    sur la cuisine du lieu (`item_categories`, indices) sert de repli.
+    Retourne (notes prédites, masque des prédictions disponibles).
+    """
+    user_means = scores.sum(axis=1) / rated.sum(axis=1)
+    centered = np.where(rated, scores - user_means[:, None], 0.0)
+
+    norms = np.linalg.norm(centered, axis=1)
+    safe_norms = np.where(norms > 0, norms, 1)
+    similarity = (centered @ centered.T) / np.outer(safe_norms, safe_norms)
+    np.fill_diagonal(similarity, 0)
+
+    weights = np.abs(similarity) @ rated
+    neighbour_offsets = np.divide(
+        similarity @ centered, weights, out=np.zeros_like(scores), where=weights > 0
+    )
+
+    # Écart moyen de chaque utilisateur par cuisine (matrice utilisateur × cuisine)
+    category_count = item_categories.max() + 1 if len(item_categories) else 0
+    category_totals = centered @ np.eye(category_count)[item_categories]
+    category_counts = rated @ np.eye(category_count)[item_categories]
+    category_offsets = np.divide(
+        category_totals, category_counts, out=np.zeros_like(category_totals), where=category_counts > 0
+    )[:, item_categories]
+    has_category = (category_counts > 0)[:, item_categories]
+
+    predicted = user_means[:, None] + np.where(weights > 0, neighbour_offsets, category_offsets)
+    predicted = np.where(rated, scores, np.clip(predicted, 1, 5))
+    return predicted, rated | (weights > 0) | has_category
+
+
+def _place_cuisines(place_ids, archived_restaurants=()):
+    """
+    Cuisine la plus fréquente parmi les restaurants rattachés à chaque lieu,
+    restaurants archivés `archived_restaurants` (lignes d'archive) compris.
+    """
+    cuisines = defaultdict(Counter)
+    for place_id, cuisine_type in Restaurant.objects.filter(
+        place_id__in=place_ids
+    ).values_list('place_id', 'cuisine_type'):
+        cuisines[place_id][cuisine_type] += 1
+    place_ids = set(place_ids)
+    for restaurant in archived_restaurants:
+        if restaurant['place_id'] in place_ids:
+            cuisines[restaurant['place_id']][restaurant['cuisine_type']] += 1
+    return {place_id: counter.most_common(1)[0][0] for place_id, counter in cuisines.items()}
+
+
+def _public_places(place_ids):
+    """
+    Nom, adresse et cuisine des lieux proposés dans au moins un groupe public,
+    lus sur ces restaurants : un lieu connu seulement de groupes privés n'est
+    jamais révélé à un autre groupe.
+    """
+    places = {}
+    cuisines = defaultdict(Counter)
+    for place_id, name, address, cuisine_type in Restaurant.objects.filter(
+        place_id__in=place_ids, competition__group__privacy='public'
+    ).order_by('id').values_list('place_id', 'name', 'address', 'cuisine_type'):
+        places.setdefault(place_id, {'name': name, 'address': address})
+        cuisines[place_id][cuisine_type] += 1
+    for place_id, counter in cuisines.items():
+        places[place_id]['cuisine_type'] = counter.most_common(1)[0][0] or None
+    return places
+
+
+def _archived_history(group_id, member_ids):
+    """
+    Évaluations archivées des membres (utilisateur, lieu, note), lues dans les
+    archives des groupes auxquels ils appartiennent, restaurants de ces
+    archives et lieux des compétitions archivées du groupe lui-même.
+    """
+    ratings, restaurants, visited = [], [], set()
+    competitions = Competition.objects.filter(group__membership__user_id__in=member_ids).distinct()
+    for competition, archive in archives_of(competitions):
+        places = {restaurant['id']: restaurant['place_id'] for restaurant in archive.restaurants}
+        restaurants.extend(archive.restaurants)
+        if competition.group_id == group_id:
+            visited.update(place_id for place_id in places.values() if place_id is not None)
+        ratings.extend(
+            (rating['user_id'], places[rating['restaurant_id']], rating['overall_score'])
+            for rating in archive.ratings
+            if rating['user_id'] in member_ids and places[rating['restaurant_id']] is not None
+        )
+    return ratings, restaurants, visited
+
+
+def compute_recommendations(group_id, limit=None):
+    """
+    Lieux que le groupe n'a pas encore visités, classés par la moyenne des
+    notes prédites de ses membres (toutes les évaluations des membres, tous
+    groupes confondus et compétitions archivées comprises, alimentent la
+    matrice utilisateur × lieu). Seuls les lieux proposés dans un groupe
+    public peuvent être recommandés.
+    """
+    limit = limit or getattr(settings, 'GROUP_RECOMMENDATIONS_LIMIT', 20)
+    member_ids = set(GroupMember.objects.filter(group_id=group_id).values_list('user_id', flat=True))
+    ratings = list(Rating.objects.filter(
+        user_id__in=member_ids,
+        restaurant__place__isnull=False,
+    ).values_list('user_id', 'restaurant__place_id', 'overall_score'))
+    archived_ratings, archived_restaurants, archived_visited = _archived_history(group_id, member_ids)
+    ratings.extend(archived_ratings)
+    if not ratings:
+        return []
+
+    _, places, scores, rated = rating_matrix(ratings)
+    cuisines = _place_cuisines(places.tolist(), archived_restaurants)
+    _, categories = np.unique(
+        [cuisines.get(place_id, '') for place_id in places.tolist()], return_inverse=True
+    )
+    predicted, known = predict_scores(scores, rated, categories)
+
+    visited = archived_visited | set(Restaurant.objects.filter(
+        competition__group_id=group_id, place__isnull=False
+    ).values_list('place_id', flat=True))
+    public = _public_places([place_id for place_id in places.tolist() if place_id not in visited])
+    candidates = np.isin(places, list(public)) & known.any(axis=0)
+
+    supporters = known.sum(axis=0)
+    group_scores = np.divide(
+        np.where(known, predicted, 0).sum(axis=0), supporters,
+        out=np.zeros(len(places)), where=supporters > 0,
+    )
+    # Score décroissant, puis nombre de membres concernés décroissant
+    order = np.lexsort((-supporters, -group_scores))
+    chosen = [index for index in order if candidates[index]][:limit]
+
+    return [
+        {
+            'rank': rank,
+            'place': int(places[index]),
+            **public[int(places[index])],
+            'score': round(float(group_scores[index]), 2),
+            'supporters': int(supporters[index]),
+        }
+        for rank, index in enumerate(chosen, start=1)
+    ]
+
+
+def store_recommendations(group_id, limit=None):
+    """Recalcule et enregistre les recommandations d'un groupe."""
+    data = compute_recommendations(group_id, limit)
+    GroupRecommendation.objects.update_or_create(group_id=group_id, defaults={'data': data})
+    return data
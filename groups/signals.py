@@ -0,0 +1,128 @@
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from competitions.models import Competition
+from restaurants.aggregates import aggregates_suppressed_now
+from restaurants.histograms import rating_scores
+from restaurants.models import Rating, Restaurant
+
+from .changelog import change, log_changes
+from .contacts import refresh_contacts
+from .models import Group, GroupFavorite, GroupMember
+from .taste import (
+    apply_archive_removal, apply_rating_change, apply_restaurant_removal, overall_score,
+    rebuild_taste_for_restaurant,
+)
+
+
+@receiver(post_init, sender=GroupMember)
+def remember_membership(sender, instance, **kwargs):
+    if instance.pk is not None:
+        instance._membership = (instance.user_id, instance.group_id)
+
+
+@receiver(post_save, sender=GroupMember)
+def update_contacts_on_join(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_membership', None)
+    current = (instance.user_id, instance.group_id)
+    if created or previous != current:
+        refresh_contacts(instance.user_id)
+        # Adhésion déplacée vers un autre utilisateur : l'ancien perd ce groupe
+        if previous is not None and previous[0] != instance.user_id:
+            refresh_contacts(previous[0])
+    instance._membership = current
+
+
+@receiver(post_delete, sender=GroupMember)
+def update_contacts_on_leave(sender, instance, **kwargs):
+    refresh_contacts(instance.user_id)
+
+
+@receiver(post_save, sender=Group)
+def log_group_save(sender, instance, created, **kwargs):
+    log_changes(change('group', instance.id, 'create' if created else 'update', instance.id))
+
+
+@receiver(post_delete, sender=Group)
+def log_group_delete(sender, instance, **kwargs):
+    log_changes(change('group', instance.id, 'delete', instance.id))
+
+
+@receiver(post_save, sender=GroupMember)
+def log_member_save(sender, instance, created, **kwargs):
+    # Le nombre de membres du groupe change aussi
+    log_changes(
+        change('member', instance.id, 'create' if created else 'update', instance.group_id, instance.user_id),
+        change('group', instance.group_id, 'update', instance.group_id),
+    )
+
+
+@receiver(post_delete, sender=GroupMember)
+def log_member_delete(sender, instance, **kwargs):
+    log_changes(
+        change('member', instance.id, 'delete', instance.group_id, instance.user_id),
+        change('group', instance.group_id, 'update', instance.group_id),
+    )
+
+
+@receiver(post_save, sender=GroupFavorite)
+@receiver(post_delete, sender=GroupFavorite)
+def log_favorite_change(sender, instance, **kwargs):
+    # is_favorite fait partie de la représentation du groupe
+    log_changes(change('group', instance.group_id, 'update', instance.group_id))
+
+
+def _taste_key(instance):
+    # Lecture via __dict__ pour ne pas charger les champs différés (.only())
+    values = instance.__dict__
+    return (values.get('user_id'), values.get('restaurant_id'), overall_score(rating_scores(instance)))
+
+
+@receiver(post_init, sender=Rating)
+def remember_taste_score(sender, instance, **kwargs):
+    if instance.pk is not None:
+        instance._taste_score = _taste_key(instance)
+
+
+@receiver(post_save, sender=Rating)
+def update_taste_on_save(sender, instance, created, **kwargs):
+    if aggregates_suppressed_now():
+        return
+    current = _taste_key(instance)
+    previous = None if created else getattr(instance, '_taste_score', None)
+    if not created and (previous is None or None in previous or current[2] is None):
+        # Valeurs précédentes inconnues : recalcul complet du groupe
+        rebuild_taste_for_restaurant(instance.restaurant_id)
+    elif previous is not None and previous[:2] != current[:2]:
+        apply_rating_change(previous[0], previous[1], old_score=previous[2])
+        apply_rating_change(current[0], current[1], new_score=current[2])
+    else:
+        apply_rating_change(current[0], current[1], previous and previous[2], current[2])
+    instance._taste_score = current
+
+
+@receiver(post_delete, sender=Rating)
+def update_taste_on_delete(sender, instance, **kwargs):
+    if aggregates_suppressed_now():
+        return
+    previous = getattr(instance, '_taste_score', None)
+    if previous is None or None in previous:
+        rebuild_taste_for_restaurant(instance.restaurant_id)
+    else:
+        apply_rating_change(previous[0], previous[1], old_score=previous[2])
+
+
+@receiver(pre_delete, sender=Restaurant)
+def update_taste_on_restaurant_delete(sender, instance, **kwargs):
+    # Restaurant supprimé (ou compétition, groupe) : ses évaluations partent en un lot
+    if aggregates_suppressed_now():
+        return
+    apply_restaurant_removal(instance.pk)
+
+
+@receiver(pre_delete, sender=Competition)
+def update_taste_on_archived_competition_delete(sender, instance, **kwargs):
+    # Compétition archivée : ses évaluations ne sont plus que dans l'archive supprimée avec elle
+    if aggregates_suppressed_now():
+        return
+    apply_archive_removal(instance)
@@ -0,0 +1,221 @@
+import math
+import operator
+from collections import defaultdict
+from functools import reduce
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, FloatField, IntegerField, Q, Value, When
+
+from competitions.archive import archives_of, load_archive
+from competitions.models import Competition
+from restaurants.models import Rating, Restaurant
+
+from .models import TasteCompatibility
+from .recommendations import rating_matrix
+
+STAT_FIELDS = ['shared_count', 'sum_x', 'sum_y', 'sum_xx', 'sum_yy', 'sum_xy']
+
+
+def overall_score(scores):
+    """Note globale à partir des notes par critère, comme la colonne Rating.overall_score."""
+    return None if scores is None else sum(scores) / len(scores)
+
+
+def pearson(shared_count, sum_x, sum_y, sum_xx, sum_yy, sum_xy):
+    """
+    Corrélation de Pearson à partir des sommes d'une paire ; None sous
+    TASTE_MIN_SHARED_RATINGS restaurants communs ou si l'un des deux a donné
+    partout la même note.
+    """
+    if shared_count < getattr(settings, 'TASTE_MIN_SHARED_RATINGS', 3):
+        return None
+    covariance = sum_xy - sum_x * sum_y / shared_count
+    variance_x = sum_xx - sum_x ** 2 / shared_count
+    variance_y = sum_yy - sum_y ** 2 / shared_count
+    if variance_x <= 1e-9 or variance_y <= 1e-9:
+        return None
+    return max(-1.0, min(1.0, covariance / math.sqrt(variance_x * variance_y)))
+
+
+def pair_statistics(ratings):
+    """
+    Sommes de toutes les paires d'utilisateurs sur leurs restaurants communs,
+    en produits de la matrice utilisateur × restaurant X (0 hors des cases
+    notées) et de son masque M : n = M Mᵀ, Σx = X Mᵀ, Σx² = X² Mᵀ, Σxy = X Xᵀ.
+    Retourne (utilisateurs, {champ: matrice}), x en ligne et y en colonne.
+    """
+    users, _, scores, rated = rating_matrix(ratings)
+    mask = rated.astype(float)
+    sum_x = scores @ mask.T
+    sum_xx = (scores ** 2) @ mask.T
+    return users, {
+        'shared_count': mask @ mask.T,
+        'sum_x': sum_x,
+        'sum_y': sum_x.T,
+        'sum_xx': sum_xx,
+        'sum_yy': sum_xx.T,
+        'sum_xy': scores @ scores.T,
+    }
+
+
+def rebuild_taste(group_id):
+    """
+    Recalcule toutes les paires d'un groupe, évaluations des compétitions
+    archivées comprises ; retourne le nombre de paires.
+    """
+    ratings = list(Rating.objects.filter(
+        restaurant__competition__group_id=group_id
+    ).values_list('user_id', 'restaurant_id', 'overall_score'))
+    for _, archive in archives_of(Competition.objects.filter(group_id=group_id)):
+        ratings.extend(
+            (rating['user_id'], rating['restaurant_id'], rating['overall_score']) for rating in archive.ratings
+        )
+    with transaction.atomic():
+        TasteCompatibility.objects.filter(group_id=group_id).delete()
+        if not ratings:
+            return 0
+        users, stats = pair_statistics(ratings)
+        # Paires (i < j) : les utilisateurs sont triés, user_id < other_user_id
+        first, second = np.triu_indices(len(users), k=1)
+        shared = stats['shared_count'][first, second] > 0
+        pairs = TasteCompatibility.objects.bulk_create(
+            (
+                TasteCompatibility(
+                    group_id=group_id,
+                    user_id=int(users[i]),
+                    other_user_id=int(users[j]),
+                    shared_count=int(stats['shared_count'][i, j]),
+                    **{field: float(stats[field][i, j]) for field in STAT_FIELDS[1:]},
+                )
+                for i, j in zip(first[shared], second[shared])
+            ),
+            batch_size=1000,
+        )
+    return len(pairs)
+
+
+def rebuild_taste_for_restaurant(restaurant_id):
+    group_id = Restaurant.objects.filter(pk=restaurant_id).values_list('competition__group_id', flat=True).first()
+    if group_id is not None:
+        rebuild_taste(group_id)
+
+
+def _contribution(user_id, score, other_id, other_score):
+    x, y = (score, other_score) if user_id < other_id else (other_score, score)
+    return np.array([1, x, y, x * x, y * y, x * y])
+
+
+def apply_rating_change(user_id, restaurant_id, old_score=None, new_score=None):
+    """
+    Met à jour les paires entre l'auteur d'une note et les autres évaluateurs
+    du restaurant, après une création (old_score None), une modification ou
+    une suppression (new_score None) : une lecture, l'insertion des paires
+    manquantes à la création, puis un seul UPDATE (un CASE par colonne).
+    """
+    if old_score == new_score:
+        return
+    others = list(Rating.objects.filter(
+        restaurant_id=restaurant_id
+    ).exclude(user_id=user_id).values_list('user_id', 'overall_score', 'restaurant__competition__group_id'))
+    if not others:
+        return
+    group_id = others[0][2]
+
+    deltas = {}
+    for other_id, other_score, _ in others:
+        delta = np.zeros(len(STAT_FIELDS))
+        if old_score is not None:
+            delta -= _contribution(user_id, old_score, other_id, other_score)
+        if new_score is not None:
+            delta += _contribution(user_id, new_score, other_id, other_score)
+        deltas[(min(user_id, other_id), max(user_id, other_id))] = delta
+
+    if old_score is None:
+        TasteCompatibility.objects.bulk_create(
+            [TasteCompatibility(group_id=group_id, user_id=first, other_user_id=second) for first, second in deltas],
+            ignore_conflicts=True,
+        )
+    _apply_deltas(group_id, deltas)
+
+
+def _removal_deltas(ratings):
+    """Variations des paires quand des notes (utilisateur, restaurant, note) disparaissent ensemble."""
+    by_restaurant = defaultdict(list)
+    for user_id, restaurant_id, score in ratings:
+        by_restaurant[restaurant_id].append((user_id, score))
+    deltas = defaultdict(lambda: np.zeros(len(STAT_FIELDS)))
+    for rated in by_restaurant.values():
+        for index, (user_id, score) in enumerate(rated):
+            for other_id, other_score in rated[index + 1:]:
+                deltas[(min(user_id, other_id), max(user_id, other_id))] -= _contribution(
+                    user_id, score, other_id, other_score
+                )
+    return deltas
+
+
+def apply_restaurant_removal(restaurant_id):
+    """
+    Retire des paires les contributions de toutes les notes d'un restaurant,
+    lues avant sa suppression : la cascade supprime ses évaluations en un
+    seul lot, puis chaque post_delete ne trouve plus les autres notes.
+    """
+    ratings = list(Rating.objects.filter(
+        restaurant_id=restaurant_id
+    ).values_list('user_id', 'restaurant_id', 'overall_score', 'restaurant__competition__group_id'))
+    deltas = _removal_deltas(rating[:3] for rating in ratings)
+    if deltas:
+        _apply_deltas(ratings[0][3], deltas)
+
+
+def apply_archive_removal(competition):
+    """Retire des paires les contributions des évaluations archivées d'une compétition supprimée."""
+    archive = load_archive(competition)
+    if archive is None:
+        return
+    deltas = _removal_deltas(
+        (rating['user_id'], rating['restaurant_id'], rating['overall_score']) for rating in archive.ratings
+    )
+    if deltas:
+        _apply_deltas(competition.group_id, deltas)
+
+
+def _apply_deltas(group_id, deltas):
+    """
+    Ajoute les variations {(user_id, other_user_id): delta par champ} aux
+    paires en un seul UPDATE ; les paires sans restaurant commun sont
+    supprimées, comme après un recalcul complet.
+    """
+    updates = {}
+    for index, field in enumerate(STAT_FIELDS):
+        cast, output_field = (int, IntegerField()) if field == 'shared_count' else (float, FloatField())
+        whens = [
+            When(user_id=first, other_user_id=second, then=Value(cast(delta[index])))
+            for (first, second), delta in deltas.items()
+            if delta[index]
+        ]
+        if whens:
+            updates[field] = F(field) + Case(*whens, default=Value(cast(0)), output_field=output_field)
+    if not updates:
+        return
+    pairs = TasteCompatibility.objects.filter(group_id=group_id).filter(
+        reduce(operator.or_, (Q(user_id=first, other_user_id=second) for first, second in deltas))
+    )
+    pairs.update(**updates)
+    if any(delta[0] < 0 for delta in deltas.values()):
+        pairs.filter(shared_count__lte=0).delete()
+
+
+def compatibilities_for(group_id, user_id):
+    """{autre membre: {'score', 'shared_count'}} pour un membre du groupe, en une requête."""
+    compatibilities = {}
+    for first, second, *stats in TasteCompatibility.objects.filter(group_id=group_id).filter(
+        Q(user_id=user_id) | Q(other_user_id=user_id)
+    ).values_list('user_id', 'other_user_id', *STAT_FIELDS):
+        score = pearson(*stats)
+        compatibilities[second if first == user_id else first] = {
+            'score': None if score is None else round(score, 2),
+            'shared_count': stats[0],
+        }
+    return compatibilities
@@ -1,3 +1,133 @@
+from datetime import date
+
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from competitions.archive import archive_competition
+from competitions.models import Competition
+from restaurants.models import Rating, Restaurant
+from users.models import User
+
+from .contacts import refresh_contacts
+from .models import Contact, Group, GroupMember, TasteCompatibility
+from .taste import STAT_FIELDS, rebuild_taste
+
+
+class TasteCompatibilityTests(TestCase):
+    """Les sommes tenues à jour par les signaux égalent un recalcul complet."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com', password='x')
+            for i in range(4)
+        ]
+        cls.group = Group.objects.create(name='Goûts', creator=cls.users[0])
+        for user in cls.users:
+            GroupMember.objects.create(group=cls.group, user=user)
+        cls.competitions = [
+            Competition.objects.create(
+                name=f'Compétition {c}', description='', creator=cls.users[0], group=cls.group,
+                start_date=date(2024, 1, 1), end_date=date(2024, 12, 31), status='active',
+            )
+            for c in range(2)
+        ]
+        cls.restaurants = []
+        for r in range(6):
+            restaurant = Restaurant.objects.create(
+                name=f'Restaurant {r}', address=f'{r} rue des Tests', cuisine_type='test',
+                competition=cls.competitions[r % 2], suggested_by=cls.users[0], visit_date=date(2024, 2, 1),
+            )
+            cls.restaurants.append(restaurant)
+            for u, user in enumerate(cls.users):
+                if (r + u) % 5 == 4:
+                    continue
+                Rating.objects.create(
+                    restaurant=restaurant, user=user,
+                    food_score=1 + (r * 3 + u) % 5, service_score=1 + (r + u * 2) % 5,
+                    ambiance_score=1 + (r * u) % 5, value_score=3,
+                )
+
+    def stored_pairs(self):
+        return {
+            (pair.user_id, pair.other_user_id): tuple(round(getattr(pair, field), 6) for field in STAT_FIELDS)
+            for pair in TasteCompatibility.objects.filter(group=self.group)
+        }
+
+    def assertMatchesRebuild(self):
+        incremental = self.stored_pairs()
+        rebuild_taste(self.group.id)
+        self.assertEqual(incremental, self.stored_pairs())
+
+    def test_rating_changes(self):
+        rating = Rating.objects.filter(restaurant=self.restaurants[0]).first()
+        rating.food_score = 6 - rating.food_score
+        rating.save()
+        Rating.objects.filter(restaurant=self.restaurants[1]).first().delete()
+        self.assertMatchesRebuild()
+
+    def test_restaurant_delete(self):
+        self.restaurants[0].delete()
+        self.assertMatchesRebuild()
+
+    def test_competition_delete(self):
+        self.competitions[1].delete()
+        self.assertMatchesRebuild()
+        self.assertTrue(TasteCompatibility.objects.filter(group=self.group).exists())
+
+    def archive(self, competition):
+        Competition.objects.filter(pk=competition.pk).update(status='completed')
+        competition.refresh_from_db()
+        archive_competition(competition)
+
+    def test_archive_keeps_history(self):
+        before = self.stored_pairs()
+        self.archive(self.competitions[1])
+        self.assertEqual(self.stored_pairs(), before)
+        self.assertMatchesRebuild()
+
+    def test_archived_competition_delete(self):
+        self.archive(self.competitions[1])
+        Competition.objects.get(pk=self.competitions[1].pk).delete()
+        self.assertMatchesRebuild()
+
+
+class ContactTests(TestCase):
+    """La table des contacts suit les adhésions, y compris quand elles sont modifiées."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com', password='x')
+            for i in range(4)
+        ]
+        cls.first = Group.objects.create(name='Premier', creator=cls.users[0])
+        cls.second = Group.objects.create(name='Second', creator=cls.users[0])
+        GroupMember.objects.create(group=cls.first, user=cls.users[0], role='admin')
+        GroupMember.objects.create(group=cls.second, user=cls.users[0], role='admin')
+        cls.membership = GroupMember.objects.create(group=cls.first, user=cls.users[1])
+        GroupMember.objects.create(group=cls.second, user=cls.users[2])
+
+    def contacts(self):
+        return set(Contact.objects.values_list('user_id', 'visible_user_id', 'shared_group_count'))
+
+    def assertMatchesMemberships(self):
+        stored = self.contacts()
+        Contact.objects.all().delete()
+        for user in self.users:
+            refresh_contacts(user.id)
+        self.assertEqual(stored, self.contacts())
+
+    def test_group_change(self):
+        client = APIClient()
+        client.force_authenticate(self.users[0])
+        response = client.patch(f'/api/group-members/{self.membership.id}/', {'group': self.second.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn((self.users[1].id, self.users[2].id, 1), self.contacts())
+        self.assertMatchesMemberships()
 
-# Create your tests here.
+    def test_user_change(self):
+        self.membership.user = self.users[3]
+        self.membership.save()
+        self.assertNotIn(self.users[1].id, {user_id for user_id, _, _ in self.contacts()})
+        self.assertMatchesMemberships()
@@ -0,0 +1,42 @@
+# Configuration Gunicorn partagée par le Dockerfile et les plateformes (Procfile, render.yaml)
+import os
+import time
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# Processus et threads : les mêmes variables dimensionnent le pool de connexions
+# à la base dans config/settings.py (un thread = au plus une connexion empruntée)
+workers = int(os.getenv('WEB_CONCURRENCY', '3'))
+threads = int(os.getenv('GUNICORN_THREADS', '1'))
+worker_class = 'gthread' if threads > 1 else 'sync'
+
+# Django est chargé et préchauffé une seule fois dans le maître, puis partagé par fork
+preload_app = True
+
+accesslog = '-'
+errorlog = '-'
+
+# Début du démarrage : fourni par entrypoint.sh, sinon lancement de Gunicorn
+BOOT_STARTED_AT = float(os.getenv('BOOT_STARTED_AT') or time.time())
+
+
+def when_ready(server):
+    from config.warmup import warm_up_application
+
+    warm_up_application()
+    server.log.info("Boot: application chargée et préchauffée en %.2fs", time.time() - BOOT_STARTED_AT)
+
+
+def post_fork(server, worker):
+    from config.warmup import warm_up_worker
+
+    worker.first_request_logged = False
+    warm_up_worker()
+
+
+def pre_request(worker, req):
+    if not worker.first_request_logged:
+        worker.first_request_logged = True
+        worker.log.info(
+            "Boot: première requête du worker %s après %.2fs", worker.pid, time.time() - BOOT_STARTED_AT
+        )
@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Restaurant, Rating
+from .models import Place, Restaurant, Rating, ScoreHistogram
 
+admin.site.register(Place)
 admin.site.register(Restaurant)
-admin.site.register(Rating)
\ No newline at end of file
+admin.site.register(Rating)
+admin.site.register(ScoreHistogram)
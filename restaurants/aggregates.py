@@ -0,0 +1,24 @@
+import threading
+from contextlib import contextmanager
+
+_state = threading.local()
+
+
+def aggregates_suppressed_now():
+    return getattr(_state, 'suppressed', False)
+
+
+@contextmanager
+def aggregates_suppressed():
+    """
+    Suspend (thread courant) la mise à jour par signal des agrégats tirés des
+    évaluations : histogrammes, compatibilités de goûts, instantanés de
+    résultats. Pour les suppressions de masse qui recalculent ensuite ces
+    agrégats en une fois (ex. archivage).
+    """
+    previous = aggregates_suppressed_now()
+    _state.suppressed = True
+    try:
+        yield
+    finally:
+        _state.suppressed = previous
@@ -0,0 +1,218 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+
+from .matching import tokenize
+
+NAME = 'name'
+CUISINE_TYPE = 'cuisine_type'
+
+
+class _Node:
+    __slots__ = ('children', 'entries')
+
+    def __init__(self):
+        self.children = {}
+        # (type, valeur affichée) -> {group_id: nombre de restaurants}
+        self.entries = None
+
+
+class AutocompleteIndex:
+    """
+    Trie en mémoire des noms de restaurants et types de cuisine.
+
+    Chaque valeur est indexée sous chacun de ses suffixes de mots ("sushi bar"
+    et "bar") pour que la saisie du deuxième mot suggère aussi le nom complet.
+    Les entrées portent les groupes où elles apparaissent afin de filtrer les
+    suggestions sur les groupes de l'utilisateur sans requête SQL.
+    """
+
+    def __init__(self):
+        self.root = _Node()
+        self.competition_groups = {}
+        self.built_at = None
+        self.expired = False
+        # Nombre de mises à jour par les signaux (détecte celles faites pendant une reconstruction)
+        self.updates = 0
+        self.lock = threading.RLock()
+        # Une seule reconstruction à la fois par processus
+        self.rebuild_lock = threading.Lock()
+
+    # -- Construction --------------------------------------------------------
+
+    @staticmethod
+    def _keys(value):
+        tokens = tokenize(value)
+        return [' '.join(tokens[i:]) for i in range(len(tokens))]
+
+    def _update(self, kind, value, group_id, delta, root=None):
+        if not value:
+            return
+        for key in self._keys(value):
+            node = self.root if root is None else root
+            for char in key:
+                node = node.children.setdefault(char, _Node())
+            if node.entries is None:
+                node.entries = {}
+            groups = node.entries.setdefault((kind, value), {})
+            groups[group_id] = groups.get(group_id, 0) + delta
+            if groups[group_id] <= 0:
+                del groups[group_id]
+                if not groups:
+                    del node.entries[(kind, value)]
+
+    def add(self, name, cuisine_type, group_id):
+        with self.lock:
+            self.updates += 1
+            self._update(NAME, name, group_id, 1)
+            self._update(CUISINE_TYPE, cuisine_type, group_id, 1)
+
+    def remove(self, name, cuisine_type, group_id):
+        with self.lock:
+            self.updates += 1
+            self._update(NAME, name, group_id, -1)
+            self._update(CUISINE_TYPE, cuisine_type, group_id, -1)
+
+    def rebuild(self):
+        """
+        Reconstruit l'index complet à partir d'une projection des restaurants.
+        La lecture se fait hors du verrou : les recherches continuent sur
+        l'ancien index, remplacé d'un bloc une fois le nouveau construit.
+        """
+        from competitions.models import Competition
+        from .models import Restaurant
+
+        updates = self.updates
+        root = _Node()
+        competition_groups = dict(Competition.objects.values_list('id', 'group_id'))
+        rows = Restaurant.objects.values_list(
+            'name', 'cuisine_type', 'competition_id'
+        ).iterator(chunk_size=2000)
+        for name, cuisine_type, competition_id in rows:
+            group_id = competition_groups.get(competition_id)
+            self._update(NAME, name, group_id, 1, root=root)
+            self._update(CUISINE_TYPE, cuisine_type, group_id, 1, root=root)
+
+        with self.lock:
+            self.root = root
+            self.competition_groups = competition_groups
+            # Changements arrivés pendant la lecture : peut-être absents, nouvelle reconstruction
+            self.expired = self.updates != updates
+            self.built_at = time.monotonic()
+
+    def invalidate(self):
+        """Demande une reconstruction (l'index actuel reste servi d'ici là)."""
+        self.expired = True
+
+    def _rebuild_in_background(self):
+        try:
+            self.rebuild()
+        finally:
+            self.rebuild_lock.release()
+            # Connexions ouvertes par ce thread (rendues au pool le cas échéant)
+            connections.close_all()
+
+    def ensure_fresh(self):
+        """
+        Construit l'index au premier appel. Ensuite, un index trop ancien ou
+        invalidé est reconstruit dans un thread d'arrière-plan pendant que
+        les requêtes continuent sur l'index actuel, tenu à jour entre-temps
+        par les signaux de Restaurant.
+        """
+        if self.built_at is None:
+            with self.rebuild_lock:
+                if self.built_at is None:
+                    self.rebuild()
+            return
+
+        max_age = getattr(settings, 'AUTOCOMPLETE_MAX_AGE', 300)
+        if not self.expired and time.monotonic() - self.built_at <= max_age:
+            return
+        if self.rebuild_lock.acquire(blocking=False):
+            try:
+                threading.Thread(target=self._rebuild_in_background, daemon=True).start()
+            except Exception:
+                self.rebuild_lock.release()
+                raise
+
+    def group_for_competition(self, competition_id):
+        if competition_id not in self.competition_groups:
+            from competitions.models import Competition
+
+            self.competition_groups[competition_id] = (
+                Competition.objects.filter(id=competition_id)
+                .values_list('group_id', flat=True).first()
+            )
+        return self.competition_groups[competition_id]
+
+    # -- Recherche -----------------------------------------------------------
+
+    def _collect(self, node, group_ids, found, limit):
+        """Parcourt le sous-arbre et ajoute les entrées visibles à `found`."""
+        stack = [node]
+        while stack and len(found) < limit:
+            current = stack.pop()
+            if current.entries:
+                for entry, groups in current.entries.items():
+                    if entry not in found and not group_ids.isdisjoint(groups):
+                        found[entry] = None
+                        if len(found) >= limit:
+                            return
+            stack.extend(current.children[c] for c in sorted(current.children, reverse=True))
+
+    def _fuzzy_nodes(self, query, max_edits):
+        """
+        Noeuds dont le chemin est à au plus `max_edits` modifications de la
+        saisie (distance de Levenshtein calculée ligne par ligne en
+        descendant le trie, branches élaguées dès que le minimum dépasse).
+        """
+        matches = []
+        first_row = list(range(len(query) + 1))
+        stack = [(self.root, first_row)]
+        while stack:
+            node, previous_row = stack.pop()
+            for char, child in node.children.items():
+                row = [previous_row[0] + 1]
+                for i, query_char in enumerate(query, start=1):
+                    row.append(min(
+                        row[i - 1] + 1,
+                        previous_row[i] + 1,
+                        previous_row[i - 1] + (query_char != char),
+                    ))
+                if row[-1] <= max_edits:
+                    matches.append((row[-1], child))
+                elif min(row) <= max_edits:
+                    stack.append((child, row))
+        matches.sort(key=lambda match: match[0])
+        return [node for _, node in matches]
+
+    def search(self, query, group_ids, limit=10):
+        """Suggestions par préfixe, complétées par des préfixes à une faute près."""
+        query = ' '.join(tokenize(query))
+        group_ids = set(group_ids)
+        if not query or not group_ids:
+            return []
+
+        found = {}
+        with self.lock:
+            node = self.root
+            for char in query:
+                node = node.children.get(char)
+                if node is None:
+                    break
+            else:
+                self._collect(node, group_ids, found, limit)
+
+            # Tolérance aux fautes de frappe au-delà de 3 caractères saisis
+            if len(found) < limit and len(query) > 3:
+                for fuzzy_node in self._fuzzy_nodes(query, max_edits=1):
+                    self._collect(fuzzy_node, group_ids, found, limit)
+                    if len(found) >= limit:
+                        break
+
+        return [{'type': kind, 'value': value} for kind, value in found]
+
+
+index = AutocompleteIndex()
@@ -0,0 +1,102 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, Count, F, Value, When
+
+from .models import SCORE_CRITERIA, Rating, ScoreHistogram
+
+COUNT_FIELDS = [f'count_{score}' for score in range(1, 6)]
+
+
+def rating_scores(instance):
+    """Notes d'une évaluation par critère, ou None si un champ n'est pas chargé."""
+    # Lecture via __dict__ pour ne pas charger les champs différés (.only())
+    values = instance.__dict__
+    scores = tuple(values.get(f'{criterion}_score') for criterion in SCORE_CRITERIA)
+    return None if None in scores else scores
+
+
+def score_deltas(old_scores=None, new_scores=None):
+    """Variations des compteurs {(critère, note): delta} entre deux jeux de notes."""
+    deltas = defaultdict(int)
+    for index, criterion in enumerate(SCORE_CRITERIA):
+        old = old_scores[index] if old_scores else None
+        new = new_scores[index] if new_scores else None
+        if old == new:
+            continue
+        if old is not None:
+            deltas[(criterion, old)] -= 1
+        if new is not None:
+            deltas[(criterion, new)] += 1
+    return {key: delta for key, delta in deltas.items() if delta}
+
+
+def apply_score_deltas(restaurant_id, deltas):
+    """
+    Applique les variations aux compteurs d'un restaurant en un seul UPDATE
+    (un CASE par colonne de note). Si des lignes manquent (premier avis sur
+    ce critère), les histogrammes du restaurant sont recalculés.
+    """
+    if not deltas:
+        return
+    criteria = {criterion for criterion, _ in deltas}
+    updates = {}
+    for score, field in enumerate(COUNT_FIELDS, start=1):
+        whens = [
+            When(criterion=criterion, then=Value(delta))
+            for (criterion, delta_score), delta in deltas.items()
+            if delta_score == score
+        ]
+        if whens:
+            updates[field] = F(field) + Case(*whens, default=Value(0))
+
+    updated = ScoreHistogram.objects.filter(
+        restaurant_id=restaurant_id, criterion__in=criteria
+    ).update(**updates)
+    if updated < len(criteria):
+        rebuild_histograms([restaurant_id])
+
+
+def compute_histograms(restaurant_ids):
+    """Compteurs attendus {(restaurant, critère): [n1..n5]} recalculés depuis les évaluations."""
+    histograms = defaultdict(lambda: [0] * 5)
+    ratings = Rating.objects.filter(restaurant_id__in=restaurant_ids).order_by()
+    for criterion in SCORE_CRITERIA:
+        field = f'{criterion}_score'
+        for restaurant_id, score, count in ratings.values(
+            'restaurant_id', field
+        ).annotate(count=Count('id')).values_list('restaurant_id', field, 'count'):
+            histograms[(restaurant_id, criterion)][score - 1] = count
+    return histograms
+
+
+def rebuild_histograms(restaurant_ids):
+    """Réécrit les histogrammes des restaurants donnés à partir des évaluations."""
+    restaurant_ids = list(restaurant_ids)
+    histograms = compute_histograms(restaurant_ids)
+    with transaction.atomic():
+        # Pas de ligne pour un critère sans note (restaurant sans avis ou en cours de suppression)
+        ScoreHistogram.objects.filter(restaurant_id__in=restaurant_ids).delete()
+        ScoreHistogram.objects.bulk_create(
+            [
+                ScoreHistogram(
+                    restaurant_id=restaurant_id,
+                    criterion=criterion,
+                    **dict(zip(COUNT_FIELDS, counts)),
+                )
+                for (restaurant_id, criterion), counts in histograms.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['restaurant', 'criterion'],
+            update_fields=COUNT_FIELDS,
+        )
+
+
+def histograms_for(restaurant_ids):
+    """Histogrammes stockés {restaurant: {critère: [n1..n5]}} en une requête."""
+    histograms = defaultdict(lambda: {criterion: [0] * 5 for criterion in SCORE_CRITERIA})
+    for restaurant_id, criterion, *counts in ScoreHistogram.objects.filter(
+        restaurant_id__in=restaurant_ids
+    ).values_list('restaurant_id', 'criterion', *COUNT_FIELDS):
+        histograms[restaurant_id][criterion] = counts
+    return histograms
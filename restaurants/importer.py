@@ -0,0 +1,143 @@
+import csv
+import io
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from groups.activity import build_activity
+from groups.changelog import change, log_changes
+from groups.models import Activity
+from .autocomplete import index as autocomplete_index
+from .matching import PlaceMatcher
+from .models import Restaurant
+
+IMPORT_FIELDS = ['name', 'address', 'cuisine_type', 'visit_date']
+IMPORT_BATCH_SIZE = 500
+
+# Champs renseignés par l'import lui-même, exclus de la validation ligne par ligne
+EXCLUDED_FROM_VALIDATION = ['suggested_by', 'competition', 'place', 'image']
+
+
+# Erreurs de lecture possibles à tout moment : le fichier est décodé au fil de l'eau
+READ_ERRORS = (UnicodeDecodeError, csv.Error)
+
+
+class ImportFormatError(Exception):
+    """Fichier illisible ou en-tête incomplet : aucune ligne n'est importée."""
+
+
+def open_csv(uploaded_file):
+    """Lecteur CSV incrémental sur un fichier binaire (upload ou fichier ouvert en 'rb')."""
+    text = io.TextIOWrapper(uploaded_file, encoding='utf-8-sig', newline='')
+    reader = csv.DictReader(text)
+    try:
+        fieldnames = reader.fieldnames or []
+    except READ_ERRORS:
+        raise ImportFormatError("Fichier illisible : un CSV encodé en UTF-8 est attendu.")
+    missing = [field for field in IMPORT_FIELDS if field not in fieldnames]
+    if missing:
+        raise ImportFormatError(f"Colonnes manquantes : {', '.join(missing)}.")
+    return reader
+
+
+def _validate_batch(rows, competition, user):
+    """Valide un lot de lignes avec les règles des champs de Restaurant."""
+    valid, errors = [], []
+    for line, row in rows:
+        restaurant = Restaurant(
+            competition=competition,
+            suggested_by=user,
+            **{field: (row.get(field) or '').strip() for field in IMPORT_FIELDS},
+        )
+        try:
+            # Pas de contrôle d'unicité : il ferait une requête par ligne
+            restaurant.full_clean(
+                exclude=EXCLUDED_FROM_VALIDATION,
+                validate_unique=False,
+                validate_constraints=False,
+            )
+        except ValidationError as e:
+            errors.append({'line': line, 'errors': e.message_dict})
+        else:
+            valid.append(restaurant)
+    return valid, errors
+
+
+def _read_batch(reader, batch_size):
+    """
+    Lit au plus `batch_size` lignes numérotées. Retourne (lignes, erreur) : en
+    cas de fichier illisible, les lignes lues avant l'erreur sont conservées.
+    """
+    rows = []
+    try:
+        for row in reader:
+            rows.append((reader.line_num, row))
+            if len(rows) == batch_size:
+                break
+    except READ_ERRORS as e:
+        return rows, e
+    return rows, None
+
+
+def import_restaurants(reader, competition, user, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Importe les restaurants d'un lecteur CSV par lots de `batch_size` lignes.
+
+    Chaque lot est validé, rattaché aux lieux canoniques (une requête de
+    blocage par lot) puis inséré avec bulk_create : la mémoire reste bornée
+    à un lot quel que soit le nombre de lignes. Retourne un rapport avec le
+    nombre de restaurants créés et les erreurs par ligne.
+
+    Si le fichier devient illisible en cours de route, les lots précédents
+    restent importés : la lecture s'arrête et le rapport reçoit un `detail`
+    indiquant la ligne fautive et le nombre de restaurants déjà créés.
+    """
+    report = {'created': 0, 'errors': []}
+    matcher = PlaceMatcher()
+    read_error = None
+
+    while read_error is None:
+        rows, read_error = _read_batch(reader, batch_size)
+        if not rows:
+            break
+
+        restaurants, errors = _validate_batch(rows, competition, user)
+        report['errors'].extend(errors)
+        if not restaurants:
+            continue
+
+        matcher.prefetch((r.name, r.address) for r in restaurants)
+        with transaction.atomic():
+            for restaurant in restaurants:
+                restaurant.place = matcher.resolve(restaurant.name, restaurant.address)
+            Restaurant.objects.bulk_create(restaurants)
+            Activity.objects.bulk_create(
+                build_activity(
+                    competition.group_id, 'restaurant_suggested',
+                    actor=user, competition=competition, restaurant=restaurant,
+                )
+                for restaurant in restaurants
+            )
+            log_changes(*(
+                change('restaurant', restaurant.id, 'create', competition.group_id)
+                for restaurant in restaurants
+            ))
+        report['created'] += len(restaurants)
+
+        # bulk_create n'envoie pas de signaux : mise à jour explicite de l'autocomplétion
+        if autocomplete_index.built_at is not None:
+            for restaurant in restaurants:
+                autocomplete_index.add(restaurant.name, restaurant.cuisine_type, competition.group_id)
+
+    if read_error is not None:
+        # Le décodage se fait par blocs : la ligne signalée peut précéder la ligne fautive
+        line = reader.line_num + 1
+        report['errors'].append({
+            'line': line,
+            'errors': {'file': ["Fichier illisible à partir de cette ligne : un CSV encodé en UTF-8 est attendu."]},
+        })
+        report['detail'] = (
+            f"Import interrompu ligne {line} : fichier illisible. "
+            f"{report['created']} restaurant(s) déjà importé(s)."
+        )
+    return report
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from groups.changelog import change, log_changes
+
+from restaurants.matching import PlaceMatcher
+from restaurants.models import Place, Restaurant
+
+
+class Command(BaseCommand):
+    help = "Rattache les restaurants existants à leur lieu canonique (Place)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--rematch', action='store_true',
+            help="Recalcule le lieu de tous les restaurants, pas seulement ceux sans lieu.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = Restaurant.objects.order_by('pk')
+        if not options['rematch']:
+            queryset = queryset.filter(place__isnull=True)
+
+        matcher = PlaceMatcher()
+        last_pk, linked = 0, 0
+        while True:
+            batch = list(
+                queryset.filter(pk__gt=last_pk).only('pk', 'name', 'address', 'place')
+                .annotate(group_id=F('competition__group_id'))[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            # Une seule requête par lot pour charger les blocs candidats
+            matcher.prefetch((r.name, r.address) for r in batch)
+            with transaction.atomic():
+                for restaurant in batch:
+                    restaurant.place = matcher.resolve(restaurant.name, restaurant.address)
+                Restaurant.objects.bulk_update(batch, ['place'])
+                # bulk_update n'envoie pas de signaux : journal de synchronisation explicite
+                log_changes(*(change('restaurant', r.pk, 'update', r.group_id) for r in batch))
+            linked += len(batch)
+
+        if options['rematch']:
+            # Les lieux fusionnés ne sont plus référencés par aucun restaurant
+            Place.objects.filter(restaurants__isnull=True).delete()
+
+        self.stdout.write(self.style.SUCCESS(f"{linked} restaurant(s) rattaché(s) à un lieu."))
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from restaurants.histograms import COUNT_FIELDS, compute_histograms, rebuild_histograms
+from restaurants.models import Restaurant, ScoreHistogram
+
+
+class Command(BaseCommand):
+    help = (
+        "Vérifie que les histogrammes de notes correspondent aux évaluations "
+        "et, avec --fix, recalcule ceux qui divergent."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--fix', action='store_true', help="Recalcule les histogrammes incohérents.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pk, checked, mismatched = 0, 0, []
+        while True:
+            ids = list(
+                Restaurant.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            last_pk = ids[-1]
+
+            expected = compute_histograms(ids)
+            stored = {
+                (restaurant_id, criterion): list(counts)
+                for restaurant_id, criterion, *counts in ScoreHistogram.objects.filter(
+                    restaurant_id__in=ids
+                ).values_list('restaurant_id', 'criterion', *COUNT_FIELDS)
+            }
+            # Une ligne à zéro équivaut à une ligne absente
+            stored = {key: counts for key, counts in stored.items() if any(counts)}
+            batch_mismatched = sorted({
+                restaurant_id
+                for restaurant_id, criterion in set(expected) | set(stored)
+                if expected.get((restaurant_id, criterion)) != stored.get((restaurant_id, criterion))
+            })
+            if batch_mismatched and options['fix']:
+                rebuild_histograms(batch_mismatched)
+            mismatched.extend(batch_mismatched)
+            checked += len(ids)
+
+        if not mismatched:
+            self.stdout.write(self.style.SUCCESS(f"{checked} restaurant(s) vérifié(s), aucun écart."))
+            return
+        sample = ', '.join(str(pk) for pk in mismatched[:20])
+        if options['fix']:
+            self.stdout.write(self.style.WARNING(
+                f"{len(mismatched)} restaurant(s) recalculé(s) sur {checked} : {sample}"
+            ))
+            return
+        raise CommandError(
+            f"{len(mismatched)} restaurant(s) incohérent(s) sur {checked} : {sample} (relancer avec --fix)"
+        )
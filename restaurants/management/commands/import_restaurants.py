@@ -0,0 +1,37 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from competitions.models import Competition
+from restaurants.importer import IMPORT_BATCH_SIZE, ImportFormatError, import_restaurants, open_csv
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "Importe des restaurants dans une compétition depuis un fichier CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument('competition_id', type=int)
+        parser.add_argument('path', help="CSV avec les colonnes name, address, cuisine_type, visit_date.")
+        parser.add_argument('--user', required=True, help="Nom de l'utilisateur qui propose les restaurants.")
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            competition = Competition.objects.get(pk=options['competition_id'])
+            user = User.objects.get(username=options['user'])
+        except (Competition.DoesNotExist, User.DoesNotExist) as e:
+            raise CommandError(str(e))
+
+        with open(options['path'], 'rb') as csv_file:
+            try:
+                reader = open_csv(csv_file)
+            except ImportFormatError as e:
+                raise CommandError(str(e))
+            report = import_restaurants(reader, competition, user, batch_size=options['batch_size'])
+
+        for error in report['errors']:
+            self.stderr.write(f"Ligne {error['line']} : {json.dumps(error['errors'], ensure_ascii=False)}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['created']} restaurant(s) importé(s), {len(report['errors'])} ligne(s) en erreur."
+        ))
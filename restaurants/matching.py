@@ -0,0 +1,161 @@
+import re
+import unicodedata
+from difflib import SequenceMatcher
+
+from django.db.models import Q
+
+# Mots trop fréquents pour distinguer deux lieux
+NAME_STOPWORDS = {
+    'le', 'la', 'les', 'l', 'du', 'de', 'des', 'd', 'au', 'aux', 'chez',
+    'et', 'the', 'restaurant', 'resto',
+}
+ADDRESS_ABBREVIATIONS = {
+    'av': 'avenue', 'ave': 'avenue', 'bd': 'boulevard', 'blvd': 'boulevard',
+    'pl': 'place', 'st': 'saint', 'ste': 'sainte', 'chem': 'chemin',
+    'imp': 'impasse', 'fbg': 'faubourg', 'r': 'rue',
+}
+POSTCODE_RE = re.compile(r'\b(\d{5})\b')
+
+# Seuil de similarité au-delà duquel deux restaurants sont le même lieu
+MATCH_THRESHOLD = 0.85
+NAME_WEIGHT = 0.6
+ADDRESS_WEIGHT = 0.4
+
+
+def tokenize(value):
+    value = unicodedata.normalize('NFKD', value or '')
+    value = ''.join(c for c in value if not unicodedata.combining(c))
+    return re.findall(r'[a-z0-9]+', value.lower())
+
+
+def normalize_name(name):
+    """Minuscules, sans accents, ponctuation ni mots vides."""
+    tokens = tokenize(name)
+    significant = [t for t in tokens if t not in NAME_STOPWORDS]
+    return ' '.join(significant or tokens)
+
+
+def normalize_address(address):
+    """Minuscules, sans accents ni ponctuation, abréviations développées."""
+    return ' '.join(ADDRESS_ABBREVIATIONS.get(t, t) for t in tokenize(address))
+
+
+def name_block_key(normalized_name):
+    """Clé de blocage sur le nom : les 4 premiers caractères sans espaces."""
+    return normalized_name.replace(' ', '')[:4]
+
+
+def address_block_key(normalized_address):
+    """Clé de blocage sur l'adresse : le code postal, sinon le début de l'adresse."""
+    match = POSTCODE_RE.search(normalized_address)
+    if match:
+        return match.group(1)
+    return normalized_address.replace(' ', '')[:8]
+
+
+def _ratio_at_least(a, b, floor):
+    """
+    Ratio difflib entre a et b, ou None s'il est forcément inférieur à `floor`.
+
+    Les bornes supérieures bon marché (longueurs, puis multiensemble de
+    caractères) évitent le calcul exact pour la plupart des candidats.
+    """
+    matcher = SequenceMatcher(None, a, b)
+    if matcher.real_quick_ratio() < floor or matcher.quick_ratio() < floor:
+        return None
+    score = matcher.ratio()
+    return score if score >= floor else None
+
+
+def similarity(name_a, address_a, name_b, address_b, threshold=0.0):
+    """
+    Score pondéré entre 0 et 1 sur les noms et adresses normalisés.
+    Retourne 0 dès qu'il est certain que le score n'atteindra pas `threshold`.
+    """
+    name_score = _ratio_at_least(name_a, name_b, (threshold - ADDRESS_WEIGHT) / NAME_WEIGHT)
+    if name_score is None:
+        return 0.0
+    if not (address_a and address_b):
+        return name_score
+    address_score = _ratio_at_least(
+        address_a, address_b, (threshold - NAME_WEIGHT * name_score) / ADDRESS_WEIGHT
+    )
+    if address_score is None:
+        return 0.0
+    return NAME_WEIGHT * name_score + ADDRESS_WEIGHT * address_score
+
+
+class PlaceMatcher:
+    """
+    Rattache des couples (nom, adresse) à un Place existant ou en crée un.
+
+    Les candidats sont cherchés uniquement dans les blocs partageant la clé
+    de nom ou la clé d'adresse (colonnes indexées), puis comparés en mémoire.
+    Les blocs déjà chargés sont mis en cache pour traiter des lots de lignes
+    (backfill, import) avec une requête par lot plutôt que par ligne.
+    """
+
+    def __init__(self, threshold=MATCH_THRESHOLD):
+        self.threshold = threshold
+        self._by_name_key = {}
+        self._by_address_key = {}
+        self._loaded_name_keys = set()
+        self._loaded_address_keys = set()
+
+    def _index(self, place):
+        self._by_name_key.setdefault(place.name_key, {})[place.pk] = place
+        self._by_address_key.setdefault(place.address_key, {})[place.pk] = place
+
+    def prefetch(self, pairs):
+        """Charge en une requête les blocs nécessaires pour une liste de (nom, adresse)."""
+        from .models import Place
+
+        name_keys, address_keys = set(), set()
+        for name, address in pairs:
+            name_keys.add(name_block_key(normalize_name(name)))
+            address_keys.add(address_block_key(normalize_address(address)))
+        name_keys -= self._loaded_name_keys
+        address_keys -= self._loaded_address_keys
+        if not name_keys and not address_keys:
+            return
+
+        for place in Place.objects.filter(
+            Q(name_key__in=name_keys) | Q(address_key__in=address_keys)
+        ):
+            self._index(place)
+        self._loaded_name_keys |= name_keys
+        self._loaded_address_keys |= address_keys
+
+    def find(self, name, address):
+        """Retourne le Place le plus proche au-dessus du seuil, ou None."""
+        self.prefetch([(name, address)])
+        normalized_name = normalize_name(name)
+        normalized_address = normalize_address(address)
+        candidates = dict(self._by_name_key.get(name_block_key(normalized_name), {}))
+        candidates.update(self._by_address_key.get(address_block_key(normalized_address), {}))
+
+        best, best_score = None, self.threshold
+        for place in candidates.values():
+            score = similarity(
+                normalized_name, normalized_address,
+                place.normalized_name, place.normalized_address,
+                threshold=best_score,
+            )
+            if score >= best_score:
+                best, best_score = place, score
+        return best
+
+    def resolve(self, name, address):
+        """Retourne le Place correspondant, en le créant si aucun ne correspond."""
+        from .models import Place
+
+        place = self.find(name, address)
+        if place is None:
+            # Clé normalisée unique : deux créations concurrentes donnent le même lieu
+            place, _ = Place.objects.get_or_create(
+                normalized_name=normalize_name(name),
+                normalized_address=normalize_address(address),
+                defaults={'name': name, 'address': address},
+            )
+            self._index(place)
+        return place
@@ -0,0 +1,93 @@
+# Generated by Django 5.1.7 on 2026-10-19 19:01
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurants", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Place",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                ("address", models.TextField()),
+                ("normalized_name", models.CharField(editable=False, max_length=100)),
+                ("normalized_address", models.TextField(editable=False)),
+                (
+                    "name_key",
+                    models.CharField(db_index=True, editable=False, max_length=8),
+                ),
+                (
+                    "address_key",
+                    models.CharField(db_index=True, editable=False, max_length=8),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name="rating",
+            name="ambiance_score",
+            field=models.IntegerField(
+                validators=[
+                    django.core.validators.MinValueValidator(1),
+                    django.core.validators.MaxValueValidator(5),
+                ]
+            ),
+        ),
+        migrations.AlterField(
+            model_name="rating",
+            name="food_score",
+            field=models.IntegerField(
+                validators=[
+                    django.core.validators.MinValueValidator(1),
+                    django.core.validators.MaxValueValidator(5),
+                ]
+            ),
+        ),
+        migrations.AlterField(
+            model_name="rating",
+            name="service_score",
+            field=models.IntegerField(
+                validators=[
+                    django.core.validators.MinValueValidator(1),
+                    django.core.validators.MaxValueValidator(5),
+                ]
+            ),
+        ),
+        migrations.AlterField(
+            model_name="rating",
+            name="value_score",
+            field=models.IntegerField(
+                validators=[
+                    django.core.validators.MinValueValidator(1),
+                    django.core.validators.MaxValueValidator(5),
+                ]
+            ),
+        ),
+        migrations.AddField(
+            model_name="restaurant",
+            name="place",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="restaurants",
+                to="restaurants.place",
+            ),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.1.7 on 2026-10-19 19:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurants", "0003_place"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScoreHistogram",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "criterion",
+                    models.CharField(
+                        choices=[
+                            ("food", "Cuisine"),
+                            ("service", "Service"),
+                            ("ambiance", "Ambiance"),
+                            ("value", "Rapport qualité-prix"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("count_1", models.PositiveIntegerField(default=0)),
+                ("count_2", models.PositiveIntegerField(default=0)),
+                ("count_3", models.PositiveIntegerField(default=0)),
+                ("count_4", models.PositiveIntegerField(default=0)),
+                ("count_5", models.PositiveIntegerField(default=0)),
+                (
+                    "restaurant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="score_histograms",
+                        to="restaurants.restaurant",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("restaurant", "criterion")},
+            },
+        ),
+    ]
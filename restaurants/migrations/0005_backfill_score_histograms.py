@@ -0,0 +1,50 @@
+from collections import defaultdict
+
+from django.db import migrations
+from django.db.models import Count
+
+CRITERIA = ["food", "service", "ambiance", "value"]
+
+
+def backfill_score_histograms(apps, schema_editor):
+    Rating = apps.get_model("restaurants", "Rating")
+    ScoreHistogram = apps.get_model("restaurants", "ScoreHistogram")
+
+    # Un GROUP BY par critère : (restaurant, note) -> nombre d'évaluations
+    histograms = defaultdict(lambda: [0] * 5)
+    for criterion in CRITERIA:
+        field = f"{criterion}_score"
+        rows = (
+            Rating.objects.order_by()
+            .values("restaurant_id", field)
+            .annotate(count=Count("id"))
+            .values_list("restaurant_id", field, "count")
+        )
+        for restaurant_id, score, count in rows.iterator(chunk_size=2000):
+            histograms[(restaurant_id, criterion)][score - 1] = count
+
+    ScoreHistogram.objects.bulk_create(
+        (
+            ScoreHistogram(
+                restaurant_id=restaurant_id,
+                criterion=criterion,
+                count_1=counts[0],
+                count_2=counts[1],
+                count_3=counts[2],
+                count_4=counts[3],
+                count_5=counts[4],
+            )
+            for (restaurant_id, criterion), counts in histograms.items()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("restaurants", "0004_scorehistogram"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_score_histograms, migrations.RunPython.noop),
+    ]
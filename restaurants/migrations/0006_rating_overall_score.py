@@ -0,0 +1,58 @@
+# Generated by Django 5.1.7 on 2026-10-19 19:21
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurants", "0005_backfill_score_histograms"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="rating",
+            name="overall_score",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.db.models.expressions.CombinedExpression(
+                    django.db.models.functions.comparison.Cast(
+                        django.db.models.expressions.CombinedExpression(
+                            django.db.models.expressions.CombinedExpression(
+                                django.db.models.expressions.CombinedExpression(
+                                    models.F("food_score"),
+                                    "+",
+                                    models.F("service_score"),
+                                ),
+                                "+",
+                                models.F("ambiance_score"),
+                            ),
+                            "+",
+                            models.F("value_score"),
+                        ),
+                        models.FloatField(),
+                    ),
+                    "/",
+                    models.Value(4),
+                ),
+                output_field=models.FloatField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="rating",
+            index=models.Index(
+                fields=["overall_score"], name="rating_overall_score_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="rating",
+            index=models.Index(
+                fields=["restaurant", "overall_score"],
+                name="rating_restaurant_score_idx",
+            ),
+        ),
+    ]
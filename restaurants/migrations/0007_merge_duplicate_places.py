@@ -0,0 +1,32 @@
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def merge_duplicate_places(apps, schema_editor):
+    Place = apps.get_model("restaurants", "Place")
+    Restaurant = apps.get_model("restaurants", "Restaurant")
+
+    # Lieux de même clé normalisée (créations concurrentes) : le plus ancien est conservé
+    duplicates = (
+        Place.objects.order_by()
+        .values("normalized_name", "normalized_address")
+        .annotate(count=Count("id"), keep=Min("id"))
+        .filter(count__gt=1)
+    )
+    for row in list(duplicates):
+        others = Place.objects.filter(
+            normalized_name=row["normalized_name"],
+            normalized_address=row["normalized_address"],
+        ).exclude(pk=row["keep"])
+        Restaurant.objects.filter(place__in=others).update(place_id=row["keep"])
+        others.delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("restaurants", "0006_rating_overall_score"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_places, migrations.RunPython.noop),
+    ]
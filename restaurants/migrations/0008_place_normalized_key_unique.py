@@ -0,0 +1,20 @@
+# Generated by Django 5.1.7 on 2026-10-19 19:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurants", "0007_merge_duplicate_places"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="place",
+            constraint=models.UniqueConstraint(
+                fields=("normalized_name", "normalized_address"),
+                name="place_normalized_key_unique",
+            ),
+        ),
+    ]
@@ -1,7 +1,71 @@
 from django.db import models
+from django.db.models.functions import Cast, Mod
+from django.db.models.lookups import Exact
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+from .matching import (
+    PlaceMatcher, normalize_name, normalize_address, name_block_key, address_block_key,
+)
+
+# Critères notés de 1 à 5 dans une évaluation (champ <critère>_score)
+SCORE_CRITERIA = ['food', 'service', 'ambiance', 'value']
+
+
+def score_tenths(overall_score):
+    """Note globale telle qu'affichée par l'API (round(score, 1)), en dixièmes entiers."""
+    return round(overall_score * 10)
+
+
+def score_tenths_expression(prefix=''):
+    """
+    score_tenths calculé en SQL, en entiers : la note globale vaut total / 4
+    (total des quatre critères), soit 5 × total / 2 dixièmes ; les quarts
+    ,25 et ,75 s'arrondissent comme en Python à ,2 et ,8.
+    """
+    total = sum(
+        (models.F(f'{prefix}{criterion}_score') for criterion in SCORE_CRITERIA[1:]),
+        models.F(f'{prefix}{SCORE_CRITERIA[0]}_score'),
+    )
+    adjustment = models.Case(
+        models.When(Exact(Mod(total, 4), 1), then=-1),
+        models.When(Exact(Mod(total, 4), 3), then=1),
+        default=0,
+    )
+    return models.ExpressionWrapper((5 * total + adjustment) / 2, output_field=models.IntegerField())
+
+
+class Place(models.Model):
+    """Lieu canonique auquel sont rattachés les restaurants proposés dans les compétitions"""
+    name = models.CharField(max_length=100)
+    address = models.TextField()
+
+    # Formes normalisées et clés de blocage pour le rapprochement approximatif
+    normalized_name = models.CharField(max_length=100, editable=False)
+    normalized_address = models.TextField(editable=False)
+    name_key = models.CharField(max_length=8, db_index=True, editable=False)
+    address_key = models.CharField(max_length=8, db_index=True, editable=False)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['normalized_name', 'normalized_address'], name='place_normalized_key_unique'
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    def save(self, *args, **kwargs):
+        self.normalized_name = normalize_name(self.name)
+        self.normalized_address = normalize_address(self.address)
+        self.name_key = name_block_key(self.normalized_name)
+        self.address_key = address_block_key(self.normalized_address)
+        super().save(*args, **kwargs)
+
+
 class Restaurant(models.Model):
     """Modèle pour un restaurant proposé dans une compétition"""
     name = models.CharField(max_length=100)
@@ -18,6 +82,13 @@ class Restaurant(models.Model):
         on_delete=models.CASCADE,
         related_name='restaurants' 
         )
+    place = models.ForeignKey(
+        Place,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='restaurants'
+        )
     
     visit_date = models.DateField()
 
@@ -30,6 +101,26 @@ class Restaurant(models.Model):
 
     def __str__(self):
         return self.name
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Nom et adresse au chargement (sauf champs différés), pour détecter un changement de lieu
+        if 'name' in field_names and 'address' in field_names:
+            instance._loaded_location = (instance.name, instance.address)
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Rattache le restaurant à son lieu canonique (existant ou nouveau),
+        # de nouveau si son nom ou son adresse ont changé
+        location = (self.name, self.address)
+        if self.place_id is None or location != getattr(self, '_loaded_location', location):
+            self.place = PlaceMatcher().resolve(self.name, self.address)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'place'}
+        super().save(*args, **kwargs)
+        self._loaded_location = location
     
     @property
     def average_rating(self):
@@ -37,8 +128,16 @@ class Restaurant(models.Model):
         ratings = self.ratings.all()  # Récupère toutes les évaluations (via related_name de Rating)
         if not ratings:
             return 0
-        total = sum(rating.overall_score for rating in ratings)
+        total = sum(round(rating.overall_score, 1) for rating in ratings)
         return round(total / len(ratings), 1)
+
+    @property
+    def score_histogram(self):
+        """Nombre de notes de 1 à 5 pour chaque critère"""
+        histogram = {criterion: [0] * 5 for criterion in SCORE_CRITERIA}
+        for row in self.score_histograms.all():
+            histogram[row.criterion] = row.counts
+        return histogram
     
 class Rating(models.Model):
     """Modèle pour une évaluation d'un restaurant par un participant"""
@@ -58,17 +157,64 @@ class Rating(models.Model):
     value_score = models.IntegerField(validators=[MinValueValidator(1), MaxValueValidator(5)])
     comment = models.TextField(blank=True)
 
+    # Note globale exacte (moyenne des quatre critères), calculée par la base
+    # pour permettre tri et filtres en SQL ; l'API l'arrondit à une décimale
+    overall_score = models.GeneratedField(
+        expression=Cast(
+            models.F('food_score') + models.F('service_score')
+            + models.F('ambiance_score') + models.F('value_score'),
+            models.FloatField()
+        ) / 4,
+        output_field=models.FloatField(),
+        db_persist=True,
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         unique_together = ('restaurant', 'user')
+        indexes = [
+            models.Index(fields=['overall_score'], name='rating_overall_score_idx'),
+            models.Index(fields=['restaurant', 'overall_score'], name='rating_restaurant_score_idx'),
+        ]
         
     def __str__(self):
         return f"Évaluation de {self.restaurant.name} par {self.user.username}"
-    
-    @property
-    def overall_score(self):
-        """Calcule la note globale"""
-        return round((self.food_score + self.service_score + 
-                     self.ambiance_score + self.value_score) / 4, 1)
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if not adding:
+            # Valeur calculée par la base : rechargée au prochain accès
+            self.__dict__.pop('overall_score', None)
+
+
+class ScoreHistogram(models.Model):
+    """Répartition des notes d'un restaurant pour un critère, tenue à jour à chaque évaluation"""
+    CRITERION_CHOICES = [
+        ('food', 'Cuisine'),
+        ('service', 'Service'),
+        ('ambiance', 'Ambiance'),
+        ('value', 'Rapport qualité-prix'),
+    ]
+    restaurant = models.ForeignKey(
+        Restaurant,
+        on_delete=models.CASCADE,
+        related_name='score_histograms'
+    )
+    criterion = models.CharField(max_length=10, choices=CRITERION_CHOICES)
+    count_1 = models.PositiveIntegerField(default=0)
+    count_2 = models.PositiveIntegerField(default=0)
+    count_3 = models.PositiveIntegerField(default=0)
+    count_4 = models.PositiveIntegerField(default=0)
+    count_5 = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('restaurant', 'criterion')
+
+    def __str__(self):
+        return f"{self.restaurant_id} - {self.criterion}"
+
+    @property
+    def counts(self):
+        return [self.count_1, self.count_2, self.count_3, self.count_4, self.count_5]
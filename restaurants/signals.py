@@ -0,0 +1,139 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from competitions.models import Competition
+from groups.changelog import change, group_of, log_changes
+
+from .aggregates import aggregates_suppressed_now
+from .autocomplete import index as autocomplete_index
+from .histograms import apply_score_deltas, rating_scores, rebuild_histograms, score_deltas
+from .models import Rating, Restaurant
+
+
+def _autocomplete_terms(instance):
+    # Lecture via __dict__ pour ne pas charger les champs différés (.only())
+    values = instance.__dict__
+    return (values.get('name'), values.get('cuisine_type'), values.get('competition_id'))
+
+
+def _remove_previous_terms(instance):
+    """Retire les valeurs indexées au chargement ; invalide l'index si elles sont inconnues."""
+    previous = getattr(instance, '_autocomplete_terms', None)
+    if previous is None or None in previous:
+        autocomplete_index.invalidate()
+        return False
+    name, cuisine_type, competition_id = previous
+    autocomplete_index.remove(
+        name, cuisine_type, autocomplete_index.group_for_competition(competition_id)
+    )
+    return True
+
+
+@receiver(post_init, sender=Restaurant)
+def remember_autocomplete_terms(sender, instance, **kwargs):
+    if instance.pk is not None:
+        instance._autocomplete_terms = _autocomplete_terms(instance)
+
+
+@receiver(post_save, sender=Restaurant)
+def update_autocomplete_on_save(sender, instance, created, **kwargs):
+    if autocomplete_index.built_at is None:
+        return
+    terms = _autocomplete_terms(instance)
+    if not created:
+        if terms == getattr(instance, '_autocomplete_terms', None):
+            return
+        if not _remove_previous_terms(instance):
+            return
+    autocomplete_index.add(
+        instance.name, instance.cuisine_type,
+        autocomplete_index.group_for_competition(instance.competition_id),
+    )
+    instance._autocomplete_terms = terms
+
+
+@receiver(post_delete, sender=Restaurant)
+def update_autocomplete_on_delete(sender, instance, **kwargs):
+    if autocomplete_index.built_at is None:
+        return
+    _remove_previous_terms(instance)
+
+
+@receiver(post_init, sender=Rating)
+def remember_rating_scores(sender, instance, **kwargs):
+    if instance.pk is not None:
+        instance._histogram_scores = (instance.__dict__.get('restaurant_id'), rating_scores(instance))
+
+
+@receiver(post_save, sender=Rating)
+def update_histograms_on_save(sender, instance, created, **kwargs):
+    if aggregates_suppressed_now():
+        return
+    current = (instance.restaurant_id, rating_scores(instance))
+    if created:
+        apply_score_deltas(instance.restaurant_id, score_deltas(new_scores=current[1]))
+    else:
+        previous_restaurant_id, previous_scores = getattr(instance, '_histogram_scores', (None, None))
+        if previous_restaurant_id is None or previous_scores is None or current[1] is None:
+            # Valeurs précédentes inconnues : recalcul complet
+            rebuild_histograms({previous_restaurant_id, instance.restaurant_id} - {None})
+        elif previous_restaurant_id != instance.restaurant_id:
+            apply_score_deltas(previous_restaurant_id, score_deltas(old_scores=previous_scores))
+            apply_score_deltas(instance.restaurant_id, score_deltas(new_scores=current[1]))
+        else:
+            apply_score_deltas(instance.restaurant_id, score_deltas(previous_scores, current[1]))
+    instance._histogram_scores = current
+
+
+@receiver(post_delete, sender=Rating)
+def update_histograms_on_delete(sender, instance, **kwargs):
+    if aggregates_suppressed_now():
+        return
+    restaurant_id, scores = getattr(instance, '_histogram_scores', (None, None))
+    if restaurant_id is None or scores is None:
+        rebuild_histograms([instance.restaurant_id])
+    else:
+        apply_score_deltas(restaurant_id, score_deltas(old_scores=scores))
+
+
+def _competition_group(competition_id):
+    return group_of(Competition.objects.filter(pk=competition_id).values('group_id'))
+
+
+def _restaurant_group(restaurant_id):
+    return group_of(Restaurant.objects.filter(pk=restaurant_id).values('competition__group_id'))
+
+
+@receiver(post_save, sender=Restaurant)
+def log_restaurant_save(sender, instance, created, **kwargs):
+    log_changes(change(
+        'restaurant', instance.id, 'create' if created else 'update',
+        _competition_group(instance.competition_id),
+    ))
+
+
+@receiver(post_delete, sender=Restaurant)
+def log_restaurant_delete(sender, instance, **kwargs):
+    log_changes(change(
+        'restaurant', instance.id, 'delete',
+        _competition_group(instance.competition_id),
+    ))
+
+
+@receiver(post_save, sender=Rating)
+def log_rating_save(sender, instance, created, **kwargs):
+    # Moyenne et histogramme du restaurant changent aussi
+    group_id = _restaurant_group(instance.restaurant_id)
+    log_changes(
+        change('rating', instance.id, 'create' if created else 'update', group_id),
+        change('restaurant', instance.restaurant_id, 'update', group_id),
+    )
+
+
+@receiver(post_delete, sender=Rating)
+def log_rating_delete(sender, instance, **kwargs):
+    group_id = _restaurant_group(instance.restaurant_id)
+    log_changes(
+        change('rating', instance.id, 'delete', group_id),
+        change('restaurant', instance.restaurant_id, 'update', group_id),
+    )
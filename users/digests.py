@@ -0,0 +1,126 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from groups.models import Activity, GroupMember
+from .models import User
+
+DIGEST_PERIODS = {
+    'daily': timedelta(days=1),
+    'weekly': timedelta(days=7),
+}
+
+
+def due_users(now, frequencies=None):
+    """Utilisateurs dont la période de résumé est écoulée."""
+    condition = Q()
+    for frequency, period in DIGEST_PERIODS.items():
+        if frequencies and frequency not in frequencies:
+            continue
+        condition |= Q(digest_frequency=frequency) & (
+            Q(last_digest_sent_at__isnull=True) | Q(last_digest_sent_at__lte=now - period)
+        )
+    if not condition:
+        return User.objects.none()
+    return User.objects.filter(condition, is_active=True).exclude(email='')
+
+
+def build_digests(users, now):
+    """
+    Construit un email par utilisateur à partir des événements de ses groupes.
+
+    Toutes les données sont préchargées en trois requêtes (utilisateurs,
+    adhésions, événements avec acteur et groupe) puis réparties en mémoire :
+    le rendu ne déclenche aucune requête par événement.
+    """
+    users = list(users)
+    if not users:
+        return []
+
+    since = {
+        user.id: user.last_digest_sent_at or now - DIGEST_PERIODS[user.digest_frequency]
+        for user in users
+    }
+    groups_by_user = defaultdict(set)
+    for user_id, group_id in GroupMember.objects.filter(
+        user_id__in=since
+    ).values_list('user_id', 'group_id'):
+        groups_by_user[user_id].add(group_id)
+
+    group_ids = set().union(*groups_by_user.values())
+    activities_by_group = defaultdict(list)
+    for activity in Activity.objects.filter(
+        group_id__in=group_ids,
+        created_at__gt=min(since.values()),
+        created_at__lte=now,
+    ).select_related('actor', 'group').order_by('created_at', 'id'):
+        activities_by_group[activity.group_id].append(activity)
+
+    messages = []
+    for user in users:
+        sections = []
+        for group_id in sorted(groups_by_user[user.id]):
+            activities = [
+                activity for activity in activities_by_group[group_id]
+                if activity.created_at > since[user.id] and activity.actor_id != user.id
+            ]
+            if activities:
+                sections.append({'group': activities[0].group, 'activities': activities})
+        if not sections:
+            continue
+
+        context = {
+            'user': user,
+            'sections': sections,
+            'frontend_url': getattr(settings, 'FRONTEND_URL', 'http://localhost'),
+        }
+        subject = render_to_string('digest/email/digest_subject.txt', context).strip()
+        body = render_to_string('digest/email/digest_message.txt', context)
+        message = EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [user.email])
+        messages.append(message)
+    return messages
+
+
+def digest_batches(now, frequencies=None, batch_size=None):
+    """
+    Parcourt les utilisateurs dus par lots de `batch_size` (clé primaire
+    croissante) et produit (utilisateurs, emails) pour chaque lot : la
+    mémoire reste bornée à un lot d'utilisateurs et de leurs événements.
+    """
+    batch_size = batch_size or getattr(settings, 'DIGEST_BATCH_SIZE', 100)
+    queryset = due_users(now, frequencies).order_by('pk')
+    last_pk = 0
+    while True:
+        users = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        if not users:
+            return
+        last_pk = users[-1].pk
+        yield users, build_digests(users, now)
+
+
+def send_digests(now=None, frequencies=None, batch_size=None):
+    """
+    Envoie les résumés dus par lots, sur une seule connexion au backend email.
+
+    La fenêtre de chaque lot (last_digest_sent_at) est avancée dès son envoi,
+    même pour les utilisateurs sans nouveauté : relancée après un échec, la
+    commande reprend au lot interrompu sans renvoyer les précédents.
+    Retourne le nombre d'emails envoyés.
+    """
+    now = now or timezone.now()
+    sent = 0
+    connection = get_connection()
+    connection.open()
+    try:
+        for users, messages in digest_batches(now, frequencies, batch_size):
+            if messages:
+                sent += connection.send_messages(messages)
+            User.objects.filter(id__in=[user.id for user in users]).update(last_digest_sent_at=now)
+    finally:
+        connection.close()
+    return sent
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from users.digests import DIGEST_PERIODS, digest_batches, send_digests
+
+
+class Command(BaseCommand):
+    help = "Envoie les résumés d'activité par email aux utilisateurs dont la période est écoulée."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--frequency', action='append', choices=sorted(DIGEST_PERIODS),
+            help="Limite l'envoi à une fréquence (répétable).",
+        )
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Affiche les résumés sans les envoyer.",
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            count = 0
+            for _, messages in digest_batches(timezone.now(), options['frequency'], options['batch_size']):
+                for message in messages:
+                    self.stdout.write(f"--- {message.to[0]} : {message.subject}\n{message.body}")
+                count += len(messages)
+        else:
+            count = send_digests(frequencies=options['frequency'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{count} résumé(s) traité(s)."))
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.7 on 2026-10-19 19:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0002_alter_user_email"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="digest_frequency",
+            field=models.CharField(
+                choices=[
+                    ("never", "Jamais"),
+                    ("daily", "Quotidien"),
+                    ("weekly", "Hebdomadaire"),
+                ],
+                default="never",
+                max_length=10,
+            ),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="last_digest_sent_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
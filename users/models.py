@@ -6,6 +6,14 @@ class User(AbstractUser):
     bio = models.TextField(blank=True)
     avatar = models.ImageField(upload_to='avatars/', null=True, blank=True)
     email = models.EmailField(unique=True)
+
+    DIGEST_FREQUENCY_CHOICES = [
+        ('never', 'Jamais'),
+        ('daily', 'Quotidien'),
+        ('weekly', 'Hebdomadaire'),
+    ]
+    digest_frequency = models.CharField(max_length=10, choices=DIGEST_FREQUENCY_CHOICES, default='never')
+    last_digest_sent_at = models.DateTimeField(null=True, blank=True)
     
     def __str__(self):
-        return self.username
\ No newline at end of file
+        return self.username